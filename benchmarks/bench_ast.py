@@ -0,0 +1,59 @@
+"""
+Compara as representações da AST: tuplas (formato original, via nodes.to_tuple),
+nós tipados com __slots__ (Parser padrão) e a arena de arrays paralelos
+(Parser(..., arena=True)). Mede a memória por nó e o tempo de parsing.
+
+Uso:
+    python -m benchmarks.bench_ast [--sizes 10000 100000]
+"""
+import argparse
+import sys
+
+from benchmarks.common import best_of, generate_program
+from src.lexer import lexer
+from src.parser import nodes, parser
+
+
+def object_bytes(root):
+    """Memória de um grafo de objetos (tuplas, listas, nós), contando cada objeto uma vez."""
+    seen = set()
+    total = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (tuple, list)):
+            stack.extend(obj)
+        elif isinstance(obj, nodes.Node):
+            stack.extend(getattr(obj, name) for name in obj.fields)
+    return total
+
+
+def arena_bytes(arena):
+    """Memória da arena: arrays + tabela de textos internados."""
+    return arena.nbytes() + sys.getsizeof(arena.strings) + sum(sys.getsizeof(s) for s in arena.strings)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>10} {'nós':>10} {'B/nó tupla':>11} {'B/nó slots':>11} {'B/nó arena':>11} "
+          f"{'parse nós (s)':>14} {'parse arena (s)':>16}")
+    for size in args.sizes:
+        stream = lexer.tokenize(generate_program(size))
+        t_nodes, tree = best_of(lambda: parser.Parser(stream).parse(), args.repeat)
+        t_arena, arena = best_of(lambda: parser.Parser(stream, arena=True).parse(), args.repeat)
+        n = len(arena)
+        print(f"{size:>10} {n:>10} {object_bytes(nodes.to_tuple(tree)) / n:>11.1f} "
+              f"{object_bytes(tree) / n:>11.1f} {arena_bytes(arena) / n:>11.1f} "
+              f"{t_nodes:>14.3f} {t_arena:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Compara o módulo binário (.gpc, src/generator/bytecode.py) com o texto C3E
+(c3e.txt) como forma de guardar o código gerado: tamanho em disco, tempo de
+gravação e tempo de carga.
+
+A carga do texto lê o arquivo e reconstrói o ir.IRProgram analisando cada
+linha (parse_c3e, abaixo). A do .gpc é medida em três etapas: "abrir" só
+mapeia o arquivo e confere o hash (nenhuma instrução é lida), "abrir s/ hash"
+pula a conferência e "programa" abre e decodifica todas as instruções em um
+ir.IRProgram, o equivalente direto da carga do texto.
+
+Uso:
+    python -m benchmarks.bench_bytecode [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import re
+import tempfile
+
+from benchmarks.common import best_of, generate_program
+from src.generator import bytecode, ir
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+
+_TOKEN = re.compile(r'"(?:\\.|[^"\\])*"|[^\s,]+')
+_TEMP = re.compile(r"t(\d+)")
+_LABEL = re.compile(r"L(\d+)")
+_NUMBER = re.compile(r"-?\d+(\.\d*)?([eE][-+]?\d+)?|-?inf|nan")
+_BINARY_SYMBOLS = {ir.SYMBOLS[op]: op for op in ir.BINARY}
+
+
+def parse_c3e(text):
+    """Reconstrói o ir.IRProgram a partir do texto C3E (o formato de c3e.txt)."""
+    program = ir.IRProgram()
+    lines = text.split("\n")
+
+    def label(name):
+        m = _LABEL.fullmatch(name)
+        if m is None:
+            return program.function(name)
+        n = int(m.group(1))
+        while len(program.labels) <= n:
+            program.new_label()
+        return program.labels[n]
+
+    def operand(token):
+        m = _TEMP.fullmatch(token)
+        if m is not None:
+            n = int(m.group(1))
+            program.temp_count = max(program.temp_count, n + 1)
+            return n
+        if token[0] == '"':
+            return program.const("string", token)
+        if token in ("True", "False"):
+            return program.const("boolean", token)
+        if _NUMBER.fullmatch(token):
+            return program.const("number", token)
+        return token
+
+    emit = program.emit
+    for k, line in enumerate(lines):
+        if line.endswith(":"):
+            name = line[:-1]
+            # Rótulo de função: seguido de begin_func.
+            is_function = k + 1 < len(lines) and lines[k + 1] == "begin_func"
+            emit(ir.LABEL, a=program.function(name) if is_function else label(name))
+            continue
+        if line.startswith("# "):
+            emit(ir.PAR_BEGIN if "BEGIN" in line else ir.PAR_END)
+            continue
+        t = _TOKEN.findall(line)
+        head = t[0]
+        if len(t) > 1 and t[1] == "=":
+            d = operand(head)
+            if len(t) == 3:
+                emit(ir.COPY, d, operand(t[2]))
+            elif t[2] == "call":
+                emit(ir.CALL, d, program.function(t[3]), int(t[4]))
+            elif len(t) == 4:
+                emit(ir.UNARY_OPS[t[2]], d, operand(t[3]))
+            else:
+                emit(_BINARY_SYMBOLS[t[3]], d, operand(t[2]), operand(t[4]))
+        elif head == "goto":
+            emit(ir.GOTO, a=label(t[1]))
+        elif head == "if_false":
+            emit(ir.IF_FALSE, a=operand(t[1]), b=label(t[3]))
+        elif head == "param":
+            emit(ir.PARAM, a=operand(t[1]))
+        elif head == "return":
+            emit(ir.RETURN, a=operand(t[1]) if len(t) > 1 else None)
+        elif head == "get_param":
+            emit(ir.GET_PARAM, t[1])
+        elif head == "begin_func":
+            emit(ir.BEGIN_FUNC)
+        elif head == "end_func":
+            emit(ir.END_FUNC)
+        elif head == "channel_decl":
+            emit(ir.CHANNEL_DECL, t[1], t[2], t[3])
+        elif head == "send":
+            emit(ir.SEND, a=t[1], b=int(t[2]))
+        elif head == "receive":
+            emit(ir.RECEIVE, tuple(t[2:]), t[1])
+        else:
+            raise ValueError(f"linha de C3E não reconhecida: {line!r}")
+    return program
+
+
+def load_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_c3e(f.read())
+
+
+def write_text(program, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(program.render())
+
+
+def open_module(path, verify=True):
+    bytecode.load(path, verify).close()
+
+
+def load_module(path):
+    with bytecode.load(path) as module:
+        return module.to_program()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>8} {'instr.':>8} {'texto (KiB)':>12} {'.gpc (KiB)':>11} "
+          f"{'grava txt':>10} {'grava gpc':>10} {'carga txt':>10} {'abrir':>8} {'s/ hash':>8} "
+          f"{'programa':>9} {'ganho':>7}   (tempos em ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "c3e.txt")
+        gpc_path = os.path.join(tmp, "c3e" + bytecode.SUFFIX)
+        for n in args.sizes:
+            ast = Parser(lexer.tokenize(generate_program(n))).parse()
+            analyzer = SemanticAnalyzer(ast)
+            analyzer.analyze()
+            program = CodeGenerator(analyzer.functions, analyzer.types).generate(ast)
+
+            t_write_text, _ = best_of(lambda: write_text(program, text_path), args.repeat)
+            t_write_gpc, _ = best_of(lambda: bytecode.dump(program, gpc_path), args.repeat)
+            t_text, from_text = best_of(lambda: load_text(text_path), args.repeat)
+            t_open, _ = best_of(lambda: open_module(gpc_path), args.repeat)
+            t_open_raw, _ = best_of(lambda: open_module(gpc_path, verify=False), args.repeat)
+            t_gpc, from_gpc = best_of(lambda: load_module(gpc_path), args.repeat)
+            expected = program.render()
+            assert from_text.render() == expected and from_gpc.render() == expected
+
+            kib = 1024
+            print(f"{n:>8} {len(program):>8} {os.path.getsize(text_path) / kib:>12.1f} "
+                  f"{os.path.getsize(gpc_path) / kib:>11.1f} {t_write_text * 1e3:>10.2f} "
+                  f"{t_write_gpc * 1e3:>10.2f} {t_text * 1e3:>10.2f} {t_open * 1e3:>8.3f} "
+                  f"{t_open_raw * 1e3:>8.3f} {t_gpc * 1e3:>9.2f} {t_text / t_gpc:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Mede o front-end (léxico + sintático + semântico) com e sem o cache de análise
+em disco: "sem cache" analisa tudo, "frio" analisa e grava a entrada e "quente"
+apenas carrega a AST já validada do cache.
+
+Uso:
+    python -m benchmarks.bench_cache [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import best_of, generate_program
+from src.cache.cache import ParseCache
+from src.lexer import lexer
+from src.parser import parser
+from src.semantic import semantic
+
+
+def front_end(code):
+    ast = parser.Parser(lexer.tokenize(code)).parse()
+    semantic.SemanticAnalyzer(ast).analyze()
+    return ast
+
+
+def cold(cache, code):
+    cache.clear()
+    key = cache.key(code)
+    ast = front_end(code)
+    cache.store(key, ast, validated=True)
+    return ast
+
+
+def warm(cache, code):
+    ast, validated, _ = cache.load(cache.key(code))
+    assert validated
+    return ast
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>10} {'sem cache (s)':>14} {'frio (s)':>10} {'quente (s)':>11} {'ganho':>7} {'entrada (KiB)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+        for size in args.sizes:
+            code = generate_program(size)
+            t_none, _ = best_of(lambda: front_end(code), args.repeat)
+            t_cold, _ = best_of(lambda: cold(cache, code), args.repeat)
+            t_warm, _ = best_of(lambda: warm(cache, code), args.repeat)
+            entry = os.path.getsize(cache.path(cache.key(code))) / 1024
+            print(f"{size:>10} {t_none:>14.3f} {t_cold:>10.3f} {t_warm:>11.3f} "
+                  f"{t_none / t_warm:>6.1f}x {entry:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
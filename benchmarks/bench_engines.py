@@ -0,0 +1,71 @@
+"""
+Compara os modos de execução de um programa MiniPar nos mesmos programas:
+a máquina virtual sobre o C3E otimizado em -O2 (src/vm/vm.py), a tradução
+da AST para um módulo Python compilado com compile() (src/vm/transpile.py)
+e a compilação da AST para closures (src/vm/closures.py).
+
+Para cada modo, "preparo" é o que vem antes de executar (otimização e carga
+na VM; tradução e compilação no Python, sem o cache de objetos de código;
+compilação para closures, com as fábricas de closures já criadas) e
+"execução" é o tempo de rodar o programa. "ganho" compara as execuções.
+
+Uso:
+    python -m benchmarks.bench_engines [--fib 22] [--loops 300] [--lines 2000]
+"""
+import argparse
+import io
+
+from benchmarks.common import (best_of, generate_fib_program, generate_loop_program,
+                               generate_nested_loop_program)
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.optimizer import optimizer
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+from src.vm import closures, transpile, vm
+
+
+def prepare_vm(ast, analyzer):
+    program = CodeGenerator(analyzer.functions, analyzer.types).generate(ast)
+    return vm.VM(optimizer.optimize(program, optimizer.MAX_LEVEL), io.StringIO())
+
+
+def prepare_python(ast, analyzer):
+    transpile._compiled.clear()
+    return transpile.PythonModule(ast, analyzer.functions, io.StringIO())
+
+
+def prepare_closures(ast, analyzer):
+    return closures.ClosureProgram(ast, analyzer.functions, io.StringIO())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fib", type=int, default=22, help="argumento de fib no programa recursivo")
+    ap.add_argument("--loops", type=int, default=300, help="iterações de cada laço no programa de laços aninhados")
+    ap.add_argument("--lines", type=int, default=2_000, help="linhas do programa sintético de laços")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    corpus = {
+        "recursão": generate_fib_program(args.fib),
+        "laços": generate_nested_loop_program(args.loops),
+        "sintético": generate_loop_program(args.lines),
+    }
+    engines = {"VM -O2": prepare_vm, "Python": prepare_python, "closures": prepare_closures}
+    print(f"{'programa':>10} {'modo':>8} {'preparo (ms)':>13} {'execução (ms)':>14} {'ganho':>7}")
+    for name, code in corpus.items():
+        ast = Parser(lexer.tokenize(code)).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+        baseline = None
+        for engine, prepare in engines.items():
+            t_prepare, runner = best_of(lambda: prepare(ast, analyzer), args.repeat)
+            t_run, _ = best_of(runner.run, args.repeat)
+            baseline = baseline or t_run
+            print(f"{name:>10} {engine:>8} {t_prepare * 1e3:>13.1f} {t_run * 1e3:>14.1f} "
+                  f"{baseline / t_run:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Parsing de programas com muitas expressões: precedence climbing (Parser)
+contra a antiga cadeia de descida recursiva expression -> logic_or ->
+logic_and -> comparison_expr -> sum_expr -> term_expr -> unary_expr.
+
+Uso:
+    python -m benchmarks.bench_expressions [--lines 20000] [--terms 4 16 64]
+"""
+import argparse
+import random
+
+from benchmarks.common import best_of
+from src.lexer import lexer
+from src.lexer.tokens import (
+    KW_AND, KW_NOT, KW_OR, OP_EQ, OP_GE, OP_GT, OP_LE, OP_LT, OP_MINUS, OP_NE, OP_PLUS,
+    OP_SLASH, OP_STAR,
+)
+from src.parser.nodes import to_tuple
+from src.parser.parser import Parser
+
+
+class DescentParser(Parser):
+    """Parser com a cadeia de descida original para expressões (referência de desempenho)."""
+
+    def expression(self):
+        return self.logic_or()
+
+    def binop(self, operand):
+        line, col = self.here()
+        op = self.take()
+        return op, operand(), line, col
+
+    def logic_or(self):
+        node = self.logic_and()
+        while self.kind == KW_OR:
+            op, right, line, col = self.binop(self.logic_and)
+            node = self.ast.BinOp(op, node, right, line, col)
+        return node
+
+    def logic_and(self):
+        node = self.comparison_expr()
+        while self.kind == KW_AND:
+            op, right, line, col = self.binop(self.comparison_expr)
+            node = self.ast.BinOp(op, node, right, line, col)
+        return node
+
+    def comparison_expr(self):
+        node = self.sum_expr()
+        while self.kind in {OP_EQ, OP_NE, OP_LT, OP_GT, OP_LE, OP_GE}:
+            op, right, line, col = self.binop(self.sum_expr)
+            node = self.ast.BinOp(op, node, right, line, col)
+        return node
+
+    def sum_expr(self):
+        node = self.term_expr()
+        while self.kind in {OP_PLUS, OP_MINUS}:
+            op, right, line, col = self.binop(self.term_expr)
+            node = self.ast.BinOp(op, node, right, line, col)
+        return node
+
+    def term_expr(self):
+        node = self.unary_expr()
+        while self.kind in {OP_STAR, OP_SLASH}:
+            op, right, line, col = self.binop(self.unary_expr)
+            node = self.ast.BinOp(op, node, right, line, col)
+        return node
+
+    def unary_expr(self):
+        if self.kind == KW_NOT:
+            line, col = self.here()
+            self.eat(KW_NOT)
+            return self.ast.UnOp("not", self.unary_expr(), line, col)
+        return self.primary_expr()
+
+
+def random_expression(rng, terms):
+    """Expressão aritmética/lógica aleatória com 'terms' operandos (sem menos unário)."""
+    parts = [rng.choice(["a", "b", "c", "1", "2.5", "(a + 1)"])]
+    for _ in range(terms - 1):
+        parts.append(rng.choice(["+", "-", "*", "/", "<", "==", "and", "or"]))
+        parts.append(rng.choice(["a", "b", "c", "1", "2.5", "(b * 2)", "not c"]))
+    return " ".join(parts)
+
+
+def generate_expression_program(n_lines, terms, seed=0):
+    rng = random.Random(seed)
+    return "\n".join(f"x = {random_expression(rng, terms)}" for _ in range(n_lines)) + "\n"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lines", type=int, default=20_000)
+    ap.add_argument("--terms", type=int, nargs="+", default=[4, 16, 64])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'operandos':>10} {'tokens':>10} {'descida (s)':>12} {'climbing (s)':>13} {'ganho':>7}")
+    for terms in args.terms:
+        stream = lexer.tokenize(generate_expression_program(args.lines, terms))
+        t_old, old_ast = best_of(lambda: DescentParser(stream).parse(), args.repeat)
+        t_new, new_ast = best_of(lambda: Parser(stream).parse(), args.repeat)
+        if to_tuple(old_ast) != to_tuple(new_ast):
+            raise SystemExit(f"ASTs divergentes para {terms} operandos")
+        print(f"{terms:>10} {len(stream):>10} {t_old:>12.3f} {t_new:>13.3f} {t_old / t_new:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
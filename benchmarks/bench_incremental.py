@@ -0,0 +1,57 @@
+"""
+Custo de uma edição com o lexer incremental (src/lexer/incremental.py)
+comparado à retokenização completa do arquivo. O tempo de cada edição inclui
+obter o fluxo de tokens atualizado (tokens()), que é o que o parser consome.
+Edições que inserem ou removem linhas renumeram os tokens seguintes (uma
+passada em C sobre o array de linhas), então custam mais que as que só
+alteram linhas existentes.
+
+Uso:
+    python -m benchmarks.bench_incremental [--lines 50000]
+"""
+import argparse
+
+from benchmarks.common import best_of, generate_program
+from src.lexer import lexer
+from src.lexer.incremental import IncrementalLexer
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lines", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    code = generate_program(args.lines)
+    doc = IncrementalLexer(code)
+    middle = len(doc.lines) // 2
+    # Ancora as edições em uma linha "x = x + f...(...)" do meio do arquivo.
+    while not doc.lines[middle].startswith("x = "):
+        middle += 1
+
+    t_full, _ = best_of(lambda: lexer.tokenize(code), args.repeat)
+    print(f"{len(doc.lines)} linhas; retokenização completa: {t_full * 1000:.1f} ms")
+
+    edits = [
+        ("troca de expressão", middle, middle + 1, ["x = x + 42"]),
+        ("linha nova indentada", middle + 1, middle + 1, ["    y = y + 1", "    x = x - 1"]),
+        ("remoção de bloco", middle + 1, middle + 3, []),
+    ]
+    print(f"{'edição':>22} {'linhas refeitas':>16} {'tempo (ms)':>11} {'ganho':>9}")
+    for name, start, end, new_lines in edits:
+        original = doc.lines[start:end]
+
+        def apply_and_undo():
+            first, stop = doc.edit(start, end, new_lines)
+            doc.tokens()
+            doc.edit(start, start + len(new_lines), original)
+            doc.tokens()
+            return stop - first
+
+        t_edit, relexed = best_of(apply_and_undo, args.repeat)
+        t_edit /= 2  # cada repetição aplica e desfaz a edição
+        print(f"{name:>22} {relexed:>16} {t_edit * 1000:>11.3f} {t_full / t_edit:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
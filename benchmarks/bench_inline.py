@@ -0,0 +1,70 @@
+"""
+Mede a expansão de funções pequenas (src/optimizer/inline.py) no nível -O2:
+compila cada programa com e sem a passagem e informa as instruções no código,
+as executadas, as chamadas a funções do programa executadas e as
+instruções da sequência de chamada executadas (param, call, begin_func,
+get_param e return, incluindo as das chamadas a 'print'), contadas por
+benchmarks.common.execute, além das chamadas expandidas e do tempo da passagem.
+
+Os programas são o sintético dos demais benchmarks (uma função pequena por
+bloco), um com funções auxiliares chamadas em laço e um com laços aninhados,
+cujas funções passam do limite de tamanho padrão.
+
+Uso:
+    python -m benchmarks.bench_inline [--lines 2000] [--budget 16]
+"""
+import argparse
+from collections import Counter
+
+from benchmarks.common import best_of, execute, generate_helper_program, generate_loop_program, generate_program
+from src.generator import ir
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.optimizer import inline, optimizer
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+
+CALL_SEQUENCE = (ir.PARAM, ir.CALL, ir.BEGIN_FUNC, ir.GET_PARAM, ir.RETURN)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lines", type=int, default=2_000)
+    ap.add_argument("--budget", type=int, default=inline.INLINE_BUDGET,
+                    help="tamanho máximo (em instruções) das funções expandidas")
+    args = ap.parse_args()
+
+    without_inline = [(level, f) for level, f in optimizer.PASSES if f is not inline.inline_calls]
+    corpus = {
+        "sintético": generate_program(args.lines),
+        "auxiliares": generate_helper_program(args.lines),
+        "laços": generate_loop_program(args.lines),
+    }
+    print(f"{'programa':>10} {'':>14} {'instruções':>11} {'executadas':>11} {'chamadas':>9} {'seq. chamada':>13}")
+    for name, code in corpus.items():
+        ast = Parser(lexer.tokenize(code)).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+
+        rows = []
+        for label, passes in (("-O2 sem inline", without_inline), ("-O2", None)):
+            program = CodeGenerator(analyzer.functions, analyzer.types).generate(ast)
+            stats = Counter()
+            if passes is None:
+                # Mede a passagem isolada, sobre o código recém-gerado, antes das demais.
+                elapsed, _ = best_of(lambda: inline.inline_calls(program, args.budget, stats), 1)
+                passes = without_inline
+            optimizer.optimize(program, 2, passes)
+            counts = execute(program)
+            calls = sum(counts[op] for op in CALL_SEQUENCE)
+            rows.append(calls)
+            print(f"{name:>10} {label:>14} {len(program):>11} {sum(counts.values()):>11} "
+                  f"{counts[ir.BEGIN_FUNC]:>9} {calls:>13}")
+        reduction = 1 - rows[1] / rows[0] if rows[0] else 0.0
+        print(f"{'':>10} sequência de chamada executada: -{reduction:.1%}; "
+              f"chamadas expandidas: {stats['calls']}; definições removidas: {stats['functions']}; "
+              f"tempo: {elapsed * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
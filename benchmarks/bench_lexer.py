@@ -0,0 +1,92 @@
+"""
+Benchmark de vazão do lexer: padrão mestre único (src/lexer/lexer.py) contra
+o laço antigo que testava cada regex de COMPILED_REGEXES em toda posição.
+
+Uso:
+    python -m benchmarks.bench_lexer [--sizes 10000 100000 1000000] [--repeat 3]
+"""
+import argparse
+
+from benchmarks.common import best_of, generate_program
+from src.lexer import lexer
+from src.lexer.lexer import COMPILED_REGEXES, KEYWORDS
+
+
+def legacy_lexer(code):
+    """Cópia do laço original do lexer, mantida apenas como referência de desempenho."""
+    tokens = []
+    indent_stack = [0]
+    lineno = 0
+
+    for line in code.splitlines():
+        lineno += 1
+        if "#" in line:
+            line = line.split("#", 1)[0]
+        if not line.strip():
+            continue
+
+        indent_level = len(line) - len(line.lstrip(" "))
+        if indent_level > indent_stack[-1]:
+            indent_stack.append(indent_level)
+            tokens.append(("INDENT", None))
+        elif indent_level < indent_stack[-1]:
+            while indent_level < indent_stack[-1]:
+                indent_stack.pop()
+                tokens.append(("DEDENT", None))
+            if indent_level != indent_stack[-1]:
+                raise ValueError(f"Indentação inválida na linha {lineno}")
+
+        pos = indent_level
+        while pos < len(line):
+            if line[pos].isspace():
+                pos += 1
+                continue
+
+            match = None
+            for token_type, regex in COMPILED_REGEXES:
+                match = regex.match(line, pos)
+                if match:
+                    value = match.group(0)
+                    if token_type == "CHANNEL_CALL":
+                        if value.endswith(".send"):
+                            tokens.append(("CHANNEL_SEND", value.split(".")[0]))
+                        else:
+                            tokens.append(("CHANNEL_RECEIVE", value.split(".")[0]))
+                    elif token_type == "ID" and value in KEYWORDS:
+                        tokens.append(("KEYWORD", value))
+                    else:
+                        tokens.append((token_type, value))
+                    pos = match.end(0)
+                    break
+
+            if not match:
+                raise ValueError(f"Token inválido na linha {lineno}, próximo de: '{line[pos:]}'")
+
+        tokens.append(("NEWLINE", None))
+
+    while len(indent_stack) > 1:
+        indent_stack.pop()
+        tokens.append(("DEDENT", None))
+
+    return tokens
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>10} {'tokens':>10} {'antigo tok/s':>14} {'mestre tok/s':>14} {'ganho':>7}")
+    for size in args.sizes:
+        code = generate_program(size)
+        t_old, old_tokens = best_of(lambda: legacy_lexer(code), args.repeat)
+        t_new, new_tokens = best_of(lambda: lexer.lexer(code), args.repeat)
+        if old_tokens != new_tokens:
+            raise SystemExit(f"Divergência entre os lexers para {size} linhas")
+        n = len(new_tokens)
+        print(f"{size:>10} {n:>10} {n / t_old:>14,.0f} {n / t_new:>14,.0f} {t_old / t_new:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Mede o grafo de fluxo de controle, a análise de vivacidade e o reuso de
+temporários (src/optimizer/cfg.py e slots.py) sobre o C3E sem otimizações.
+Para cada tamanho, informa os temporários distintos antes e depois do reuso,
+o máximo de temporários vivos ao mesmo tempo por função (maior valor e
+média) e o tempo de cada etapa (o reuso inclui refazer o grafo e a vivacidade).
+
+Uso:
+    python -m benchmarks.bench_liveness [--sizes 10000 100000]
+"""
+import argparse
+
+from benchmarks.common import best_of, generate_program
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.optimizer import cfg, slots
+from src.parser.parser import Parser
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = ap.parse_args()
+
+    print(f"{'linhas':>8} {'funções':>8} {'temps':>8} {'slots':>6} {'máx. vivos':>11} {'média':>6} "
+          f"{'CFG (ms)':>9} {'vivacidade (ms)':>16} {'reuso (ms)':>11}")
+    for size in args.sizes:
+        program = CodeGenerator().generate(Parser(lexer.tokenize(generate_program(size))).parse())
+        temps_before = program.temp_count
+
+        t_cfg, functions = best_of(lambda: cfg.build_cfg(program), 1)
+
+        def analyze():
+            for function in functions:
+                cfg.liveness(program, function)
+            return [cfg.max_live(program, function) for function in functions]
+
+        t_live, max_live = best_of(analyze, 1)
+        t_reuse, _ = best_of(lambda: slots.reuse_temps(program), 1)
+
+        print(f"{size:>8} {len(functions):>8} {temps_before:>8} {program.temp_count:>6} {max(max_live):>11} "
+              f"{sum(max_live) / len(max_live):>6.2f} {t_cfg * 1e3:>9.1f} {t_live * 1e3:>16.1f} {t_reuse * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
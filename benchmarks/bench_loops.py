@@ -0,0 +1,131 @@
+"""
+Microbenchmarks da otimização de laços (src/optimizer/loops.py): cada
+programa é uma função com um laço típico, chamada com parâmetros
+desconhecidos pelo otimizador. Para cada um, informa as instruções no código,
+as executadas e as multiplicações executadas (contadas por
+benchmarks.common.execute) no nível -O1, no nível -O2 sem a otimização de
+laços e no -O2 completo.
+
+Antes das medições, os programas de REGRESSIONS (casos que a otimização de
+laços já alterou) são executados na máquina virtual em todos os níveis e
+conferidos com a saída esperada.
+
+Uso:
+    python -m benchmarks.bench_loops [--iterations 1000]
+"""
+import argparse
+import io
+
+from benchmarks.common import execute
+from src.generator import ir
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.optimizer import loops, optimizer
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+from src.vm import vm
+
+# nome -> corpo da função m(a, b, n); o laço executa cerca de n vezes.
+MICROBENCHMARKS = {
+    "invariante": """\
+    s = 0
+    i = 0
+    while (i < n):
+        s = s + a * b + (a - b) * 2
+        i = i + 1
+""",
+    "condição": """\
+    s = 0
+    i = 0
+    while (i < n * 2 - a * b):
+        s = s + i
+        i = i + 1
+""",
+    "indução": """\
+    s = 0
+    for (i = 0; i < n; i = i + 1):
+        s = s + i * 8 + i * 3
+""",
+    "decremento": """\
+    s = 0
+    i = 0
+    while (i > 0 - n):
+        s = s + i * 4 - a
+        i = i - 1
+""",
+    "aninhado": """\
+    s = 0
+    for (i = 0; i < n / 10; i = i + 1):
+        for (j = 0; j < 10; j = j + 1):
+            s = s + i * 10 + j * 4 + a * b
+""",
+    "chamada": """\
+    s = 0
+    i = 0
+    while (i < n):
+        s = s + a * b + g(i * 2)
+        i = i + 1
+""",
+}
+
+PROGRAM = """\
+def g(x):
+    return x + 1
+def m(a, b, n):
+{body}    return s
+print(m(3, 2, {iterations}))
+"""
+
+# nome -> (programa, saída esperada em qualquer nível).
+REGRESSIONS = {
+    # 'x < 3' falha com x string, mas nunca executa: não pode ir para o
+    # pré-cabeçalho, que executa mesmo quando o 'if' não executa.
+    "comparação protegida": ("""\
+def g(x):
+    k = 0
+    while (k < 3):
+        if (k > 100):
+            print(x < 3)
+        k = k + 1
+    return k
+print(g("s"))
+""", "3\n"),
+}
+
+
+def check_regressions():
+    for name, (code, expected) in REGRESSIONS.items():
+        ast = Parser(lexer.tokenize(code)).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+        for level in range(optimizer.MAX_LEVEL + 1):
+            program = optimizer.optimize(CodeGenerator(analyzer.functions, analyzer.types).generate(ast), level)
+            out = io.StringIO()
+            try:
+                vm.VM(program, out).run()
+            except vm.VMError as e:
+                raise AssertionError(f"{name} em -O{level}: {e}") from e
+            assert out.getvalue() == expected, f"{name} em -O{level}: {out.getvalue()!r}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iterations", type=int, default=1000)
+    args = ap.parse_args()
+
+    check_regressions()
+    without_loops = [(level, f) for level, f in optimizer.PASSES if f is not loops.optimize_loops]
+    configurations = [("-O1", 1, None), ("-O2 sem laços", 2, without_loops), ("-O2", 2, None)]
+    print(f"{'programa':>11} {'nível':>14} {'instruções':>11} {'executadas':>11} {'multiplicações':>15}")
+    for name, body in MICROBENCHMARKS.items():
+        ast = Parser(lexer.tokenize(PROGRAM.format(body=body, iterations=args.iterations))).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+        for label, level, passes in configurations:
+            program = optimizer.optimize(CodeGenerator(None, analyzer.types).generate(ast), level, passes)
+            counts = execute(program)
+            print(f"{name:>11} {label:>14} {len(program):>11} {sum(counts.values()):>11} {counts[ir.MUL]:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Teste de estresse do parser com blocos profundamente aninhados
+(SEQ/PAR/if/while alternados). Os tokens são gerados sob demanda, sem texto
+fonte, e o parsing roda com um limite de recursão baixo para mostrar que a
+pilha do Python não cresce com a profundidade.
+
+Uso:
+    python -m benchmarks.bench_nesting [--depths 1000 10000 100000]
+"""
+import argparse
+import sys
+
+from benchmarks.common import best_of
+from src.parser.parser import Parser
+
+RECURSION_LIMIT = 100
+
+HEADERS = [
+    [("KEYWORD", "SEQ")],
+    [("KEYWORD", "PAR")],
+    [("KEYWORD", "if"), ("SYM", "("), ("BOOLEAN", "True"), ("SYM", ")")],
+    [("KEYWORD", "while"), ("SYM", "("), ("ID", "x"), ("OP", "<"), ("NUMBER", "10"), ("SYM", ")")],
+]
+
+STATEMENT = [("ID", "x"), ("OP", "="), ("ID", "x"), ("OP", "+"), ("NUMBER", "1"), ("NEWLINE", None)]
+
+
+def nested_tokens(depth):
+    """Tokens de 'depth' blocos aninhados, cada um com um comando antes do bloco interno."""
+    for level in range(depth):
+        yield from STATEMENT
+        yield from HEADERS[level % len(HEADERS)]
+        yield ("SYM", ":")
+        yield ("NEWLINE", None)
+        yield ("INDENT", None)
+    yield from STATEMENT
+    for _ in range(depth):
+        yield ("DEDENT", None)
+
+
+def ast_depth(ast):
+    """Profundidade de blocos da AST gerada (percorrida iterativamente)."""
+    depth = 0
+    stmts = ast[1][1]
+    while stmts and stmts[-1][0] != "assignment":
+        node = stmts[-1]
+        stmts = node[-1][1]
+        depth += 1
+    return depth
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--depths", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(RECURSION_LIMIT)
+    try:
+        print(f"limite de recursão durante o parsing: {RECURSION_LIMIT}")
+        print(f"{'níveis':>10} {'tempo (s)':>10} {'níveis/s':>12}")
+        for depth in args.depths:
+            elapsed, ast = best_of(lambda: Parser(nested_tokens(depth)).parse(), args.repeat)
+            if ast_depth(ast) != depth:
+                raise SystemExit(f"AST com profundidade incorreta para {depth} níveis")
+            print(f"{depth:>10} {elapsed:>10.3f} {depth / elapsed:>12,.0f}")
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+
+if __name__ == "__main__":
+    main()
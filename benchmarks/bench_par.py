@@ -0,0 +1,63 @@
+"""
+Mede a execução paralela dos blocos PAR (src/vm/parallel.py) em programas
+com um bloco PAR de ramos independentes e pesados (generate_par_program:
+laços e recursão, de custo parecido), comparada com a execução em sequência
+do mesmo programa compilado para closures.
+
+"1ª execução" inclui a criação do pool e a compilação do programa em cada
+processo; "paralelo" é a melhor das execuções seguintes, com o pool já
+pronto, que é o custo de cada bloco em um programa que executa muitos.
+"ganho" compara "paralelo" com "sequencial". O ganho depende dos núcleos
+livres: com menos núcleos que ramos, os ramos dividem os processos.
+
+Uso:
+    python -m benchmarks.bench_par [--branches 2 4 8 16] [--workers 1 2 4 8 16] [--n 200000]
+"""
+import argparse
+import io
+import os
+import time
+
+from benchmarks.common import best_of, generate_par_program
+from src.lexer import lexer
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+from src.vm import closures, parallel
+
+
+def main():
+    cores = os.cpu_count() or 1
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--branches", type=int, nargs="+", default=[2, 4, 8, 16])
+    ap.add_argument("--workers", type=int, nargs="+",
+                    default=sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1))))
+    ap.add_argument("--n", type=int, default=200_000, help="iterações do laço de cada ramo")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{cores} núcleo(s)")
+    print(f"{'ramos':>6} {'processos':>10} {'sequencial (ms)':>16} {'1ª execução (ms)':>17} "
+          f"{'paralelo (ms)':>14} {'ganho':>7}")
+    for branches in args.branches:
+        ast = Parser(lexer.tokenize(generate_par_program(branches, args.n))).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+        out = io.StringIO()
+        sequential = closures.ClosureProgram(ast, analyzer.functions, out)
+        t_seq, _ = best_of(sequential.run, args.repeat)
+        expected = sequential.variables()
+
+        for workers in args.workers:
+            with parallel.ParallelRuntime(ast, analyzer.functions, workers) as runtime:
+                program = closures.ClosureProgram(ast, analyzer.functions, out, runtime)
+                start = time.perf_counter()
+                program.run()
+                t_first = time.perf_counter() - start
+                t_par, _ = best_of(program.run, args.repeat)
+                assert runtime.parallel_runs == args.repeat + 1 and program.variables() == expected
+            print(f"{branches:>6} {workers:>10} {t_seq * 1e3:>16.1f} {t_first * 1e3:>17.1f} "
+                  f"{t_par * 1e3:>14.1f} {t_seq / t_par:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
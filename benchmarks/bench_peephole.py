@@ -0,0 +1,63 @@
+"""
+Mede a otimização de saltos (src/optimizer/peephole.py) sobre o C3E sem
+outras otimizações, em um programa com laços aninhados e no programa
+sintético dos demais benchmarks. Informa as instruções e saltos (goto e
+if_false) no código e executados, antes e depois da passagem, as atuações de
+cada regra e o tempo da passagem.
+
+Os saltos executados são contados por benchmarks.common.execute.
+
+Uso:
+    python -m benchmarks.bench_peephole [--lines 10000]
+"""
+import argparse
+from collections import Counter
+
+from benchmarks.common import best_of, execute, generate_loop_program, generate_program
+from src.generator import ir
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.optimizer import peephole
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+
+JUMPS = (ir.GOTO, ir.IF_FALSE)
+
+
+def count_jumps(program):
+    return sum(op in JUMPS for op in program.ops)
+
+
+def executed(program):
+    """(instruções executadas, saltos executados)."""
+    counts = execute(program)
+    return sum(counts.values()), sum(counts[op] for op in JUMPS)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lines", type=int, default=10_000)
+    args = ap.parse_args()
+
+    corpus = {"laços": generate_loop_program(args.lines), "sintético": generate_program(args.lines)}
+    print(f"{'programa':>10} {'':>7} {'instruções':>11} {'saltos':>7} {'executadas':>11} {'saltos exec.':>13}")
+    for name, code in corpus.items():
+        ast = Parser(lexer.tokenize(code)).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+        program = CodeGenerator(None, analyzer.types).generate(ast)
+        before = (len(program), count_jumps(program)) + executed(program)
+
+        stats = Counter()
+        elapsed, _ = best_of(lambda: peephole.optimize_jumps(program, stats=stats), 1)
+        after = (len(program), count_jumps(program)) + executed(program)
+
+        for label, row in (("antes", before), ("depois", after)):
+            print(f"{name:>10} {label:>7} {row[0]:>11} {row[1]:>7} {row[2]:>11} {row[3]:>13}")
+        reduction = 1 - after[3] / before[3]
+        rules = ", ".join(f"{rule} {stats[rule]}" for rule, _ in peephole.RULES)
+        print(f"{'':>10} saltos executados: -{reduction:.1%}; regras: {rules}; tempo: {elapsed * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Mede a construção da forma SSA (src/optimizer/ssa.py) e a propagação
+esparsa condicional de constantes (src/optimizer/sccp.py) em uma única
+função de tamanho crescente, para mostrar que o tempo cresce de forma
+aproximadamente linear com o número de instruções: a coluna µs/instr. deve
+ficar estável entre os tamanhos.
+
+A função repete um bloco com laço, desvios e uma variável que só a análise
+otimista prova constante; informa as instruções da função, os blocos, as
+phis, o tempo da construção da forma SSA, o da passagem inteira (construção,
+propagação e volta ao C3E) e os desvios resolvidos.
+
+Uso:
+    python -m benchmarks.bench_ssa [--sizes 1000 4000 16000 64000]
+"""
+import argparse
+from collections import Counter
+
+from benchmarks.common import best_of
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.optimizer import cfg as cfg_module
+from src.optimizer import fold, sccp, ssa
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+
+# Bloco do corpo da função (indentado); "{i}" é substituído por um índice único.
+BLOCK = """\
+    f{i} = 1
+    k = 0
+    while (k < n):
+        if (f{i} != 1):
+            f{i} = 2
+        s = s + f{i} * k
+        k = k + 1
+    if (f{i} == 1):
+        s = s - {i}
+    else:
+        s = s + n
+"""
+
+
+def generate_function(instructions):
+    """Programa MiniPar com uma função de aproximadamente 'instructions' instruções de C3E."""
+    blocks = max(1, instructions // 24)
+    body = "".join(BLOCK.format(i=i) for i in range(blocks))
+    return f"def big(n):\n    s = 0\n{body}    return s\nprint(big(3))\n"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000, 64000],
+                    help="tamanhos aproximados da função, em instruções")
+    args = ap.parse_args()
+
+    print(f"{'instruções':>11} {'blocos':>8} {'phis':>8} {'SSA (ms)':>9} {'passagem (ms)':>14} "
+          f"{'µs/instr.':>10} {'desvios':>8}")
+    for size in args.sizes:
+        ast = Parser(lexer.tokenize(generate_function(size))).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+        program = fold.fold_constants(CodeGenerator(None, analyzer.types).generate(ast))
+        function = next(f for f in cfg_module.build_cfg(program) if f.name == "big")
+        n = len(function.indices())
+
+        build_time, form = best_of(lambda: ssa.build_ssa(program, function), 3)
+        stats = Counter()
+        total, _ = best_of(lambda: sccp.propagate_conditional_constants(program, stats), 1)
+        print(f"{n:>11} {len(function.blocks):>8} {form.phi_count():>8} {build_time * 1e3:>9.1f} "
+              f"{total * 1e3:>14.1f} {total * 1e6 / n:>10.2f} "
+              f"{stats['branches']:>8}")
+
+
+if __name__ == "__main__":
+    main()
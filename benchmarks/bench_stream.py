@@ -0,0 +1,55 @@
+"""
+Compara o pico de memória de léxico + sintaxe no modo lista (lexer.lexer) e no
+modo em fluxo (lexer.lexer_stream + buffer circular do Parser).
+
+A memória retida ao final é a própria AST; a diferença entre o pico e esse
+valor é o custo de manter os tokens.
+
+Uso:
+    python -m benchmarks.bench_stream [--sizes 10000 100000]
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+from benchmarks.common import generate_program
+from src.lexer import lexer
+from src.parser import parser
+
+
+def run_list(code):
+    return parser.Parser(lexer.lexer(code)).parse()
+
+
+def run_stream(code):
+    return parser.Parser(lexer.lexer_stream(io.StringIO(code))).parse()
+
+
+def measure(func, code):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ast = func(code)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ast
+    return elapsed, retained, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = ap.parse_args()
+
+    mb = 1024 * 1024
+    print(f"{'linhas':>10} {'modo':>7} {'tempo (s)':>10} {'AST (MB)':>9} {'pico (MB)':>10} {'extra (MB)':>11}")
+    for size in args.sizes:
+        code = generate_program(size)
+        for name, func in (("lista", run_list), ("fluxo", run_stream)):
+            elapsed, retained, peak = measure(func, code)
+            print(f"{size:>10} {name:>7} {elapsed:>10.2f} {retained / mb:>9.1f} {peak / mb:>10.1f} {(peak - retained) / mb:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Mede a tabela de símbolos achatada (src/semantic/semantic.py) em código
+profundamente aninhado com muitos identificadores: as variáveis são definidas no
+escopo global e lidas no bloco mais interno, a 'depth' escopos de distância.
+
+A primeira tabela compara as operações da tabela com uma tabela encadeada
+(um dicionário por escopo, com busca subindo pelos pais, como antes); a segunda
+roda a análise semântica completa sobre o programa aninhado.
+
+Uso:
+    python -m benchmarks.bench_symbols [--depths 10 100 1000 10000] [--names 1000]
+"""
+import argparse
+import sys
+
+from benchmarks.common import best_of
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer, SymbolTable
+
+RECURSION_LIMIT = 100
+
+
+class ChainedTable:
+    """Tabela de referência: um dicionário por escopo, busca subindo pelos pais."""
+    def __init__(self, parent=None):
+        self.symbols = {}
+        self.parent = parent
+
+    def define(self, name, value):
+        self.symbols[name] = value
+
+    def lookup(self, name):
+        table = self
+        while table is not None:
+            if name in table.symbols:
+                return table.symbols[name]
+            table = table.parent
+        raise KeyError(name)
+
+
+def chained_ops(depth, names):
+    table = ChainedTable()
+    for name in names:
+        table.define(name, {"type": "number", "initialized": True})
+    for _ in range(depth):
+        table = ChainedTable(table)
+    for name in names:
+        table.lookup(name)
+
+
+def flat_ops(depth, names):
+    table = SymbolTable()
+    for name in names:
+        table.define(name, {"type": "number", "initialized": True})
+    for _ in range(depth):
+        table.push_scope()
+    for name in names:
+        table.lookup(name)
+    for _ in range(depth):
+        table.pop_scope()
+
+
+def nested_tokens(depth, names):
+    """
+    Define 'names' no escopo global, abre 'depth' blocos if aninhados (cada um
+    com uma variável local) e, no mais interno, lê cada nome global.
+    """
+    for name in names:
+        yield from [("ID", name), ("OP", "="), ("NUMBER", "1"), ("NEWLINE", None)]
+    for level in range(depth):
+        yield from [("ID", f"l{level}"), ("OP", "="), ("NUMBER", "0"), ("NEWLINE", None)]
+        yield from [("KEYWORD", "if"), ("SYM", "("), ("BOOLEAN", "True"), ("SYM", ")"),
+                    ("SYM", ":"), ("NEWLINE", None), ("INDENT", None)]
+    for name in names:
+        yield from [("ID", "x"), ("OP", "="), ("ID", name), ("OP", "+"), ("NUMBER", "1"), ("NEWLINE", None)]
+    for _ in range(depth):
+        yield ("DEDENT", None)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--depths", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    ap.add_argument("--names", type=int, default=1_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    names = [f"v{i}" for i in range(args.names)]
+
+    print(f"{args.names} nomes globais lidos a partir do escopo mais interno")
+    print(f"{'profundidade':>12} {'encadeada (ms)':>15} {'achatada (ms)':>14}")
+    for depth in args.depths:
+        t_chain, _ = best_of(lambda: chained_ops(depth, names), args.repeat)
+        t_flat, _ = best_of(lambda: flat_ops(depth, names), args.repeat)
+        print(f"{depth:>12} {t_chain * 1e3:>15.2f} {t_flat * 1e3:>14.2f}")
+
+    print()
+    print(f"análise semântica completa (limite de recursão: {RECURSION_LIMIT})")
+    print(f"{'profundidade':>12} {'semântico (ms)':>15}")
+    for depth in args.depths:
+        ast = Parser(nested_tokens(depth, names)).parse()
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(RECURSION_LIMIT)
+        try:
+            elapsed, _ = best_of(lambda: SemanticAnalyzer(ast).analyze(), args.repeat)
+        finally:
+            sys.setrecursionlimit(old_limit)
+        print(f"{depth:>12} {elapsed * 1e3:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
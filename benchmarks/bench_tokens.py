@@ -0,0 +1,56 @@
+"""
+Compara a lista de tuplas (lexer.lexer) com o TokenStream compacto
+(lexer.tokenize): memória por token e tempo de parsing. A coluna "original"
+mede a lista produzida pelo laço antigo do lexer, com uma tupla nova por token.
+
+Uso:
+    python -m benchmarks.bench_tokens [--sizes 10000 100000]
+"""
+import argparse
+import sys
+
+from benchmarks.bench_lexer import legacy_lexer
+from benchmarks.common import best_of, generate_program
+from src.lexer import lexer
+from src.parser import parser
+
+
+def list_bytes(tokens):
+    """Memória da lista de tuplas: lista + tuplas + valores (objetos distintos contados uma vez)."""
+    seen = set()
+    total = sys.getsizeof(tokens)
+    for token in tokens:
+        for obj in (token, token[1]):
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+    return total
+
+
+def stream_bytes(stream):
+    """Memória do TokenStream: arrays + tabela de valores internados."""
+    return stream.nbytes() + sum(sys.getsizeof(s) for s in stream.strings) + sys.getsizeof(stream.strings)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>10} {'tokens':>10} {'B/tok original':>15} {'B/tok lista':>12} {'B/tok fluxo':>12} "
+          f"{'parse lista (s)':>16} {'parse fluxo (s)':>16}")
+    for size in args.sizes:
+        code = generate_program(size)
+        tokens = lexer.lexer(code)
+        stream = lexer.tokenize(code)
+        n = len(tokens)
+        t_list, _ = best_of(lambda: parser.Parser(tokens).parse(), args.repeat)
+        t_stream, _ = best_of(lambda: parser.Parser(stream).parse(), args.repeat)
+        original = list_bytes(legacy_lexer(code)) / n
+        print(f"{size:>10} {n:>10} {original:>15.1f} {list_bytes(tokens) / n:>12.1f} {stream_bytes(stream) / n:>12.1f} "
+              f"{t_list:>16.3f} {t_stream:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
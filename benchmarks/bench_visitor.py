@@ -0,0 +1,70 @@
+"""
+Mede os passes construídos sobre o visitador com pilha explícita
+(src/visitor/visitor.py): tempo por nó da análise semântica e da geração de
+C3E, e expressões longas (cadeias de binop) analisadas com um limite de
+recursão baixo, para mostrar que a profundidade da AST não usa a pilha do Python.
+
+Uso:
+    python -m benchmarks.bench_visitor [--sizes 10000 100000] [--terms 10000 100000]
+"""
+import argparse
+import sys
+
+from benchmarks.common import best_of, generate_program
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.parser import nodes
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+
+RECURSION_LIMIT = 100
+
+
+def count_nodes(root):
+    total = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        total += 1
+        stack.extend(nodes._node_children(node))
+    return total
+
+
+def passes(ast):
+    analyzer = SemanticAnalyzer(ast)
+    analyzer.analyze()
+    return CodeGenerator(None, analyzer.types).generate(ast)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--terms", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'linhas':>10} {'nós':>10} {'semântico (ns/nó)':>18} {'C3E (ns/nó)':>12}")
+    for size in args.sizes:
+        ast = Parser(lexer.tokenize(generate_program(size))).parse()
+        n = count_nodes(ast)
+        t_sem, _ = best_of(lambda: SemanticAnalyzer(ast).analyze(), args.repeat)
+        t_gen, _ = best_of(lambda: CodeGenerator().generate(ast), args.repeat)
+        print(f"{size:>10} {n:>10} {t_sem / n * 1e9:>18.0f} {t_gen / n * 1e9:>12.0f}")
+
+    print()
+    print(f"limite de recursão durante os passes: {RECURSION_LIMIT}")
+    print(f"{'operandos':>10} {'semântico + C3E (s)':>20} {'instruções':>11}")
+    for terms in args.terms:
+        code = "y = 1\nx = y" + " + y" * (terms - 1) + "\nprint(x)\n"
+        ast = Parser(lexer.tokenize(code)).parse()
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(RECURSION_LIMIT)
+        try:
+            elapsed, c3e = best_of(lambda: passes(ast), args.repeat)
+        finally:
+            sys.setrecursionlimit(old_limit)
+        print(f"{terms:>10} {elapsed:>20.3f} {len(c3e):>11}")
+
+
+if __name__ == "__main__":
+    main()
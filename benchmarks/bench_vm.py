@@ -0,0 +1,59 @@
+"""
+Mede a máquina virtual de registradores (src/vm/vm.py): para cada programa
+e nível de otimização, o tempo de carga (tradução do C3E), o tempo de
+execução e as instruções executadas por segundo, comparados com o
+interpretador mínimo dos benchmarks (benchmarks.common.execute), que consulta
+dicionários de variáveis e de rótulos a cada instrução. Esse interpretador
+não tem quadros por chamada, então não executa a recursão.
+
+Uso:
+    python -m benchmarks.bench_vm [--fib 22] [--loops 300] [--lines 2000]
+"""
+import argparse
+import io
+
+from benchmarks.common import (best_of, execute, generate_fib_program, generate_loop_program,
+                               generate_nested_loop_program)
+from src.generator.generator import CodeGenerator
+from src.lexer import lexer
+from src.optimizer import optimizer
+from src.parser.parser import Parser
+from src.semantic.semantic import SemanticAnalyzer
+from src.vm import vm
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fib", type=int, default=22, help="argumento de fib no programa recursivo")
+    ap.add_argument("--loops", type=int, default=300, help="iterações de cada laço no programa de laços aninhados")
+    ap.add_argument("--lines", type=int, default=2_000, help="linhas do programa sintético de laços")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    corpus = {
+        "recursão": (generate_fib_program(args.fib), False),
+        "laços": (generate_nested_loop_program(args.loops), True),
+        "sintético": (generate_loop_program(args.lines), True),
+    }
+    print(f"{'programa':>10} {'nível':>6} {'executadas':>11} {'carga (ms)':>11} {'VM (ms)':>9} "
+          f"{'M instr./s':>11} {'referência (ms)':>16} {'ganho':>7}")
+    for name, (code, reference) in corpus.items():
+        ast = Parser(lexer.tokenize(code)).parse()
+        analyzer = SemanticAnalyzer(ast)
+        analyzer.analyze()
+        for level in (0, optimizer.MAX_LEVEL):
+            program = optimizer.optimize(CodeGenerator(analyzer.functions, analyzer.types).generate(ast), level)
+            t_load, machine = best_of(lambda: vm.VM(program, io.StringIO()), args.repeat)
+            t_run, executed = best_of(machine.run, args.repeat)
+            row = (f"{name:>10} {level:>6} {executed:>11} {t_load * 1e3:>11.2f} {t_run * 1e3:>9.1f} "
+                   f"{executed / t_run / 1e6:>11.2f}")
+            if reference:
+                t_ref, _ = best_of(lambda: execute(program), args.repeat)
+                row += f" {t_ref * 1e3:>16.1f} {t_ref / t_run:>6.1f}x"
+            else:
+                row += f" {'-':>16} {'-':>7}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
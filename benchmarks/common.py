@@ -0,0 +1,268 @@
+"""
+Utilitários compartilhados pelos benchmarks: geração de programas MiniPar
+sintéticos, medição de tempo e contagem das instruções executadas.
+
+Os benchmarks devem ser executados a partir da raiz do repositório, por exemplo:
+    python -m benchmarks.bench_lexer
+"""
+import gc
+import math
+import time
+from collections import Counter
+
+from src.generator import ir
+from src.optimizer.fold import BINARY_FOLDS, UNARY_FOLDS
+
+HEADER = "x = 1\ny = 2\n"
+
+# Bloco de ~10 linhas, sintática e semanticamente válido, que mistura funções,
+# laços, condicionais e chamadas. "{i}" é substituído por um índice único.
+CHUNK = """\
+def f{i}(a, b):
+    return a * b + {i}
+x = x + f{i}(y, 2) * 3 - 1
+while (x > 1000):
+    x = x / 2
+    if (x < 10):
+        y = y + 1
+    else:
+        y = y - 1
+print(x, y)
+"""
+
+CHUNK_LINES = CHUNK.count("\n")
+
+# Bloco rico em literais, como o de código gerado por ferramentas: expressões
+# e condições constantes, parâmetros fixos e laços com limites conhecidos.
+LITERAL_CHUNK = """\
+n{i} = 4 * 8 + {i}
+k{i} = (n{i} - 2) * 3 / 2
+if (n{i} > 10 and not False):
+    print(n{i} * 2, k{i})
+else:
+    print(0)
+j{i} = 0
+while (j{i} < 3):
+    print(j{i} + n{i} * 2)
+    j{i} = j{i} + 1
+"""
+
+
+# Bloco aritmético com subexpressões repetidas sobre valores desconhecidos
+# (parâmetros): produtos recalculados, quadrados de somas e a mesma
+# condição testada duas vezes.
+ARITH_CHUNK = """\
+def g{i}(x, y):
+    a = x * y + {i}
+    b = (x * y + {i}) * (y * x + {i})
+    c = (a + b) * (a + b) - x * y
+    while (c > a * b):
+        c = c / 2 - x * y
+    if (a < b and c > a * b):
+        print(a < b, (a - b) * (a - b))
+    return c + x * y
+print(g{i}({i}, 3))
+"""
+
+
+# Bloco com laços aninhados, if/else no fim do corpo e retorno dentro do
+# laço: os padrões de saltos encadeados que o gerador produz.
+LOOP_CHUNK = """\
+def h{i}(n):
+    s = 0
+    k = 0
+    while (k < n):
+        k = k + 1
+        j = 0
+        while (j < k):
+            j = j + 1
+            if (j > 2):
+                s = s + j
+            else:
+                s = s - 1
+        if (s > 100):
+            return s
+    return s
+print(h{i}(8))
+"""
+
+
+# Bloco com funções auxiliares pequenas chamadas dentro de um laço: os
+# candidatos típicos à expansão de funções (inlining).
+HELPER_CHUNK = """\
+def sq{i}(v):
+    return v * v
+def clamp{i}(v, lo, hi):
+    if (v < lo):
+        return lo
+    if (v > hi):
+        return hi
+    return v
+s{i} = 0
+for (k{i} = 0; k{i} < 20; k{i} = k{i} + 1):
+    s{i} = s{i} + clamp{i}(sq{i}(k{i}) - 50, 0, 200)
+print(s{i})
+"""
+
+
+# Programas de execução longa, para medir os modos de execução: recursão
+# (muitas chamadas curtas) e laços aninhados com aritmética e desvios.
+FIB_PROGRAM = """\
+def fib(n):
+    if (n < 2):
+        return n
+    return fib(n - 1) + fib(n - 2)
+print(fib({n}))
+"""
+
+NESTED_LOOP_PROGRAM = """\
+s = 0
+for (i = 0; i < {n}; i = i + 1):
+    j = 0
+    while (j < {n}):
+        if (j * 2 > i):
+            s = s + j * 3 - i
+        else:
+            s = s - 1
+        j = j + 1
+print(s)
+"""
+
+# Bloco PAR com ramos independentes e pesados (laços e recursão), cada um
+# escrevendo a sua própria variável: o caso que se beneficia de processos.
+PAR_PROGRAM_HEAD = """\
+def work(n, k):
+    s = 0
+    for (i = 0; i < n; i = i + 1):
+        s = s + (i * k) / (i + 1)
+    return s
+def fib(n):
+    if (n < 2):
+        return n
+    return fib(n - 1) + fib(n - 2)
+"""
+
+
+def generate_fib_program(n):
+    """Programa que calcula fib(n) recursivamente."""
+    return FIB_PROGRAM.format(n=n)
+
+
+def generate_nested_loop_program(n):
+    """Programa com dois laços aninhados de 'n' iterações cada."""
+    return NESTED_LOOP_PROGRAM.format(n=n)
+
+
+def generate_par_program(branches, n):
+    """
+    Programa com um bloco PAR de 'branches' ramos pesados: ramos pares somam
+    'n' termos em um laço e ímpares calculam um fib recursivo de custo parecido.
+    """
+    names = [f"r{k}" for k in range(branches)]
+    fib_n = round(math.log(max(n, 2), 1.618))
+    lines = [PAR_PROGRAM_HEAD] + [f"{name} = 0\n" for name in names] + ["PAR:\n"]
+    for k, name in enumerate(names):
+        call = f"work({n}, {k + 1})" if k % 2 == 0 else f"fib({fib_n})"
+        lines.append(f"    {name} = {call}\n")
+    lines.append(f"print({', '.join(names)})\n")
+    return "".join(lines)
+
+
+def generate_helper_program(n_lines):
+    """Gera um programa MiniPar com funções auxiliares pequenas com aproximadamente 'n_lines' linhas."""
+    chunks = max(1, n_lines // HELPER_CHUNK.count("\n"))
+    return "".join(HELPER_CHUNK.format(i=i) for i in range(chunks))
+
+
+def generate_loop_program(n_lines):
+    """Gera um programa MiniPar com laços aninhados com aproximadamente 'n_lines' linhas."""
+    chunks = max(1, n_lines // LOOP_CHUNK.count("\n"))
+    return "".join(LOOP_CHUNK.format(i=i) for i in range(chunks))
+
+
+def generate_arith_program(n_lines):
+    """Gera um programa MiniPar aritmético, rico em subexpressões comuns, com aproximadamente 'n_lines' linhas."""
+    chunks = max(1, n_lines // ARITH_CHUNK.count("\n"))
+    return "".join(ARITH_CHUNK.format(i=i) for i in range(chunks))
+
+
+def generate_literal_program(n_lines):
+    """Gera um programa MiniPar rico em literais com aproximadamente 'n_lines' linhas."""
+    chunks = max(1, n_lines // LITERAL_CHUNK.count("\n"))
+    return "".join(LITERAL_CHUNK.format(i=i) for i in range(chunks))
+
+
+def generate_program(n_lines):
+    """Gera um programa MiniPar com aproximadamente 'n_lines' linhas."""
+    chunks = max(1, n_lines // CHUNK_LINES)
+    return HEADER + "".join(CHUNK.format(i=i) for i in range(chunks))
+
+
+def best_of(func, repeat=3):
+    """
+    Executa 'func' 'repeat' vezes e retorna (melhor tempo em segundos, último resultado).
+    Como no módulo timeit, o coletor de lixo fica desligado durante a medição.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best, result
+
+
+def execute(program):
+    """
+    Executa o C3E (ir.IRProgram) e retorna um Counter com o número de
+    instruções executadas por opcode. Interpretador mínimo, suficiente para os
+    programas gerados aqui: sem canais nem recursão, e sem saída ('print' não
+    faz nada).
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    labels = {a[i]: i for i, op in enumerate(ops) if op == ir.LABEL}
+    env = {}
+    params, frames = [], []
+    counts = [0] * len(ir.OP_NAMES)
+
+    def value(x):
+        return x.value if type(x) is ir.Const else env[x]
+
+    pc = 0
+    while pc < len(ops):
+        op, d, x, y = ops[pc], dest[pc], a[pc], b[pc]
+        pc += 1
+        counts[op] += 1
+        if op == ir.COPY:
+            env[d] = value(x)
+        elif op in BINARY_FOLDS:
+            env[d] = BINARY_FOLDS[op][1](value(x), value(y))
+        elif op in UNARY_FOLDS:
+            env[d] = UNARY_FOLDS[op][1](value(x))
+        elif op == ir.GOTO:
+            pc = labels[x]
+        elif op == ir.IF_FALSE:
+            if not value(x):
+                pc = labels[y]
+        elif op == ir.PARAM:
+            params.append(value(x))
+        elif op == ir.CALL:
+            args = params[len(params) - y:]
+            del params[len(params) - y:]
+            if x in labels:
+                frames.append((pc, d, args[::-1]))
+                pc = labels[x]
+            else:
+                env[d] = None  # função embutida (print)
+        elif op == ir.GET_PARAM:
+            env[d] = frames[-1][2].pop(0)
+        elif op == ir.RETURN:
+            pc, d, _ = frames.pop()
+            env[d] = None if x is None else value(x)
+    return Counter({code: n for code, n in enumerate(counts) if n})
@@ -1,88 +1,292 @@
 from src.lexer import lexer
-from src.parser import parser
+from src.lexer.tokens import decode
+from src.parser import parser, nodes
 from src.semantic import semantic
 from src.generator import generator  
+from src.generator import bytecode
+from src.optimizer import optimizer
+from src.cache import cache
+from src.vm import vm
+from src.vm import transpile
+from src.vm import closures
+from src.vm import parallel
+
+import argparse
+import os
+import time
 
 '''
 As funções "Write" realizam a escrita em arquivos para facilitar a visualização.
 São de caráter temporário e estão aqui apenas por conveniência na hora de debugar o código e mostrar os resultados ao professor.
 '''
 
+def format_token(ttype, value):
+    if ttype == "KEYWORD":
+        return f"<{value}>"
+    elif ttype in {"NUMBER", "ID", "BOOLEAN", "STRING"}:
+        return f"<{ttype.lower()}, {value}>"
+    elif ttype in {"OP", "SYM"}:
+        return f"<{value}>"
+    elif ttype in {"INDENT", "DEDENT"}:
+        return f"<{ttype}>"
+    else:
+        return f"<{ttype}, {value}>"
+
+
 def write_tokens_to_file(tokens, filename="tokens.txt"):
-    formatted_tokens = []
-    for ttype, value in tokens:
-        if ttype == "KEYWORD":
-            formatted_tokens.append(f"<{value}>")
-        elif ttype in {"NUMBER", "ID", "BOOLEAN", "STRING"}:
-            formatted_tokens.append(f"<{ttype.lower()}, {value}>")
-        elif ttype in {"OP", "SYM"}:
-            formatted_tokens.append(f"<{value}>")
-        elif ttype in {"INDENT", "DEDENT"}:
-            formatted_tokens.append(f"<{ttype}>")
-        else:
-            formatted_tokens.append(f"<{ttype}, {value}>")
+    formatted_tokens = [format_token(ttype, value) for ttype, value in tokens]
 
     with open(filename, "w", encoding="utf-8") as f:
         f.write(" ".join(formatted_tokens))
 
 
+def tee_tokens_to_file(tokens, f):
+    """
+    Repassa os tokens codificados de um iterador adiante enquanto os escreve em
+    'f', no mesmo formato de write_tokens_to_file (usado no modo --stream).
+    """
+    sep = ""
+    for token in tokens:
+        f.write(sep + format_token(*decode(token[0], token[1])))
+        sep = " "
+        yield token
+
+
 def write_ast_to_file(ast, filename="ast.txt"):
-    def format_ast(node, level=0):
+    # Converte a AST tipada (ou a arena) para o formato de tuplas e formata
+    # iterativamente, para suportar blocos profundamente aninhados.
+    lines = []
+    stack = [(nodes.to_tuple(ast), 0)]
+    while stack:
+        node, level = stack.pop()
         pad = "  " * level
         if isinstance(node, tuple):
-            head = node[0]
-            children = node[1:]
-            lines = [f"{pad}{head}"]
-            for child in children:
-                lines.append(format_ast(child, level + 1))
-            return "\n".join(lines)
+            lines.append(f"{pad}{node[0]}")
+            stack.extend((child, level + 1) for child in reversed(node[1:]))
         elif isinstance(node, list):
-            return "\n".join(format_ast(item, level) for item in node)
+            if not node:
+                lines.append("")  # lista vazia (ex.: chamada sem argumentos) vira linha em branco
+            stack.extend((item, level) for item in reversed(node))
         else:
-            return f"{pad}{repr(node)}"
+            lines.append(f"{pad}{repr(node)}")
 
     with open(filename, "w", encoding="utf-8") as f:
-        f.write(format_ast(ast))
+        f.write("\n".join(lines))
 
-def write_c3e_to_file(instructions, filename="c3e.txt"):
-    """Salva a lista de instruções C3E em um arquivo, uma por linha."""
+def write_c3e_to_file(program, filename="c3e.txt"):
+    """Salva o programa C3E (ir.IRProgram) em um arquivo, uma instrução por linha."""
     with open(filename, "w", encoding="utf-8") as f:
-        f.write("\n".join(instructions))
+        f.write(program.render())
 
 
-def main():
+def run_program(program):
+    """Executa o programa C3E na máquina virtual e informa as instruções por segundo."""
+    machine = vm.VM(program)
+    start = time.perf_counter()
     try:
-        with open("entrada.txt", "r", encoding="utf-8") as f:
-            code = f.read()
+        executed = machine.run()
+    except vm.VMError as ve:
+        print(f"❌ {ve}")
+    else:
+        elapsed = time.perf_counter() - start
+        rate = executed / elapsed if elapsed > 0 else float("inf")
+        print(f"✅ Execução concluída: {executed} instruções em {elapsed:.3f} s "
+              f"({rate:,.0f} instruções/s).")
 
-        
-        tokens = lexer.lexer(code)
-        write_tokens_to_file(tokens)
-        print("✅ Análise léxica concluída com sucesso! Tokens salvos em 'tokens.txt'.")
 
-       
-        p = parser.Parser(tokens)
-        ast = p.parse()
+def run_python(ast, functions, program, code_cache=None):
+    """
+    Executa o programa traduzido para um módulo Python (src/vm/transpile.py);
+    se a tradução não for possível, executa o C3E na máquina virtual.
+    """
+    start = time.perf_counter()
+    try:
+        module = transpile.PythonModule(ast, functions, cache=code_cache)
+    except transpile.TranspileError as te:
+        print(f"⚠️ {te}; executando na máquina virtual.")
+        run_program(program)
+        return
+    loaded = time.perf_counter()
+    try:
+        module.run()
+    except vm.VMError as ve:
+        print(f"❌ {ve}")
+    else:
+        print(f"✅ Execução concluída (Python): tradução e compilação em {loaded - start:.3f} s, "
+              f"execução em {time.perf_counter() - loaded:.3f} s.")
+
+
+def run_closures(ast, functions, program, workers=None):
+    """
+    Executa o programa compilado para closures (src/vm/closures.py); com
+    'workers' (0: um processo por núcleo), os blocos PAR executam em paralelo
+    em um pool de processos (src/vm/parallel.py). Se o programa for profundo
+    demais para a pilha do Python, executa o C3E na máquina virtual.
+    """
+    runtime = parallel.ParallelRuntime(ast, functions, workers) if workers is not None else None
+    start = time.perf_counter()
+    try:
+        compiled_program = closures.ClosureProgram(ast, functions, runtime=runtime)
+        compiled = time.perf_counter()
+        compiled_program.run()
+    except vm.VMError as ve:
+        print(f"❌ {ve}")
+    except closures.RecursionLimitError as le:
+        print(f"⚠️ {le}; executando na máquina virtual (a saída já impressa, se houver, se repete).")
+        run_program(program)
+    else:
+        print(f"✅ Execução concluída (closures): compilação em {compiled - start:.3f} s, "
+              f"execução em {time.perf_counter() - compiled:.3f} s.")
+    finally:
+        if runtime is not None:
+            runtime.close()
+            print(f"✅ Blocos PAR: {runtime.parallel_runs} em paralelo ({runtime.workers} processo(s)), "
+                  f"{runtime.sequential_runs} em sequência.")
+
+
+def run_bytecode(args):
+    """
+    Entrada já compilada (.gpc): carrega o módulo binário, grava o texto C3E
+    desmontado em 'c3e.txt' e, com --run, o executa.
+    """
+    try:
+        with bytecode.load(args.source) as module:
+            program = module.to_program()
+    except FileNotFoundError:
+        print(f"❌ Erro: Arquivo '{args.source}' não encontrado.")
+        return
+    except bytecode.BytecodeError as be:
+        print(f"❌ Erro no módulo binário: {be}")
+        return
+    write_c3e_to_file(program)
+    print(f"✅ Módulo '{args.source}' carregado ({len(program)} instruções)! C3E salvo em 'c3e.txt'.")
+    if args.run:
+        run_program(program)
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Compilador MiniPar (GigaPar2025).")
+    ap.add_argument("source", nargs="?", default="entrada.txt",
+                    help=f"arquivo de entrada (padrão: entrada.txt); um módulo '{bytecode.SUFFIX}' já "
+                         "compilado é apenas desmontado em 'c3e.txt' (e executado com --run)")
+    ap.add_argument("--stream", action="store_true",
+                    help="lê e tokeniza o arquivo linha a linha, sem carregá-lo inteiro na memória "
+                         "(não usa o cache)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="não lê nem grava o cache de análise em disco")
+    ap.add_argument("--cache-dir", default=cache.DEFAULT_DIR,
+                    help=f"diretório do cache de análise (padrão: {cache.DEFAULT_DIR})")
+    ap.add_argument("-O", dest="opt_level", type=int, nargs="?", const=1, default=0,
+                    metavar="NÍVEL",
+                    help=f"otimiza o código de 3 endereços (-O equivale a -O1; máximo: {optimizer.MAX_LEVEL})")
+    ap.add_argument("--run", action="store_true",
+                    help="executa o código de 3 endereços gerado na máquina virtual e informa as instruções por segundo")
+    ap.add_argument("--engine", choices=("vm", "python", "closures"), default="vm",
+                    help="modo de execução de --run: 'vm' (padrão) executa o C3E na máquina virtual; "
+                         "'python' traduz a AST para um módulo Python e o executa; "
+                         "'closures' compila a AST para closures Python e as executa")
+    ap.add_argument("--workers", type=int, nargs="?", const=0, default=None, metavar="N",
+                    help="com --engine closures, executa os blocos PAR do programa principal em um pool "
+                         "de N processos (sem N: um por núcleo)")
+    ap.add_argument("--gpc", action="store_true",
+                    help=f"grava também o código de 3 endereços no formato binário em 'c3e{bytecode.SUFFIX}'")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.source.endswith(bytecode.SUFFIX):
+        run_bytecode(args)
+        return
+    parse_cache = key = entry = types = None
+    validated = False
+    try:
+        if args.stream:
+            # Lexer e parser trabalham em fluxo: o arquivo é lido linha a linha e os
+            # tokens seguem direto para o parser enquanto são gravados em tokens.txt.
+            with open(args.source, "r", encoding="utf-8") as f, \
+                    open("tokens.txt", "w", encoding="utf-8") as tokens_file:
+                tokens = tee_tokens_to_file(lexer.lexer_stream(f, coded=True), tokens_file)
+                p = parser.Parser(tokens)
+                ast = p.parse()
+            print("✅ Análise léxica concluída com sucesso! Tokens salvos em 'tokens.txt'.")
+        else:
+            with open(args.source, "r", encoding="utf-8") as f:
+                code = f.read()
+
+            if not args.no_cache:
+                parse_cache = cache.ParseCache(args.cache_dir)
+                key = parse_cache.key(code)
+                entry = parse_cache.load(key)
+
+            if entry is not None:
+                # Acerto no cache: nenhuma análise léxica ou sintática é refeita.
+                # O tokens.txt de uma compilação anterior (talvez de outro
+                # programa) é apagado, para não ficar ao lado dos novos arquivos.
+                ast, validated, types = entry
+                try:
+                    os.remove("tokens.txt")
+                except OSError:
+                    pass
+                print(f"✅ AST carregada do cache '{args.cache_dir}' (sem análise léxica; "
+                      "'tokens.txt' não foi gerado, use --no-cache para gerá-lo).")
+            else:
+                tokens = lexer.tokenize(code)
+                write_tokens_to_file(tokens)
+                print("✅ Análise léxica concluída com sucesso! Tokens salvos em 'tokens.txt'.")
+
+                p = parser.Parser(tokens)
+                ast = p.parse()
         write_ast_to_file(ast)
         print("✅ Análise sintática concluída com sucesso! AST salva em 'ast.txt'.")
 
         
         try:
             
-            analyzer = semantic.SemanticAnalyzer(ast)
-            analyzer.analyze()
+            analyzer = None
+            if not validated:
+                try:
+                    analyzer = semantic.SemanticAnalyzer(ast)
+                    analyzer.analyze()
+                    validated = True
+                    types = analyzer.types
+                finally:
+                    # Grava a AST recém-analisada junto com o resultado semântico.
+                    if parse_cache is not None and entry is None:
+                        parse_cache.store(key, ast, validated, types)
+            elif args.run or args.opt_level >= optimizer.FUNCTION_INFO_LEVEL:
+                # AST validada vinda do cache: a análise é refeita só para obter
+                # as informações das funções usadas pelo otimizador e pela
+                # máquina virtual (os locais de cada função).
+                analyzer = semantic.SemanticAnalyzer(ast)
+                analyzer.analyze()
             print("✅ Análise semântica concluída com sucesso!")
 
             
-            code_gen = generator.CodeGenerator()
+            code_gen = generator.CodeGenerator(analyzer.functions if analyzer is not None else None, types)
             three_address_code = code_gen.generate(ast)
+            if args.opt_level:
+                before = len(three_address_code)
+                optimizer.optimize(three_address_code, args.opt_level)
+                print(f"✅ Otimização -O{args.opt_level}: {before} -> {len(three_address_code)} instruções.")
             write_c3e_to_file(three_address_code)
             print("✅ Geração de código de 3 endereços concluída! Salvo em 'c3e.txt'.")
+            if args.gpc:
+                bytecode.dump(three_address_code, "c3e" + bytecode.SUFFIX)
+                print(f"✅ Módulo binário salvo em 'c3e{bytecode.SUFFIX}'.")
+
+            if args.run and args.engine == "python":
+                code_cache = None if args.no_cache else cache.CodeCache(args.cache_dir)
+                run_python(ast, analyzer.functions, three_address_code, code_cache)
+            elif args.run and args.engine == "closures":
+                run_closures(ast, analyzer.functions, three_address_code, args.workers)
+            elif args.run:
+                run_program(three_address_code)
         except semantic.SemanticError as se:
             print(f"❌ Erro semântico: {se}")
 
     except FileNotFoundError:
-        print("❌ Erro: Arquivo 'entrada.txt' não encontrado.")
+        print(f"❌ Erro: Arquivo '{args.source}' não encontrado.")
     except Exception as e:
         print(f"❌ Ocorreu um erro: {e}")
         
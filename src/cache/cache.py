@@ -0,0 +1,207 @@
+import gc
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import zlib
+
+from src.lexer import lexer, tokens
+from src.parser import nodes, parser
+from src.semantic import semantic
+from src.visitor import visitor
+
+# =================================================
+# CACHE DE ANÁLISE EM DISCO
+# =================================================
+# Guarda a AST já analisada de cada programa, como os arquivos .pyc do Python.
+# A chave é o hash do código-fonte junto com a "versão" do compilador (o hash
+# dos módulos do front-end), então qualquer mudança no lexer, no parser, no
+# analisador semântico ou no visitador sobre o qual ele é construído invalida
+# as entradas antigas.
+
+MAGIC = b"GPAC\x02"
+DEFAULT_DIR = ".minipar_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+SUFFIX = ".gpast"
+CODE_SUFFIX = ".gpyc"
+# Entradas que dividem o diretório e o limite de tamanho (ParseCache e CodeCache).
+_SUFFIXES = (SUFFIX, CODE_SUFFIX)
+
+_FRONT_END = (lexer, tokens, parser, nodes, semantic, visitor)
+_compiler_version = None
+
+
+def compiler_version():
+    """Hash dos módulos do front-end do compilador (calculado uma vez por processo)."""
+    global _compiler_version
+    if _compiler_version is None:
+        digest = hashlib.sha256(MAGIC + sys.version.encode())
+        for module in _FRONT_END:
+            with open(module.__file__, "rb") as f:
+                digest.update(f.read())
+        _compiler_version = digest.hexdigest()
+    return _compiler_version
+
+
+class ParseCache:
+    """
+    Diretório de entradas '<chave>.gpast', cada uma com a AST serializada em
+    registros planos (nodes.to_records) e o resultado da análise semântica
+    (se passou e os tipos inferidos das operações, SemanticAnalyzer.types, pela
+    posição do registro de cada nó), gravados com marshal e comprimidos com zlib.
+
+    As escritas são atômicas (arquivo temporário + os.replace) e o tamanho total
+    do diretório, contando também as entradas de CodeCache, é limitado a
+    'max_bytes': ao passar do limite, as entradas usadas há mais tempo, de
+    qualquer tipo, são removidas (LRU pela data de modificação, atualizada a
+    cada acerto). Falhas de E/S nunca interrompem a compilação: o cache apenas deixa
+    de ser usado.
+    """
+
+    suffix = SUFFIX
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, code):
+        """Chave da entrada de 'code' para a versão atual do compilador."""
+        digest = hashlib.sha256(compiler_version().encode())
+        digest.update(code.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def load(self, key):
+        """
+        Retorna (ast, validado, tipos) para a chave, ou None se não houver
+        entrada válida. 'validado' indica que a AST já passou pela análise
+        semântica sem erros, e 'tipos' são os tipos que ela inferiu (nó -> tipo).
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        if not data.startswith(MAGIC):
+            self._remove(path)
+            return None
+        try:
+            # A reconstrução cria centenas de milhares de nós sem ciclos; com o
+            # coletor ligado, as varreduras dominariam o tempo de carga.
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                validated, records, types = marshal.loads(zlib.decompress(data[len(MAGIC):]))
+                built = []
+                ast = nodes.from_records(records, built if types else None)
+                return ast, validated, {built[index]: t for index, t in types.items()}
+            finally:
+                if enabled:
+                    gc.enable()
+        except (zlib.error, ValueError, EOFError, TypeError, IndexError):
+            self._remove(path)
+            return None
+
+    def store(self, key, ast, validated=False, types=None):
+        """Grava a entrada de forma atômica e aplica o limite de tamanho do diretório."""
+        positions = {} if types else None
+        records = nodes.to_records(ast, positions)
+        types = {positions[node]: t for node, t in types.items()} if types else {}
+        self._write(key, MAGIC + zlib.compress(marshal.dumps((bool(validated), records, types)), 1))
+
+    def _write(self, key, data):
+        tmp = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path(key))
+        except OSError:
+            if tmp is not None:
+                self._remove(tmp)
+            return
+        self.evict()
+
+    def evict(self, suffixes=_SUFFIXES):
+        """
+        Remove as entradas menos usadas até as entradas com os sufixos
+        'suffixes' (por padrão, as de todos os caches) caberem em max_bytes.
+        """
+        try:
+            with os.scandir(self.directory) as it:
+                entries = [(e.stat().st_mtime, e.stat().st_size, e.path)
+                           for e in it if e.name.endswith(suffixes)]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Apaga todas as entradas deste cache (as do outro tipo ficam)."""
+        max_bytes, self.max_bytes = self.max_bytes, -1
+        try:
+            self.evict((self.suffix,))
+        finally:
+            self.max_bytes = max_bytes
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# =================================================
+# CACHE DOS MÓDULOS PYTHON GERADOS
+# =================================================
+CODE_MAGIC = b"GPYC\x01"
+
+
+class CodeCache(ParseCache):
+    """
+    Cache dos módulos Python gerados a partir dos programas (src/vm/transpile.py):
+    cada entrada '<chave>.gpyc' guarda o objeto de código já compilado do
+    texto do módulo, gravado com marshal. A chave é o hash do texto e da
+    versão do Python (o formato do marshal muda entre versões). Divide o
+    diretório, as escritas atômicas e o limite de tamanho com ParseCache: o
+    limite vale para a soma das entradas dos dois tipos.
+    """
+
+    suffix = CODE_SUFFIX
+
+    def key(self, source):
+        digest = hashlib.sha256(CODE_MAGIC + sys.version.encode())
+        digest.update(source.encode("utf-8"))
+        return digest.hexdigest()
+
+    def load(self, key):
+        """Objeto de código da chave, ou None se não houver entrada válida."""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        try:
+            if not data.startswith(CODE_MAGIC):
+                raise ValueError
+            return marshal.loads(data[len(CODE_MAGIC):])
+        except (ValueError, EOFError, TypeError):
+            self._remove(path)
+            return None
+
+    def store(self, key, code):
+        """Grava o objeto de código de forma atômica e aplica o limite de tamanho do diretório."""
+        self._write(key, CODE_MAGIC + marshal.dumps(code))
@@ -0,0 +1,374 @@
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+
+from src.generator import ir
+
+# =================================================
+# FORMATO BINÁRIO DE MÓDULO (.gpc)
+# =================================================
+# Guarda o programa C3E (ir.IRProgram) em binário, para ser carregado de novo
+# sem analisar texto. O arquivo tem um cabeçalho e seções de bytes ou de
+# inteiros de 32 bits sem sinal (little-endian), todas alinhadas a 4 bytes:
+#
+#   cabeçalho   MAGIC, versão, SHA-256 do restante do arquivo, nº de
+#               temporários e a (posição, tamanho) de cada seção;
+#   strings     os textos (lexemas das constantes e nomes), em UTF-8;
+#   consts      (tipo, início, tamanho) de cada constante, na ordem dos ids;
+#   names       (início, tamanho) de cada nome (variáveis, parâmetros, canais
+#               e funções);
+#   labels      posição da instrução LABEL de cada rótulo de salto L<n>;
+#   functions   (nome, posição do rótulo, início e nº de locais, nº de
+#               parâmetros) de cada rótulo de função, com NONE para as
+#               embutidas; os locais (e, no início deles, os parâmetros) são
+#               os da análise semântica (IRProgram.function_info);
+#   locals      índices de nomes das listas de locais;
+#   tuples      listas de nomes das instruções 'receive' (tamanho e índices);
+#   ops         o opcode de cada instrução (um byte);
+#   dest, a, b  os operandos de cada instrução, uma palavra por instrução.
+#
+# Como no IRProgram, as instruções ficam em vetores paralelos de largura fixa
+# (a i-ésima instrução é ops[i], dest[i], a[i], b[i]). Cada operando ocupa
+# uma palavra: 4 bits de tipo e 28 de valor (temporário, índice de nome, de
+# constante, de rótulo, de função, de lista ou inteiro).
+#
+# load() mapeia o arquivo com mmap e só lê o cabeçalho e as tabelas pequenas:
+# as seções são memoryviews sobre o mapeamento, e as instruções são
+# decodificadas apenas quando pedidas (to_program, disassemble).
+
+MAGIC = b"GPC\x00"
+VERSION = 1
+SUFFIX = ".gpc"
+
+# magic, versão, reservado, sha256, nº de temporários e (posição, tamanho) das seções
+_SECTIONS = ("strings", "consts", "names", "labels", "functions", "locals", "tuples", "ops", "dest", "a", "b")
+_BYTE_SECTIONS = ("strings", "ops")  # tamanho em bytes, e não em palavras
+HEADER = struct.Struct("<4sHH32sI" + "II" * len(_SECTIONS))
+
+NONE = 0xFFFFFFFF  # posição ou índice ausente nas tabelas
+
+# Tipos de operando (4 bits altos da palavra).
+_TAG_SHIFT = 28
+_VALUE_MASK = (1 << _TAG_SHIFT) - 1
+T_NONE, T_TEMP, T_NAME, T_CONST, T_LABEL, T_FUNC, T_INT, T_TUPLE = range(8)
+
+CONST_TYPES = ("number", "string", "boolean")
+
+if array("I").itemsize != 4:
+    raise ImportError("o formato .gpc precisa de array('I') com 4 bytes")
+_LITTLE = sys.byteorder == "little"
+
+
+class BytecodeError(Exception):
+    """Arquivo .gpc inválido (formato, versão ou conteúdo corrompido)."""
+
+
+# =================================================
+# ESCRITA
+# =================================================
+class _Writer:
+    def __init__(self, program):
+        self.program = program
+        self.strings = bytearray()
+        self.names = {}          # nome -> índice
+        self.name_words = array("I")
+        self.consts = {}         # Const -> índice
+        self.tuples = array("I")
+
+    def text(self, s):
+        data = s.encode("utf-8")
+        start = len(self.strings)
+        self.strings += data
+        return start, len(data)
+
+    def name(self, s):
+        n = self.names.get(s)
+        if n is None:
+            n = self.names[s] = len(self.names)
+            self.name_words.extend(self.text(s))
+        return n
+
+    def operand(self, x):
+        t = type(x)
+        if x is None:
+            return NONE
+        if t is int:
+            return (T_TEMP << _TAG_SHIFT) | x
+        if t is str:
+            return (T_NAME << _TAG_SHIFT) | self.name(x)
+        if t is ir.Const:
+            return (T_CONST << _TAG_SHIFT) | self.consts[x]
+        if t is ir.Label:
+            if self.program.functions.get(x.text) is x:
+                return (T_FUNC << _TAG_SHIFT) | x.id
+            return (T_LABEL << _TAG_SHIFT) | x.id
+        if t is tuple:
+            offset = len(self.tuples)
+            self.tuples.append(len(x))
+            self.tuples.extend(self.name(v) for v in x)
+            return (T_TUPLE << _TAG_SHIFT) | offset
+        raise TypeError(f"operando sem codificação: {x!r}")
+
+    def build(self):
+        program = self.program
+        ops, dest, a, b = program.ops, program.dest, program.a, program.b
+
+        consts = array("I")
+        for type_code, type_name in enumerate(CONST_TYPES):
+            for c in sorted(program.consts[type_name].values(), key=lambda c: c.id):
+                self.consts[c] = len(self.consts)
+                consts.append(type_code)
+                consts.extend(self.text(c.text))
+
+        code = array("I"), array("I"), array("I")
+        labels = array("I", [NONE]) * len(program.labels)
+        positions = {}
+        for i, op in enumerate(ops):
+            x, y = a[i], b[i]
+            if op == ir.LABEL:
+                positions[x] = i
+            # O campo 'b' de call e send é o número de argumentos, não um temporário.
+            encoded_b = (T_INT << _TAG_SHIFT) | y if op == ir.CALL or op == ir.SEND else self.operand(y)
+            code[0].append(self.operand(dest[i]))
+            code[1].append(self.operand(x))
+            code[2].append(encoded_b)
+        for label, i in positions.items():
+            if program.functions.get(label.text) is not label:
+                labels[label.id] = i
+
+        functions = array("I")
+        local_words = array("I")
+        for f in sorted(program.functions.values(), key=lambda f: f.id):
+            info = program.function_info.get(f.text)
+            start, count, nparams = NONE, 0, 0
+            if info is not None:
+                params = list(info.get("params", ()))
+                others = sorted(set(info["locals"]) - set(params))
+                start, count, nparams = len(local_words), len(params) + len(others), len(params)
+                local_words.extend(self.name(v) for v in params + others)
+            functions.extend((self.name(f.text), positions.get(f, NONE), start, count, nparams))
+
+        sections = [bytes(self.strings), consts, self.name_words, labels, functions,
+                    local_words, self.tuples, bytes(ops), *code]
+        layout = []
+        chunks = []
+        offset = HEADER.size
+        for section in sections:
+            data = section if type(section) is bytes else _to_bytes(section)
+            layout.extend((offset, len(section)))
+            # Seções de bytes são completadas até 4 bytes, para alinhar as seguintes.
+            data += b"\0" * (-len(data) % 4)
+            chunks.append(data)
+            offset += len(data)
+        payload = b"".join(chunks)
+        header = HEADER.pack(MAGIC, VERSION, 0, hashlib.sha256(payload).digest(), program.temp_count, *layout)
+        return header + payload
+
+
+def _to_bytes(words):
+    if not _LITTLE:
+        words = array("I", words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def dumps(program):
+    """Conteúdo .gpc (bytes) do programa C3E."""
+    return _Writer(program).build()
+
+
+def dump(program, path):
+    """Grava o programa C3E no arquivo .gpc 'path'."""
+    with open(path, "wb") as f:
+        f.write(dumps(program))
+
+
+# =================================================
+# LEITURA
+# =================================================
+class BytecodeModule:
+    """
+    Módulo .gpc carregado: as seções são vistas (memoryview de palavras)
+    sobre os bytes do arquivo, sem cópia: 'ops' (bytes) e 'dest', 'a' e 'b'
+    (palavras) são os vetores paralelos das instruções; len() é o número de
+    instruções.
+    """
+
+    def __init__(self, data, verify=True, close=None):
+        self._close = close
+        self._views = [memoryview(data)]
+        try:
+            self._open(self._views[0], verify)
+        except BaseException:
+            self._release()
+            raise
+
+    def _open(self, view, verify):
+        if len(view) < HEADER.size:
+            raise BytecodeError("arquivo .gpc truncado")
+        fields = HEADER.unpack_from(view)
+        magic, version, _, digest, self.temp_count = fields[:5]
+        if magic != MAGIC:
+            raise BytecodeError("não é um arquivo .gpc")
+        if version != VERSION:
+            raise BytecodeError(f"versão {version} do formato .gpc não suportada (esperada {VERSION})")
+        if verify and hashlib.sha256(view[HEADER.size:]).digest() != digest:
+            raise BytecodeError("conteúdo do arquivo .gpc corrompido (hash diferente)")
+        self.digest = digest
+        layout = fields[5:]
+        sections = {}
+        for k, name in enumerate(_SECTIONS):
+            offset, size = layout[2 * k], layout[2 * k + 1]
+            end = offset + (size if name in _BYTE_SECTIONS else 4 * size)
+            if end > len(view):
+                raise BytecodeError(f"seção '{name}' fora do arquivo")
+            section = view[offset:end]
+            self._views.append(section)
+            if name not in _BYTE_SECTIONS:
+                section = _words(section)
+                self._views.append(section)
+            sections[name] = section
+        self.strings = sections["strings"]
+        self.ops, self.dest, self.a, self.b = (sections[name] for name in ("ops", "dest", "a", "b"))
+        self.labels = sections["labels"]
+        self._sections = sections
+        self._names = None
+
+    # ----- tabelas (decodificadas uma vez, no primeiro uso) -----
+    def text(self, start, size):
+        return bytes(self.strings[start:start + size]).decode("utf-8")
+
+    @property
+    def names(self):
+        if self._names is None:
+            w = self._sections["names"]
+            self._names = [self.text(w[k], w[k + 1]) for k in range(0, len(w), 2)]
+        return self._names
+
+    def const_entries(self):
+        """(tipo, lexema) de cada constante, na ordem dos índices."""
+        w = self._sections["consts"]
+        return [(CONST_TYPES[w[k]], self.text(w[k + 1], w[k + 2])) for k in range(0, len(w), 3)]
+
+    def function_entries(self):
+        """(nome, posição do rótulo ou None, parâmetros, locais ou None) de cada rótulo de função."""
+        w, local_words, names = self._sections["functions"], self._sections["locals"], self.names
+        entries = []
+        for k in range(0, len(w), 5):
+            name, position, start, count, nparams = w[k:k + 5]
+            if start == NONE:
+                params = local = None
+            else:
+                local = [names[v] for v in local_words[start:start + count]]
+                params = local[:nparams]
+            entries.append((names[name], None if position == NONE else position, params, local))
+        return entries
+
+    def __len__(self):
+        return len(self.ops)
+
+    # ----- instruções -----
+    def _decoder(self, program):
+        names = self.names
+        consts = program.consts_by_index
+        labels, functions = program.labels, program.function_labels
+        tuples = self._sections["tuples"]
+
+        def operand(word):
+            if word == NONE:
+                return None
+            tag, value = word >> _TAG_SHIFT, word & _VALUE_MASK
+            if tag == T_TEMP:
+                return value
+            if tag == T_NAME:
+                return names[value]
+            if tag == T_CONST:
+                return consts[value]
+            if tag == T_LABEL:
+                return labels[value]
+            if tag == T_FUNC:
+                return functions[value]
+            if tag == T_INT:
+                return value
+            if tag == T_TUPLE:
+                return tuple(names[v] for v in tuples[value + 1:value + 1 + tuples[value]])
+            raise BytecodeError(f"operando com tipo desconhecido: {tag}")
+
+        return operand
+
+    def to_program(self):
+        """Reconstrói o ir.IRProgram (com os locais das funções em function_info)."""
+        program = ir.IRProgram()
+        program.consts_by_index = [program.const(t, text) for t, text in self.const_entries()]
+        program.function_labels = []
+        for name, _, params, local in self.function_entries():
+            program.function_labels.append(program.function(name))
+            if local is not None:
+                program.function_info[name] = {"params": params, "locals": set(local)}
+        for _ in range(len(self.labels)):
+            program.new_label()
+        program.temp_count = self.temp_count
+
+        operand = self._decoder(program)
+        program.replace(self.ops, [operand(w) for w in self.dest],
+                        [operand(w) for w in self.a], [operand(w) for w in self.b])
+        del program.consts_by_index, program.function_labels
+        return program
+
+    def disassemble(self):
+        """Texto C3E do módulo, idêntico ao de IRProgram.render() do programa gravado."""
+        return self.to_program().render()
+
+    def _release(self):
+        for view in reversed(self._views):
+            if type(view) is memoryview:
+                view.release()
+        self._views = []
+
+    def close(self):
+        """Libera as vistas sobre o arquivo e desfaz o mapeamento (em load)."""
+        self.ops = self.dest = self.a = self.b = self.labels = self.strings = None
+        self._sections = {}
+        self._release()
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _words(view):
+    if _LITTLE:
+        return view.cast("I")
+    words = array("I", view)
+    words.byteswap()
+    return words
+
+
+def loads(data, verify=True):
+    """BytecodeModule sobre o conteúdo .gpc 'data' (bytes)."""
+    return BytecodeModule(data, verify)
+
+
+def load(path, verify=True):
+    """
+    Mapeia o arquivo .gpc 'path' na memória (mmap) e retorna o BytecodeModule;
+    com 'verify', confere o hash do conteúdo. close() desfaz o mapeamento.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # arquivo vazio não pode ser mapeado
+            raise BytecodeError("arquivo .gpc vazio") from None
+    try:
+        module = BytecodeModule(mapping, verify, mapping.close)
+    except BaseException:
+        mapping.close()
+        raise
+    return module
@@ -1,316 +1,292 @@
-class CodeGenerator:
+from src.generator import ir
+from src.parser.nodes import ID
+from src.visitor.visitor import Visitor, postorder
+
+
+class CodeGenerator(Visitor):
     """
     Gera Código de 3 Endereços (C3E) a partir de uma AST semanticamente validada.
 
+    As instruções são quádruplas de src/generator/ir.py, acumuladas em um
+    ir.IRProgram; o texto do C3E só é montado quando pedido (IRProgram.render).
+    Os handlers visit_<tag> visitam os filhos com 'yield filho' e devolvem o
+    endereço (operando: variável, temporário ou constante) do resultado, quando houver.
+
+    'types' é o tipo de cada operação inferido pela análise semântica
+    (SemanticAnalyzer.types): com ele, o '+' vira soma de números (add) ou
+    concatenação de strings (concat); sem ele, ou com tipo desconhecido, vira
+    add_any, resolvido na execução.
     """
-    def __init__(self):
-        self.instructions = []  # A lista de instruções C3E geradas
-        self.temp_counter = 0   # Contador para variáveis temporárias (t0, t1, ...)
-        self.label_counter = 0  # Contador para rótulos (L0, L1, ...)
+    def __init__(self, functions=None, types=None):
+        self.code = ir.IRProgram()  # O programa C3E gerado
+        if functions is not None:
+            # informações das funções registradas pela análise semântica (SemanticAnalyzer.functions)
+            self.code.function_info = functions
+        self.types = types if types is not None else {}
         self.current_function_end_label = None  # rótulo de fim da função atual (se em função)
 
-    # ===========================
-    # Métodos Utilitários
-    # ===========================
-    def new_temp(self):
-        """Cria, registra e retorna uma nova variável temporária."""
-        temp = f"t{self.temp_counter}"
-        self.temp_counter += 1
-        return temp
-
-    def new_label(self):
-        """Cria e retorna um novo rótulo para saltos."""
-        label = f"L{self.label_counter}"
-        self.label_counter += 1
-        return label
-
-    def add_instruction(self, instruction):
-        """Adiciona uma instrução formatada à lista de instruções."""
-        self.instructions.append(instruction)
+        # Métodos utilitários, tomados diretamente do programa:
+        self.emit = self.code.emit            # acrescenta uma instrução (opcode, dest, a, b)
+        self.new_temp = self.code.new_temp    # novo temporário (t0, t1, ...)
+        self.new_label = self.code.new_label  # novo rótulo para saltos (L0, L1, ...)
+        self.const = self.code.const          # constante internada, por (tipo, lexema)
 
     # ===========================
     # Ponto de Entrada e Visitor
     # ===========================
     def generate(self, node):
-        """Ponto de entrada: inicia a geração e retorna a lista de instruções."""
+        """Ponto de entrada: inicia a geração e retorna o programa (ir.IRProgram)."""
         self.visit(node)
-        return self.instructions
-
-    def visit(self, node):
-        """
-        Método visitor principal que despacha para o método correto
-        baseado no tipo do nó da AST.
-        """
-        if node is None:
-            return None  # Partes opcionais do 'for' podem ser None
-
-        # A AST é baseada em tuplas, onde o primeiro elemento é o tipo do nó.
-        nodetype = node[0]
-        method_name = f'visit_{nodetype}'
-
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node):
-        raise Exception(f'Nenhum método visit_{node[0]} encontrado')
+        return self.code
 
     # ============================================
     # Visitor para ESTRUTURAS GERAIS E BLOCOS
     # ============================================
-    def visit_program(self, node):
+    @postorder("stmts")
+    def visit_program(self, node, _):
         # ("program", stmts)
-        self.visit(node[1])
+        return None
 
-    def visit_stmts(self, node):
+    @postorder("*body")
+    def visit_stmts(self, node, *_):
         # ("stmts", [stmt1, stmt2, ...])
-        for stmt in node[1]:
-            self.visit(stmt)
+        return None
 
-    def visit_seq_stmt(self, node):
+    @postorder("body")
+    def visit_seq_stmt(self, node, _):
         # ("seq_stmt", stmts)
-        self.visit(node[1])
+        return None
 
     def visit_par_stmt(self, node):
         # ("par_stmt", stmts)
-        self.add_instruction("# BEGIN PARALLEL BLOCK")
-        self.visit(node[1])
-        self.add_instruction("# END PARALLEL BLOCK")
+        self.emit(ir.PAR_BEGIN)
+        yield node.body
+        self.emit(ir.PAR_END)
 
     # ========================================
     # Visitor para EXPRESSÕES
     # ========================================
-    def visit_number(self, node): return node[1]
-    def visit_string(self, node): return node[1]
-    def visit_boolean(self, node): return node[1]
-    def visit_id(self, node): return node[1]
+    def visit_number(self, node): return self.const("number", node.value)
+    def visit_string(self, node): return self.const("string", node.value)
+    def visit_boolean(self, node): return self.const("boolean", node.value)
+    def visit_id(self, node): return node.value
 
-    def visit_binop(self, node):
+    @postorder("left", "right")
+    def visit_binop(self, node, left_addr, right_addr):
         # ("binop", op, left, right)
-        op, left_node, right_node = node[1], node[2], node[3]
-
-        left_addr = self.visit(left_node)
-        right_addr = self.visit(right_node)
+        if node.op == "+":
+            op = ir.ADD_OPS.get(self.types.get(node), ir.ADD_ANY)
+        else:
+            op = ir.BINARY_OPS[node.op]
 
         result_addr = self.new_temp()
-        self.add_instruction(f"{result_addr} = {left_addr} {op} {right_addr}")
+        self.emit(op, result_addr, left_addr, right_addr)
 
         return result_addr
 
-    def visit_unop(self, node):
+    @postorder("expr")
+    def visit_unop(self, node, expr_addr):
         # ("unop", op, expr)
-        op, expr_node = node[1], node[2]
+        op = ir.UNARY_OPS[node.op]
 
-        expr_addr = self.visit(expr_node)
         result_addr = self.new_temp()
 
         # O operador unário é prefixado
-        self.add_instruction(f"{result_addr} = {op} {expr_addr}")
+        self.emit(op, result_addr, expr_addr)
 
         return result_addr
 
     # ========================================
     # Visitor para COMANDOS (STATEMENTS)
     # ========================================
-    def visit_assignment(self, node):
+    @postorder("expr")
+    def visit_assignment(self, node, expr_addr):
         # ("assignment", var_name, expr)
-        var_name, expr_node = node[1], node[2]
+        var_name = node.name
 
-        expr_addr = self.visit(expr_node)
-        self.add_instruction(f"{var_name} = {expr_addr}")
+        self.emit(ir.COPY, var_name, expr_addr)
 
     def visit_if(self, node):
         # ("if", cond, true_block)
-        cond_node, true_block_node = node[1], node[2]
-
         end_label = self.new_label()
 
-        cond_addr = self.visit(cond_node)
-        self.add_instruction(f"if_false {cond_addr} goto {end_label}")
+        cond_addr = yield node.cond
+        self.emit(ir.IF_FALSE, a=cond_addr, b=end_label)
 
-        self.visit(true_block_node)
+        yield node.body
 
-        self.add_instruction(f"{end_label}:")
+        self.emit(ir.LABEL, a=end_label)
 
     def visit_if_else(self, node):
         # ("if_else", cond, true_block, false_block)
-        cond_node, true_block_node, false_block_node = node[1], node[2], node[3]
-
         else_label = self.new_label()
         end_label = self.new_label()
 
-        cond_addr = self.visit(cond_node)
-        self.add_instruction(f"if_false {cond_addr} goto {else_label}")
+        cond_addr = yield node.cond
+        self.emit(ir.IF_FALSE, a=cond_addr, b=else_label)
 
-        self.visit(true_block_node)
-        self.add_instruction(f"goto {end_label}")
+        yield node.body
+        self.emit(ir.GOTO, a=end_label)
 
-        self.add_instruction(f"{else_label}:")
-        self.visit(false_block_node)
+        self.emit(ir.LABEL, a=else_label)
+        yield node.orelse
 
-        self.add_instruction(f"{end_label}:")
+        self.emit(ir.LABEL, a=end_label)
 
     def visit_while(self, node):
         # ("while", cond, body)
-        cond_node, body_node = node[1], node[2]
-
         start_label = self.new_label()
         end_label = self.new_label()
 
-        self.add_instruction(f"{start_label}:")
+        self.emit(ir.LABEL, a=start_label)
 
-        cond_addr = self.visit(cond_node)
-        self.add_instruction(f"if_false {cond_addr} goto {end_label}")
+        cond_addr = yield node.cond
+        self.emit(ir.IF_FALSE, a=cond_addr, b=end_label)
 
-        self.visit(body_node)
-        self.add_instruction(f"goto {start_label}")
+        yield node.body
+        self.emit(ir.GOTO, a=start_label)
 
-        self.add_instruction(f"{end_label}:")
+        self.emit(ir.LABEL, a=end_label)
 
     def visit_for(self, node):
         # ("for", init, cond, update, body)
-        init_node, cond_node, update_node, body_node = node[1], node[2], node[3], node[4]
+        init_node, cond_node, update_node, body_node = node.init, node.cond, node.update, node.body
 
         start_label = self.new_label()
         end_label = self.new_label()
 
         # inicialização (pode ser None)
         if init_node:
-            self.visit(init_node)
+            yield init_node
 
-        self.add_instruction(f"{start_label}:")
+        self.emit(ir.LABEL, a=start_label)
 
         if cond_node:
-            cond_addr = self.visit(cond_node)
-            self.add_instruction(f"if_false {cond_addr} goto {end_label}")
+            cond_addr = yield cond_node
+            self.emit(ir.IF_FALSE, a=cond_addr, b=end_label)
 
         if body_node:
-            self.visit(body_node)
+            yield body_node
         if update_node:
-            self.visit(update_node)
+            yield update_node
 
-        self.add_instruction(f"goto {start_label}")
+        self.emit(ir.GOTO, a=start_label)
 
-        self.add_instruction(f"{end_label}:")
+        self.emit(ir.LABEL, a=end_label)
 
     def visit_channel_stmt(self, node):
         # ("channel_stmt", name, comp1, comp2)
-        name, c1, c2 = node[1], node[2], node[3]
-        self.add_instruction(f"channel_decl {name}, {c1}, {c2}")
+        self.emit(ir.CHANNEL_DECL, node.name, node.comp1, node.comp2)
 
     # ========================================
     # Visitor para FUNÇÕES
     # ========================================
     def visit_function_stmt(self, node):
         # ("function_stmt", name, params, body)
-        name, params, body_node = node[1], node[2], node[3]
+        name, params = node.name, node.params
 
         # Rótulo para pular a definição da função durante execução normal
         end_func_label = self.new_label()
-        self.add_instruction(f"goto {end_func_label}")
+        self.emit(ir.GOTO, a=end_func_label)
 
         # Início da definição da função
-        self.add_instruction(f"{name}:")
-        self.add_instruction("begin_func")
+        self.emit(ir.LABEL, a=self.code.function(name))
+        self.emit(ir.BEGIN_FUNC)
         for param in params:
-            self.add_instruction(f"get_param {param}")  # instrução para receber o parâmetro
+            self.emit(ir.GET_PARAM, param)  # instrução para receber o parâmetro
 
         # marca o rótulo de fim da função para que 'return' saiba para onde saltar
         prev_end_label = self.current_function_end_label
         self.current_function_end_label = end_func_label
 
         # gera corpo
-        self.visit(body_node)
+        yield node.body
 
         # se o corpo não tiver retorno explícito, garantimos um retorno "void"
         # (emitimos instrução de retorno vazia antes do end da função)
-        self.add_instruction("return")
+        self.emit(ir.RETURN)
 
         # fim da definição
-        self.add_instruction("end_func")
-        self.add_instruction(f"{end_func_label}:")
+        self.emit(ir.END_FUNC)
+        self.emit(ir.LABEL, a=end_func_label)
 
         # restaura o rótulo anterior (caso de funções aninhadas)
         self.current_function_end_label = prev_end_label
 
-    def visit_call(self, node):
-        # ("call", func_name, [args])
-        return self._handle_call(node)
-
-    def visit_builtin_call(self, node):
-        # ("builtin_call", func_name, [args])
-        return self._handle_call(node)
+    @postorder("*args")
+    def visit_call(self, node, *arg_addrs):
+        # ("call", func_name, [args]) / ("builtin_call", func_name, [args])
+        func_name = node.name
 
-    def _handle_call(self, node):
-        func_name, args_nodes = node[1], node[2]
-
-        # 1. Avalia todos os argumentos primeiro
-        arg_addrs = [self.visit(arg) for arg in args_nodes]
+        # 1. Os argumentos já foram avaliados (pós-ordem)
 
         # 2. Empurra os parâmetros para a chamada (em ordem inversa é comum)
         for arg_addr in reversed(arg_addrs):
-            self.add_instruction(f"param {arg_addr}")
+            self.emit(ir.PARAM, a=arg_addr)
 
         # 3. Prepara um temporário para o valor de retorno
         return_addr = self.new_temp()
 
         # 4. Gera a instrução de chamada
-        self.add_instruction(f"{return_addr} = call {func_name}, {len(arg_addrs)}")
+        self.emit(ir.CALL, return_addr, self.code.function(func_name), len(arg_addrs))
 
         return return_addr
 
+    visit_builtin_call = visit_call
+
     # ========================================
     # RETURN
     # ========================================
     def visit_return_stmt(self, node):
         # ("return_stmt", expr ou None)
-        expr = node[1]
+        expr = node.expr
 
         if expr is None:
             # retorno vazio (void)
-            self.add_instruction("return")
+            self.emit(ir.RETURN)
         else:
-            ret_addr = self.visit(expr)
-            self.add_instruction(f"return {ret_addr}")
+            ret_addr = yield expr
+            self.emit(ir.RETURN, a=ret_addr)
 
         # garante que o fluxo salte para o fim da função (se estivermos dentro de uma função)
         if self.current_function_end_label is not None:
-            self.add_instruction(f"goto {self.current_function_end_label}")
+            self.emit(ir.GOTO, a=self.current_function_end_label)
 
     # ========================================
     # SUPORTE A CHANNEL SEND / RECEIVE
     # ========================================
-    def visit_channel_send(self, node):
+    @postorder("*args")
+    def visit_channel_send(self, node, *arg_addrs):
         # ("channel_send", channel_name, [args])
-        channel_name, args = node[1], node[2]
+        channel_name = node.channel
 
-        # Avalia todos os argumentos
-        arg_addrs = [self.visit(arg) for arg in args]
+        # Os argumentos já foram avaliados (pós-ordem)
 
         # Empilha parâmetros (ordem inversa é comum nas convenções de C3E)
         for a in reversed(arg_addrs):
-            self.add_instruction(f"param {a}")
+            self.emit(ir.PARAM, a=a)
 
         # Emite instrução de envio para o canal. Convenção usada:
         #   send <channel>, <n_params>
         # o runtime/IR pode consumir os 'param' anteriores.
-        self.add_instruction(f"send {channel_name}, {len(arg_addrs)}")
+        self.emit(ir.SEND, a=channel_name, b=len(arg_addrs))
 
         # send não produz valor intermediário
         return None
 
     def visit_channel_receive(self, node):
         # ("channel_receive", channel_name, [args])
-        channel_name, args = node[1], node[2]
+        channel_name, args = node.channel, node.args
 
         # Esperamos que cada arg seja um nó ('id', name). Geramos instrução:
         #   receive <channel>, var1, var2, ...
         # que coloca os valores recebidos diretamente nas variáveis indicadas.
         var_names = []
         for a in args:
-            if a[0] != "id":
+            if a.kind != ID:
                 raise Exception("Argumentos de receive devem ser variáveis (id).")
-            var_names.append(a[1])
+            var_names.append(a.value)
 
-        self.add_instruction(f"receive {channel_name}, {', '.join(var_names)}")
+        self.emit(ir.RECEIVE, tuple(var_names), channel_name)
 
         return None
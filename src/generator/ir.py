@@ -0,0 +1,304 @@
+from array import array
+
+# =================================================
+# REPRESENTAÇÃO INTERMEDIÁRIA (C3E ESTRUTURADO)
+# =================================================
+# O gerador de código emite quádruplas (opcode, destino, a, b) guardadas em
+# vetores paralelos, em vez de linhas de texto. Os operandos são:
+#   int    temporário: o número n de t<n> (criar um temporário não aloca nada);
+#   str    variável do programa (inclui parâmetros e canais): o próprio nome;
+#   Const  constante literal, internada por (tipo, lexema);
+#   Label  rótulo de salto (L<n>) ou nome de função (alvo de 'call').
+# Constantes e rótulos são internados (um único objeto por valor), então as
+# passagens posteriores comparam operandos por identidade e os usam como chaves
+# de dicionário sem re-analisar texto. O texto do C3E (c3e.txt) é produzido sob demanda por render()/lines().
+
+(
+    COPY,
+    ADD, SUB, MUL, DIV, EQ, NE, LT, GT, LE, GE, AND, OR, CONCAT, ADD_ANY,
+    NEG, NOT,
+    LABEL, GOTO, IF_FALSE,
+    BEGIN_FUNC, END_FUNC, GET_PARAM, PARAM, CALL, RETURN,
+    CHANNEL_DECL, SEND, RECEIVE,
+    PAR_BEGIN, PAR_END,
+) = range(31)
+
+OP_NAMES = [
+    "copy",
+    "add", "sub", "mul", "div", "eq", "ne", "lt", "gt", "le", "ge", "and", "or", "concat", "add_any",
+    "neg", "not",
+    "label", "goto", "if_false",
+    "begin_func", "end_func", "get_param", "param", "call", "return",
+    "channel_decl", "send", "receive",
+    "par_begin", "par_end",
+]
+
+# Operador da AST (BinOp.op / UnOp.op) -> opcode, e o inverso para a impressão.
+BINARY_OPS = {
+    "+": ADD, "-": SUB, "*": MUL, "/": DIV,
+    "==": EQ, "!=": NE, "<": LT, ">": GT, "<=": LE, ">=": GE,
+    "and": AND, "or": OR,
+}
+UNARY_OPS = {"-": NEG, "not": NOT}
+SYMBOLS = {code: op for table in (BINARY_OPS, UNARY_OPS) for op, code in table.items()}
+# O '+' da AST tem uma instrução por tipo dos operandos, inferido pela análise
+# semântica (SemanticAnalyzer.types): ADD soma números, CONCAT concatena
+# strings e ADD_ANY, para operandos de tipo desconhecido (ex.: resultados de
+# chamadas recursivas), decide entre as duas na execução.
+ADD_OPS = {"number": ADD, "string": CONCAT}
+SYMBOLS[CONCAT] = "++"
+SYMBOLS[ADD_ANY] = "+?"
+
+BINARY = frozenset(BINARY_OPS.values()) | {CONCAT, ADD_ANY}
+UNARY = frozenset(UNARY_OPS.values())
+# Opcodes que leem um valor no campo 'a' (os binários leem também 'b').
+READS_A = BINARY | UNARY | {COPY, IF_FALSE, PARAM, RETURN}
+# Opcodes que escrevem um valor em 'dest'.
+WRITES_DEST = BINARY | UNARY | {COPY, CALL, GET_PARAM}
+# Opcodes após os quais a execução nunca segue para a instrução seguinte.
+NO_FALLTHROUGH = frozenset({GOTO, RETURN})
+
+
+# =================================================
+# OPERANDOS
+# =================================================
+def literal_value(type, text):
+    """
+    Valor Python de uma constante: int ou float para números, bool para
+    booleanos. Strings ficam como o próprio lexema (com aspas e escapes).
+    """
+    if type == "number":
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+    if type == "boolean":
+        return text == "True"
+    return text
+
+
+class Const:
+    """
+    Constante literal; 'type' é "number", "string" ou "boolean", 'text' o
+    lexema e 'value' o valor Python correspondente (ver literal_value).
+    """
+    __slots__ = ("text", "type", "value", "id")
+
+    def __init__(self, text, type, id):
+        self.text = text
+        self.type = type
+        self.value = literal_value(type, text)
+        self.id = id
+
+    def __repr__(self):
+        return f"Const({self.text})"
+
+
+class Label:
+    """Rótulo de salto (L<n>) ou de função; 'id' é o seu número no programa."""
+    __slots__ = ("text", "id")
+
+    def __init__(self, text, id):
+        self.text = text
+        self.id = id
+
+    def __repr__(self):
+        return f"Label({self.text})"
+
+
+def operand_text(x):
+    """Texto de um operando no C3E."""
+    if type(x) is int:
+        return f"t{x}"
+    if type(x) is str:
+        return x
+    return x.text
+
+
+# =================================================
+# INSTRUÇÕES
+# =================================================
+# Uso dos campos (destino, a, b) por opcode:
+#   COPY            dest = a
+#   ADD ... ADD_ANY dest = a <op> b
+#   NEG, NOT        dest = <op> a
+#   LABEL, GOTO     a = rótulo
+#   IF_FALSE        a = condição, b = rótulo
+#   GET_PARAM       dest = parâmetro
+#   PARAM           a = argumento
+#   CALL            dest = temporário do retorno, a = rótulo da função, b = nº de argumentos
+#   RETURN          a = valor ou None
+#   CHANNEL_DECL    dest = canal, a e b = computadores
+#   SEND            a = canal, b = nº de argumentos
+#   RECEIVE         dest = tupla de variáveis, a = canal
+
+
+def defs(op, dest, a, b):
+    """Variáveis e temporários escritos pela instrução."""
+    if op in WRITES_DEST:
+        return (dest,)
+    if op == RECEIVE:
+        return dest
+    if op == CHANNEL_DECL:
+        return (dest, a, b)
+    return ()
+
+
+def uses(op, dest, a, b):
+    """Variáveis, temporários e constantes lidos pela instrução (inclui o canal de send/receive)."""
+    if op in BINARY:
+        return (a, b)
+    if op in READS_A or op == SEND or op == RECEIVE:
+        return () if a is None else (a,)
+    return ()
+
+
+# =================================================
+# IMPRESSÃO
+# =================================================
+_text = operand_text
+
+
+def _binary(op):
+    symbol = SYMBOLS[op]
+    return lambda d, a, b: f"{_text(d)} = {_text(a)} {symbol} {_text(b)}"
+
+
+def _unary(op):
+    symbol = SYMBOLS[op]
+    return lambda d, a, b: f"{_text(d)} = {symbol} {_text(a)}"
+
+
+# Impressora de cada opcode, indexada pelo opcode; recebe (dest, a, b).
+_RENDER = [None] * len(OP_NAMES)
+_RENDER[COPY] = lambda d, a, b: f"{_text(d)} = {_text(a)}"
+for _op in BINARY:
+    _RENDER[_op] = _binary(_op)
+for _op in UNARY_OPS.values():
+    _RENDER[_op] = _unary(_op)
+_RENDER[LABEL] = lambda d, a, b: f"{a.text}:"
+_RENDER[GOTO] = lambda d, a, b: f"goto {a.text}"
+_RENDER[IF_FALSE] = lambda d, a, b: f"if_false {_text(a)} goto {b.text}"
+_RENDER[BEGIN_FUNC] = lambda d, a, b: "begin_func"
+_RENDER[END_FUNC] = lambda d, a, b: "end_func"
+_RENDER[GET_PARAM] = lambda d, a, b: f"get_param {d}"
+_RENDER[PARAM] = lambda d, a, b: f"param {_text(a)}"
+_RENDER[CALL] = lambda d, a, b: f"{_text(d)} = call {a.text}, {b}"
+_RENDER[RETURN] = lambda d, a, b: "return" if a is None else f"return {_text(a)}"
+_RENDER[CHANNEL_DECL] = lambda d, a, b: f"channel_decl {d}, {a}, {b}"
+_RENDER[SEND] = lambda d, a, b: f"send {a}, {b}"
+_RENDER[RECEIVE] = lambda d, a, b: f"receive {a}, {', '.join(d)}"
+_RENDER[PAR_BEGIN] = lambda d, a, b: "# BEGIN PARALLEL BLOCK"
+_RENDER[PAR_END] = lambda d, a, b: "# END PARALLEL BLOCK"
+
+
+def render_quad(op, dest=None, a=None, b=None):
+    """Texto C3E de uma instrução, no formato de c3e.txt."""
+    return _RENDER[op](dest, a, b)
+
+
+# =================================================
+# PROGRAMA
+# =================================================
+class IRProgram:
+    """
+    Programa C3E em vetores paralelos: a i-ésima instrução é
+    (ops[i], dest[i], a[i], b[i]). Comporta-se como uma sequência dessas tuplas
+    (len, índice, iteração).
+
+    Constantes e rótulos de função são internados pelo texto;
+    temporários e rótulos de salto são sempre novos (new_temp/new_label),
+    numerados em ordem.
+    """
+
+    def __init__(self):
+        self.ops = array("B")
+        self.dest = []
+        self.a = []
+        self.b = []
+        self.consts = {"number": {}, "string": {}, "boolean": {}}  # tipo -> lexema -> Const
+        self.functions = {}  # nome -> Label
+        self.labels = []     # Label de salto por número
+        self.temp_count = 0
+        # Informações da análise semântica sobre cada função (nome -> dict com
+        # params, param_types, locals, ...), quando disponíveis; ver SemanticAnalyzer.functions.
+        self.function_info = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        return zip(self.ops, self.dest, self.a, self.b)
+
+    def __getitem__(self, i):
+        return self.ops[i], self.dest[i], self.a[i], self.b[i]
+
+    # ----- operandos -----
+    def const(self, type, text):
+        table = self.consts[type]
+        c = table.get(text)
+        if c is None:
+            c = table[text] = Const(text, type, len(table))
+        return c
+
+    def constant(self, value):
+        """Constante internada para um valor Python (bool, int ou float), como os calculados pelas otimizações."""
+        if type(value) is bool:
+            return self.const("boolean", "True" if value else "False")
+        return self.const("number", repr(value))
+
+    def function(self, name):
+        f = self.functions.get(name)
+        if f is None:
+            f = self.functions[name] = Label(name, len(self.functions))
+        return f
+
+    def defined_functions(self):
+        """Rótulos das funções definidas no programa (as demais são embutidas, como print)."""
+        functions = set(self.functions.values())
+        return {a for op, a in zip(self.ops, self.a) if op == LABEL and a in functions}
+
+    def new_temp(self):
+        n = self.temp_count
+        self.temp_count = n + 1
+        return n
+
+    def new_label(self):
+        label = Label(f"L{len(self.labels)}", len(self.labels))
+        self.labels.append(label)
+        return label
+
+    # ----- instruções -----
+    def emit(self, op, dest=None, a=None, b=None):
+        """Acrescenta uma instrução ao fim do programa."""
+        self.ops.append(op)
+        self.dest.append(dest)
+        self.a.append(a)
+        self.b.append(b)
+
+    def replace(self, ops, dest, a, b):
+        """Substitui todas as instruções pelos vetores dados (usado pelas otimizações)."""
+        self.ops = array("B", ops)
+        self.dest = dest
+        self.a = a
+        self.b = b
+
+    def filter(self, keep):
+        """Mantém apenas as instruções i com keep[i] verdadeiro (usado pelas otimizações)."""
+        if all(keep):
+            return
+        ops, dest, a, b = self.ops, self.dest, self.a, self.b
+        indices = [i for i, k in enumerate(keep) if k]
+        self.replace([ops[i] for i in indices], [dest[i] for i in indices],
+                     [a[i] for i in indices], [b[i] for i in indices])
+
+    # ----- impressão -----
+    def lines(self):
+        """Gera o texto C3E de cada instrução, em ordem."""
+        render = _RENDER
+        for op, dest, a, b in zip(self.ops, self.dest, self.a, self.b):
+            yield render[op](dest, a, b)
+
+    def render(self):
+        """Texto completo do C3E, idêntico ao de c3e.txt."""
+        return "\n".join(self.lines())
@@ -0,0 +1,107 @@
+from bisect import bisect_left
+
+from .lexer import scan_line
+from .tokens import DEDENT, INDENT, TokenStream
+
+# =================================================
+# LEXER INCREMENTAL
+# =================================================
+
+class IncrementalLexer:
+    """
+    Mantém os tokens de um documento linha a linha para que edições retokenizem
+    apenas as linhas afetadas.
+
+    Guardamos:
+        stream         - TokenStream do documento inteiro, incluindo os
+                         DEDENTs finais; cada edição troca no lugar só os
+                         tokens das linhas refeitas
+        checkpoints[i] - tupla com o indent_stack no início da linha i
+
+    Os tokens estão em ordem de linha, então os da linha i são achados por
+    busca binária em stream.lines; nenhum índice por linha precisa ser
+    atualizado. Inserir ou remover linhas ainda renumera os tokens seguintes,
+    mas em uma única passada em C sobre o array de linhas (TokenStream.splice);
+    uma edição dentro das linhas existentes não toca no resto do documento.
+
+    Os tokens de uma linha dependem apenas do seu texto e do indent_stack antes
+    dela. Assim, após uma edição, basta retokenizar a partir da primeira linha
+    alterada até que o estado de indentação volte a coincidir com o checkpoint
+    antigo: dali em diante todos os tokens são iguais aos anteriores.
+    """
+
+    def __init__(self, code=""):
+        self.lines = []
+        self.stream = TokenStream()
+        self.checkpoints = []
+        self.final_stack = (0,)
+        self.edit(0, 0, code.splitlines())
+
+    def edit(self, start, end, new_lines):
+        """
+        Substitui as linhas [start, end) (base 0, fim exclusivo) por 'new_lines'.
+
+        Retorna o intervalo [start, stop) de linhas, já na nova numeração, cujos
+        tokens foram refeitos. Em caso de erro léxico, o ValueError é propagado
+        e o documento permanece inalterado.
+        """
+        if not 0 <= start <= end <= len(self.lines):
+            raise IndexError(f"Intervalo de linhas inválido: [{start}, {end}).")
+
+        delta = len(new_lines) - (end - start)
+        stack = list(self.checkpoints[start]) if start < len(self.checkpoints) else list(self.final_stack)
+        state = tuple(stack)
+
+        tokens_out = []
+        checkpoints_out = []
+
+        def relex(line, lineno):
+            nonlocal state
+            checkpoints_out.append(state)
+            tokens = scan_line(line, lineno, stack)
+            if tokens and (tokens[0][0] == INDENT or tokens[0][0] == DEDENT):
+                state = tuple(stack)
+            tokens_out.append(tokens)
+
+        for i, line in enumerate(new_lines):
+            relex(line, start + i + 1)
+
+        # Continua pelas linhas seguintes até o estado convergir com o antigo.
+        stop = end
+        while stop < len(self.lines) and state != self.checkpoints[stop]:
+            relex(self.lines[stop], stop + delta + 1)
+            stop += 1
+
+        # Tokens das linhas [start, stop), ainda na numeração antiga; se a
+        # edição vai até o fim, os DEDENTs finais também são refeitos.
+        stream = self.stream
+        first = bisect_left(stream.lines, start + 1)
+        at_end = stop == len(self.lines)
+        last = len(stream) if at_end else bisect_left(stream.lines, stop + 1, first)
+        coded = [token for tokens in tokens_out for token in tokens]
+        if at_end:
+            eof_line = len(self.lines) + delta + 1
+            coded += [(DEDENT, None, eof_line, 1)] * (len(state) - 1)
+        stream.splice(first, last, coded, delta)
+
+        self.lines[start:end] = new_lines
+        self.checkpoints[start:stop] = checkpoints_out
+        if at_end:
+            self.final_stack = state
+        return start, stop + delta
+
+    def set_text(self, code):
+        """Retokeniza o documento inteiro."""
+        self.edit(0, len(self.lines), code.splitlines())
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def tokens(self):
+        """
+        TokenStream do documento, no mesmo formato de lexer.tokenize(),
+        incluindo os DEDENTs que fecham os blocos no fim. É o próprio fluxo
+        mantido pelas edições (sem cópia): as edições seguintes o alteram.
+        """
+        return self.stream
@@ -1,5 +1,10 @@
 import re
 
+from .tokens import (
+    CHANNEL_RECEIVE, CHANNEL_SEND, DEDENT, FIXED_CODES, FIXED_TUPLES, ID, INDENT,
+    NEWLINE, TOKEN_TYPES, VALUED_CODES, TokenStream,
+)
+
 # =================================================
 # DEFINIÇÕES GLOBAIS
 # =================================================
@@ -11,10 +16,10 @@ KEYWORDS = {
 
 TOKEN_REGEX = [
     # Reconhecimento de chamadas de canal deve vir ANTES de ID.
-    ("CHANNEL_CALL", r"\b[a-zA-Z_]\w*\.(send|receive)\b"),
-    ("NUMBER",  r"\b\d+(\.\d+)?\b"),
-    ("BOOLEAN", r"\b(True|False)\b"),
-    ("STRING",  r'"([^"\\]|\\.)*"'),
+    ("CHANNEL_CALL", r"\b[a-zA-Z_]\w*\.(?:send|receive)\b"),
+    ("NUMBER",  r"\b\d+(?:\.\d+)?\b"),
+    ("BOOLEAN", r"\b(?:True|False)\b"),
+    ("STRING",  r'"(?:[^"\\]|\\.)*"'),
     ("ID",      r"\b[a-zA-Z_]\w*\b"),
     ("OP",      r"==|!=|<=|>=|=|\+|-|\*|/|<|>"),
     ("SYM",     r"[{}();:,]"),
@@ -22,6 +27,25 @@ TOKEN_REGEX = [
 
 COMPILED_REGEXES = [(ttype, re.compile(pattern)) for ttype, pattern in TOKEN_REGEX]
 
+# Padrão único com alternativas nomeadas, na MESMA ordem de TOKEN_REGEX.
+# Como a alternância do 're' tenta as opções da esquerda para a direita na
+# mesma posição, o resultado é idêntico ao laço antigo sobre COMPILED_REGEXES,
+# mas com uma única chamada ao motor de regex por token. O prefixo \s* consome
+# os espaços que precedem o token (antes tratados caractere a caractere).
+MASTER_REGEX = re.compile(
+    r"\s*(?:" + "|".join(f"(?P<{ttype}>{pattern})" for ttype, pattern in TOKEN_REGEX) + ")"
+)
+
+# Índice (match.lastindex) de cada grupo do padrão mestre.
+_GROUP_INDEX = MASTER_REGEX.groupindex
+_ID_GROUP = _GROUP_INDEX["ID"]
+_CHANNEL_GROUP = _GROUP_INDEX["CHANNEL_CALL"]
+
+# Código do token para os grupos cujo código não depende do valor.
+_GROUP_CODES = [None] * (MASTER_REGEX.groups + 1)
+for _ttype in ("NUMBER", "BOOLEAN", "STRING"):
+    _GROUP_CODES[_GROUP_INDEX[_ttype]] = VALUED_CODES[_ttype]
+
 # =================================================
 # FUNÇÃO PRINCIPAL DO LEXER
 # =================================================
@@ -30,71 +54,113 @@ def lexer(code):
     """
     Realiza a análise léxica com suporte à indentação e retorna uma lista de tokens estruturados.
     """
-    tokens = []
-    indent_stack = [0]
-    lines = code.splitlines()
-    lineno = 0
+    fixed_tuples, token_types = FIXED_TUPLES, TOKEN_TYPES
+    return [
+        fixed_tuples[kind] or (token_types[kind], value)
+        for kind, value, _, _ in iter_coded_tokens(code.splitlines())
+    ]
 
-    for line in lines:
-        lineno += 1
 
-        # Remove comentários
-        if "#" in line:
-            line = line.split("#", 1)[0]
+def tokenize(code):
+    """
+    Igual a lexer(), mas devolve um TokenStream compacto, com a posição
+    (linha, coluna) de cada token.
+    """
+    stream = TokenStream()
+    stream.extend(iter_coded_tokens(code.splitlines()))
+    return stream
 
-        # Ignora linhas vazias
-        if not line.strip():
-            continue
 
-        # Conta indentação
-        indent_level = len(line) - len(line.lstrip(" "))
+def lexer_stream(file, coded=False):
+    """
+    Versão em fluxo do lexer: lê 'file' (um objeto de arquivo de texto) linha a
+    linha e produz os tokens sob demanda, sem carregar o programa inteiro na memória.
+    Com coded=True, produz tokens codificados (kind, valor, linha, coluna).
+    """
+    lines = (line.rstrip("\r\n") for line in file)
+    return iter_coded_tokens(lines) if coded else iter_tokens(lines)
 
-        # Gera INDENT/DEDENT
-        if indent_level > indent_stack[-1]:
-            indent_stack.append(indent_level)
-            tokens.append(("INDENT", None))
-        elif indent_level < indent_stack[-1]:
-            while indent_level < indent_stack[-1]:
-                indent_stack.pop()
-                tokens.append(("DEDENT", None))
-            if indent_level != indent_stack[-1]:
-                raise ValueError(f"Indentação inválida na linha {lineno}")
 
-        pos = len(line) - len(line.lstrip(" "))
+def iter_tokens(lines):
+    """
+    Gerador que consome um iterável de linhas (sem o terminador) e produz as
+    tuplas (tipo, valor) uma a uma.
+    """
+    for kind, value, _, _ in iter_coded_tokens(lines):
+        yield FIXED_TUPLES[kind] or (TOKEN_TYPES[kind], value)
 
-        while pos < len(line):
-            if line[pos].isspace():
-                pos += 1
-                continue
 
-            match = None
-            for token_type, regex in COMPILED_REGEXES:
-                match = regex.match(line, pos)
-                if match:
-                    value = match.group(0)
+def iter_coded_tokens(lines):
+    """
+    Núcleo do lexer: produz os tokens codificados (kind, valor, linha, coluna)
+    de um iterável de linhas.
+    """
+    indent_stack = [0]
+    lineno = 0
 
-                    if token_type == "CHANNEL_CALL":
-                        if value.endswith(".send"):
-                            tokens.append(("CHANNEL_SEND", value.split(".")[0]))
-                        else:
-                            tokens.append(("CHANNEL_RECEIVE", value.split(".")[0]))
+    for line in lines:
+        lineno += 1
+        yield from scan_line(line, lineno, indent_stack)
 
-                    elif token_type == "ID" and value in KEYWORDS:
-                        tokens.append(("KEYWORD", value))
-                    else:
-                        tokens.append((token_type, value))
+    # Fecha blocos abertos
+    while len(indent_stack) > 1:
+        indent_stack.pop()
+        yield (DEDENT, None, lineno + 1, 1)
 
-                    pos = match.end(0)
-                    break
 
-            if not match:
-                raise ValueError(f"Token inválido na linha {lineno}, próximo de: '{line[pos:]}'")
+def scan_line(line, lineno, indent_stack):
+    """
+    Tokeniza uma única linha física, atualizando 'indent_stack' com a indentação
+    corrente. Retorna a lista de tokens codificados da linha (vazia para linhas
+    em branco ou só com comentário), incluindo INDENT/DEDENT e o NEWLINE final.
+    """
+    # Remove comentários
+    if "#" in line:
+        line = line.split("#", 1)[0]
 
-        tokens.append(("NEWLINE", None))
+    # Conta indentação
+    stripped = line.lstrip(" ")
 
-    # Fecha blocos abertos
-    while len(indent_stack) > 1:
-        indent_stack.pop()
-        tokens.append(("DEDENT", None))
+    # Ignora linhas vazias
+    if not stripped or stripped.isspace():
+        return []
 
+    tokens = []
+    append = tokens.append
+    indent_level = len(line) - len(stripped)
+
+    # Gera INDENT/DEDENT
+    if indent_level > indent_stack[-1]:
+        indent_stack.append(indent_level)
+        append((INDENT, None, lineno, 1))
+    elif indent_level < indent_stack[-1]:
+        while indent_level < indent_stack[-1]:
+            indent_stack.pop()
+            append((DEDENT, None, lineno, 1))
+        if indent_level != indent_stack[-1]:
+            raise ValueError(f"Indentação inválida na linha {lineno}")
+
+    # Varre a linha com o padrão mestre; o scanner só avança enquanto os
+    # tokens forem contíguos, então uma parada antes do fim indica erro.
+    match = None
+    fixed_codes = FIXED_CODES
+    group_codes = _GROUP_CODES
+    for match in iter(MASTER_REGEX.scanner(line, indent_level).match, None):
+        group = match.lastindex
+        value = match.group(group)
+        col = match.start(group) + 1
+        if group == _ID_GROUP:
+            append((fixed_codes.get(value, ID), value, lineno, col))
+        elif group == _CHANNEL_GROUP:
+            name, _, method = value.partition(".")
+            append((CHANNEL_SEND if method == "send" else CHANNEL_RECEIVE, name, lineno, col))
+        else:
+            # OP e SYM têm código próprio por valor; os demais, pelo grupo.
+            append((group_codes[group] or fixed_codes[value], value, lineno, col))
+
+    end = match.end() if match is not None else indent_level
+    if end < len(line) and not line[end:].isspace():
+        raise ValueError(f"Token inválido na linha {lineno}, próximo de: '{line[end:].lstrip()}'")
+
+    append((NEWLINE, None, lineno, len(line) + 1))
     return tokens
@@ -0,0 +1,201 @@
+from array import array
+
+# =================================================
+# CÓDIGOS DE TIPO DE TOKEN
+# =================================================
+# Cada palavra-chave, operador e símbolo tem o seu próprio código, de modo que o
+# parser compara um único inteiro em vez de montar tuplas ("SYM", ")").
+# Todos os códigos cabem em um byte (array('B')).
+
+(
+    EOF, NEWLINE, INDENT, DEDENT,
+    ID, NUMBER, BOOLEAN, STRING, CHANNEL_SEND, CHANNEL_RECEIVE,
+) = range(10)
+
+KEYWORD_CODES = {
+    word: code for code, word in enumerate(
+        ("if", "else", "while", "print", "def", "c_channel",
+         "SEQ", "PAR", "and", "or", "not", "for", "return"),
+        start=10,
+    )
+}
+(
+    KW_IF, KW_ELSE, KW_WHILE, KW_PRINT, KW_DEF, KW_C_CHANNEL,
+    KW_SEQ, KW_PAR, KW_AND, KW_OR, KW_NOT, KW_FOR, KW_RETURN,
+) = KEYWORD_CODES.values()
+
+OP_CODES = {
+    op: code for code, op in enumerate(
+        ("==", "!=", "<=", ">=", "=", "+", "-", "*", "/", "<", ">"),
+        start=10 + len(KEYWORD_CODES),
+    )
+}
+(
+    OP_EQ, OP_NE, OP_LE, OP_GE, OP_ASSIGN,
+    OP_PLUS, OP_MINUS, OP_STAR, OP_SLASH, OP_LT, OP_GT,
+) = OP_CODES.values()
+
+SYM_CODES = {
+    sym: code for code, sym in enumerate("{}();:,", start=10 + len(KEYWORD_CODES) + len(OP_CODES))
+}
+(
+    SYM_LBRACE, SYM_RBRACE, SYM_LPAREN, SYM_RPAREN, SYM_SEMI, SYM_COLON, SYM_COMMA,
+) = SYM_CODES.values()
+
+# Tipo textual (como nas tuplas do lexer) e valor fixo de cada código.
+# Tokens com valor variável (ID, NUMBER, ...) têm valor fixo None.
+TOKEN_TYPES = ["EOF", "NEWLINE", "INDENT", "DEDENT",
+               "ID", "NUMBER", "BOOLEAN", "STRING", "CHANNEL_SEND", "CHANNEL_RECEIVE"]
+FIXED_VALUES = [None] * len(TOKEN_TYPES)
+for _ttype, _codes in (("KEYWORD", KEYWORD_CODES), ("OP", OP_CODES), ("SYM", SYM_CODES)):
+    for _value in _codes:
+        TOKEN_TYPES.append(_ttype)
+        FIXED_VALUES.append(_value)
+
+VALUED_CODES = {ttype: code for code, ttype in enumerate(TOKEN_TYPES) if code < KW_IF}
+FIXED_CODES = {**KEYWORD_CODES, **OP_CODES, **SYM_CODES}
+
+# Tupla (tipo, valor) compartilhada por todos os tokens de valor fixo.
+FIXED_TUPLES = [
+    (ttype, value) if code >= KW_IF or code < ID else None
+    for code, (ttype, value) in enumerate(zip(TOKEN_TYPES, FIXED_VALUES))
+]
+
+
+def encode(ttype, value):
+    """Converte uma tupla (tipo, valor) do lexer no código inteiro correspondente."""
+    if ttype in VALUED_CODES:
+        return VALUED_CODES[ttype]
+    try:
+        return FIXED_CODES[value]
+    except KeyError:
+        raise ValueError(f"Token desconhecido: {ttype}, {value}") from None
+
+
+def decode(kind, value=None):
+    """Converte um código (e seu valor) de volta para a tupla (tipo, valor)."""
+    return FIXED_TUPLES[kind] or (TOKEN_TYPES[kind], value)
+
+
+def describe(kind, value=None):
+    """Descrição legível de um token, usada nas mensagens de erro."""
+    ttype, value = decode(kind, value)
+    return f"{ttype} '{value}'"
+
+
+def as_coded(tokens):
+    """
+    Adapta qualquer fonte de tokens para o formato codificado (kind, valor, linha, coluna):
+    um TokenStream, um iterável de tuplas (tipo, valor) ou um iterável já codificado.
+    Tuplas sem posição recebem linha e coluna 0 (desconhecidas).
+    """
+    if isinstance(tokens, TokenStream):
+        return tokens.iter_coded()
+    return _coded_from_iterable(tokens)
+
+
+def _coded_from_iterable(tokens):
+    for token in tokens:
+        if type(token[0]) is int:
+            yield token
+        else:
+            yield (encode(*token), token[1], 0, 0)
+
+
+# =================================================
+# FLUXO COMPACTO DE TOKENS
+# =================================================
+
+class TokenStream:
+    """
+    Sequência de tokens em arrays paralelos:
+        kinds  - array('B') com o código de cada token
+        values - array('I') com o índice do valor na tabela 'strings' (0 = None)
+        lines / cols - array('I') com a posição (1-based) de cada token
+
+    Os valores são internados: cada texto distinto aparece uma única vez em
+    'strings'. A iteração produz as mesmas tuplas (tipo, valor) do lexer, de
+    modo que o fluxo pode substituir a lista de tokens onde ela era usada.
+    """
+    __slots__ = ("kinds", "values", "lines", "cols", "strings", "_index")
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.values = array("I")
+        self.lines = array("I")
+        self.cols = array("I")
+        self.strings = [None]
+        self._index = {None: 0}
+
+    @classmethod
+    def from_tokens(cls, tokens):
+        """Constrói o fluxo a partir de tuplas (tipo, valor) ou de tokens codificados."""
+        stream = cls()
+        for kind, value, line, col in _coded_from_iterable(tokens):
+            stream.append(kind, value, line, col)
+        return stream
+
+    def intern(self, value):
+        """Retorna o índice de 'value' na tabela de valores, inserindo-o se necessário."""
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def append(self, kind, value, line, col):
+        self.kinds.append(kind)
+        self.values.append(self.intern(value))
+        self.lines.append(line)
+        self.cols.append(col)
+
+    def extend(self, coded_tokens):
+        kinds, values, lines, cols = self.kinds, self.values, self.lines, self.cols
+        index, intern = self._index, self.intern
+        for kind, value, line, col in coded_tokens:
+            kinds.append(kind)
+            values.append(index[value] if value in index else intern(value))
+            lines.append(line)
+            cols.append(col)
+
+    def splice(self, start, stop, coded_tokens, line_delta=0):
+        """
+        Troca os tokens [start, stop) por 'coded_tokens' e soma 'line_delta' à
+        linha de todos os tokens seguintes (linhas inseridas ou removidas).
+        """
+        new = TokenStream()
+        new._index, new.strings = self._index, self.strings
+        new.extend(coded_tokens)
+        end = start + len(new)
+        self.kinds[start:stop] = new.kinds
+        self.values[start:stop] = new.values
+        self.lines[start:stop] = new.lines
+        self.cols[start:stop] = new.cols
+        if line_delta:
+            lines = self.lines
+            lines[end:] = array("I", map(line_delta.__add__, lines[end:]))
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, i):
+        return decode(self.kinds[i], self.strings[self.values[i]])
+
+    def __iter__(self):
+        strings = self.strings
+        for kind, value in zip(self.kinds, self.values):
+            yield FIXED_TUPLES[kind] or (TOKEN_TYPES[kind], strings[value])
+
+    def position(self, i):
+        """Posição (linha, coluna) do i-ésimo token."""
+        return self.lines[i], self.cols[i]
+
+    def iter_coded(self):
+        """Itera sobre os tokens no formato (kind, valor, linha, coluna) consumido pelo Parser."""
+        strings = self.strings
+        for kind, value, line, col in zip(self.kinds, self.values, self.lines, self.cols):
+            yield (kind, strings[value], line, col)
+
+    def nbytes(self):
+        """Memória ocupada pelos arrays de tokens (sem a tabela de valores)."""
+        return sum(a.itemsize * len(a) for a in (self.kinds, self.values, self.lines, self.cols))
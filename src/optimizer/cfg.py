@@ -0,0 +1,345 @@
+from src.generator import ir
+
+# =================================================
+# GRAFO DE FLUXO DE CONTROLE E VIVACIDADE
+# =================================================
+# O C3E de um programa é dividido em funções: o código de cada definição
+# (do rótulo da função até end_func) e o programa principal, com o restante.
+# Cada função tem o seu grafo de blocos básicos, cortados nos rótulos e depois
+# de saltos e retornos. Saltos para rótulos de outra função (só o 'goto' morto
+# após um 'return') levam à saída do grafo.
+#
+# A vivacidade é calculada por blocos, iterando até o ponto fixo:
+#   live_out(B) = união de live_in(S) para os sucessores S de B
+#   live_in(B)  = use(B) | (live_out(B) - def(B))
+# Por padrão só os temporários são acompanhados: as variáveis do programa
+# principal são globais e podem ser lidas por qualquer função chamada.
+
+MAIN = "main"
+
+
+class BasicBlock:
+    """
+    Bloco básico: as instruções 'indices' (posições no programa, em ordem),
+    executadas sempre em sequência. 'succs' e 'preds' são listas de blocos.
+    """
+    __slots__ = ("id", "indices", "succs", "preds", "live_in", "live_out")
+
+    def __init__(self, id, indices):
+        self.id = id
+        self.indices = indices
+        self.succs = []
+        self.preds = []
+        self.live_in = set()
+        self.live_out = set()
+
+    @property
+    def start(self):
+        return self.indices[0]
+
+    @property
+    def end(self):
+        return self.indices[-1]
+
+    def __repr__(self):
+        return f"BasicBlock({self.id}, {self.start}..{self.end})"
+
+
+class FunctionCFG:
+    """Grafo de uma função ('main' para o programa principal); blocks[0] é a entrada."""
+    __slots__ = ("name", "blocks")
+
+    def __init__(self, name, blocks):
+        self.name = name
+        self.blocks = blocks
+
+    @property
+    def entry(self):
+        return self.blocks[0]
+
+    def indices(self):
+        """Posições das instruções da função, em ordem."""
+        return [i for block in self.blocks for i in block.indices]
+
+    def __repr__(self):
+        return f"FunctionCFG({self.name}, {len(self.blocks)} blocos)"
+
+
+def function_regions(program):
+    """
+    Lista de (nome, posições das instruções) de cada função, com o programa
+    principal primeiro. Definições aninhadas pertencem só à função mais interna.
+    """
+    functions = program.defined_functions()
+    regions = [(MAIN, [])]
+    stack = [0]
+    for i, (op, _, a, _) in enumerate(program):
+        if op == ir.LABEL and a in functions:
+            regions.append((a.text, []))
+            stack.append(len(regions) - 1)
+        regions[stack[-1]][1].append(i)
+        if op == ir.END_FUNC and len(stack) > 1:
+            stack.pop()
+    return regions
+
+
+def build_cfg(program):
+    """Grafos de fluxo de controle (FunctionCFG) de todas as funções do programa, 'main' primeiro."""
+    ops, a, b = program.ops, program.a, program.b
+    cfgs = []
+    for name, indices in function_regions(program):
+        # Corta os blocos: rótulos iniciam blocos; saltos, retornos e o fim de
+        # um trecho contíguo os encerram.
+        blocks = []
+        current = []
+        label_block = {}
+        for k, i in enumerate(indices):
+            op = ops[i]
+            if op == ir.LABEL and current:
+                blocks.append(BasicBlock(len(blocks), current))
+                current = []
+            if op == ir.LABEL:
+                label_block[a[i]] = len(blocks)
+            current.append(i)
+            if (op == ir.GOTO or op == ir.IF_FALSE or op == ir.RETURN
+                    or k + 1 == len(indices) or indices[k + 1] != i + 1):
+                blocks.append(BasicBlock(len(blocks), current))
+                current = []
+        if not blocks:
+            blocks.append(BasicBlock(0, []))
+
+        for n, block in enumerate(blocks):
+            if not block.indices:
+                continue
+            last = block.end
+            op = ops[last]
+            targets = []
+            if op == ir.GOTO:
+                targets.append(label_block.get(a[last]))
+            elif op == ir.IF_FALSE:
+                targets.append(label_block.get(b[last]))
+            if op != ir.GOTO and op != ir.RETURN and n + 1 < len(blocks) and blocks[n + 1].start == last + 1:
+                targets.append(n + 1)
+            for t in targets:
+                if t is not None and blocks[t] not in block.succs:
+                    block.succs.append(blocks[t])
+                    blocks[t].preds.append(block)
+        cfgs.append(FunctionCFG(name, blocks))
+    return cfgs
+
+
+def par_positions(program):
+    """Conjunto das posições das instruções dentro de blocos PAR (incluindo os marcadores)."""
+    inside = set()
+    depth = 0
+    for i, op in enumerate(program.ops):
+        if op == ir.PAR_BEGIN:
+            depth += 1
+        if depth:
+            inside.add(i)
+        if op == ir.PAR_END:
+            depth -= 1
+    return inside
+
+
+def is_temp(x):
+    return type(x) is int
+
+
+def liveness(program, cfg, tracked=is_temp):
+    """
+    Calcula live_in e live_out (conjuntos de operandos) de cada bloco do grafo
+    'cfg', considerando só os operandos para os quais tracked(x) é verdadeiro.
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    gen, kill = {}, {}
+    for block in cfg.blocks:
+        used, defined = set(), set()
+        for i in block.indices:
+            op = ops[i]
+            for x in ir.uses(op, dest[i], a[i], b[i]):
+                if x not in defined and tracked(x):
+                    used.add(x)
+            for x in ir.defs(op, dest[i], a[i], b[i]):
+                if tracked(x):
+                    defined.add(x)
+        gen[block] = used
+        kill[block] = defined
+        block.live_in = set(used)
+        block.live_out = set()
+
+    # Percorre os blocos de trás para a frente até nada mudar.
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(cfg.blocks):
+            out = set()
+            for s in block.succs:
+                out |= s.live_in
+            if out != block.live_out:
+                block.live_out = out
+                live_in = gen[block] | (out - kill[block])
+                if live_in != block.live_in:
+                    block.live_in = live_in
+                changed = True
+    return cfg
+
+
+def live_ranges(program, cfg, tracked=is_temp):
+    """
+    Intervalo [primeira, última] posição (na ordem das instruções da função)
+    em que cada operando acompanhado está vivo. Requer liveness(program, cfg).
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    ranges = {}
+    position = 0
+
+    def extend(x, p):
+        r = ranges.get(x)
+        if r is None:
+            ranges[x] = [p, p]
+        elif p < r[0]:
+            r[0] = p
+        elif p > r[1]:
+            r[1] = p
+
+    for block in cfg.blocks:
+        if not block.indices:
+            continue
+        first = position
+        for x in block.live_in:
+            extend(x, first)
+        for i in block.indices:
+            op = ops[i]
+            for x in ir.uses(op, dest[i], a[i], b[i]):
+                if tracked(x):
+                    extend(x, position)
+            for x in ir.defs(op, dest[i], a[i], b[i]):
+                if tracked(x):
+                    extend(x, position)
+            position += 1
+        for x in block.live_out:
+            extend(x, position - 1)
+    return ranges
+
+
+def max_live(program, cfg, tracked=is_temp):
+    """Maior número de operandos acompanhados vivos ao mesmo tempo na função. Requer liveness."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    best = 0
+    for block in cfg.blocks:
+        live = set(block.live_out)
+        best = max(best, len(live))
+        for i in reversed(block.indices):
+            op = ops[i]
+            live.difference_update(x for x in ir.defs(op, dest[i], a[i], b[i]) if tracked(x))
+            live.update(x for x in ir.uses(op, dest[i], a[i], b[i]) if tracked(x))
+            best = max(best, len(live))
+    return best
+
+
+def reverse_postorder(cfg):
+    """Blocos alcançáveis a partir da entrada, em pós-ordem reversa (DFS iterativa)."""
+    order = []
+    seen = {cfg.entry}
+    stack = [(cfg.entry, iter(cfg.entry.succs))]
+    while stack:
+        block, succs = stack[-1]
+        for s in succs:
+            if s not in seen:
+                seen.add(s)
+                stack.append((s, iter(s.succs)))
+                break
+        else:
+            stack.pop()
+            order.append(block)
+    order.reverse()
+    return order
+
+
+def dominators(cfg):
+    """
+    Dominador imediato de cada bloco alcançável ({bloco: idom}, com a entrada
+    mapeada para None), pelo algoritmo iterativo de Cooper, Harvey e Kennedy.
+    """
+    order = reverse_postorder(cfg)
+    rank = {block: n for n, block in enumerate(order)}
+    idom = {cfg.entry: cfg.entry}
+    changed = True
+    while changed:
+        changed = False
+        for block in order[1:]:
+            new = None
+            for p in block.preds:
+                if p not in idom:
+                    continue
+                if new is None:
+                    new = p
+                    continue
+                # Interseção: sobe pelos dois caminhos até se encontrarem.
+                x, y = p, new
+                while x is not y:
+                    while rank[x] > rank[y]:
+                        x = idom[x]
+                    while rank[y] > rank[x]:
+                        y = idom[y]
+                new = x
+            if idom.get(block) is not new:
+                idom[block] = new
+                changed = True
+    idom[cfg.entry] = None
+    return idom
+
+
+def dominator_tree(cfg, idom=None):
+    """Filhos de cada bloco na árvore de dominadores ({bloco: [filhos]}), em ordem do programa."""
+    if idom is None:
+        idom = dominators(cfg)
+    children = {block: [] for block in idom}
+    for block in cfg.blocks:
+        parent = idom.get(block)
+        if parent is not None:
+            children[parent].append(block)
+    return children
+
+
+def natural_loops(cfg, idom=None):
+    """
+    Laços naturais do grafo, como pares (cabeçalho, conjunto de blocos do
+    corpo, incluindo o cabeçalho), dos mais externos para os mais internos.
+    Um laço é definido por uma aresta de volta B -> H em que H domina B; as
+    arestas de volta para o mesmo cabeçalho formam um único laço.
+    """
+    if idom is None:
+        idom = dominators(cfg)
+    # Intervalos de pré/pós-ordem na árvore de dominadores: x domina y se o
+    # intervalo de x contém o de y.
+    children = dominator_tree(cfg, idom)
+    enter, leave = {}, {}
+    clock = 0
+    stack = [cfg.entry]
+    while stack:
+        block = stack.pop()
+        clock += 1
+        if block in enter:
+            leave[block] = clock
+            continue
+        enter[block] = clock
+        stack.append(block)
+        stack.extend(children[block])
+
+    loops = {}
+    for block in cfg.blocks:
+        if block not in idom:
+            continue
+        for header in block.succs:
+            if not (header in enter and enter[header] <= enter[block] and leave[block] <= leave[header]):
+                continue
+            body = loops.setdefault(header, {header})
+            stack = [block]
+            while stack:
+                b = stack.pop()
+                if b not in body:
+                    body.add(b)
+                    stack.extend(p for p in b.preds if p in idom)
+    return sorted(loops.items(), key=lambda item: -len(item[1]))
@@ -0,0 +1,179 @@
+from collections import Counter
+
+from src.generator import ir
+
+# =================================================
+# PROPAGAÇÃO DE CÓPIAS E REMOÇÃO DE TEMPORÁRIOS MORTOS
+# =================================================
+# Cada atribuição gera o par 't0 = a + 2' / 'a = t0'. Esta passagem:
+#   1. funde o temporário copiado logo em seguida para uma variável, quando
+#      aquela cópia é a única leitura do temporário ('a = a + 2');
+#   2. propaga cópias 'x = y' para as leituras seguintes de x, enquanto nem x
+#      nem y forem reescritos, dentro de cada trecho de código sem rótulos;
+#   3. troca, no programa inteiro, as leituras de um temporário escrito uma só
+#      vez por uma cópia 't = x' pela própria origem x, quando x é uma
+#      constante ou outro temporário escrito uma só vez (x é escrito antes de
+#      t, que é escrito antes de qualquer leitura);
+#   4. remove as instruções sem efeitos colaterais (e que não podem falhar)
+#      que escrevem temporários nunca lidos.
+# As contagens de leituras e escritas de cada temporário (a informação de
+# uso-definição) vêm de ir.uses/ir.defs. Nenhuma instrução muda de lugar, então
+# as sequências param/call/send permanecem intactas.
+
+
+def _temp_counts(program):
+    """Número de leituras e de escritas de cada temporário."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    reads, writes = Counter(), Counter()
+    for i, op in enumerate(ops):
+        for x in ir.uses(op, dest[i], a[i], b[i]):
+            if type(x) is int:
+                reads[x] += 1
+        for x in ir.defs(op, dest[i], a[i], b[i]):
+            if type(x) is int:
+                writes[x] += 1
+    return reads, writes
+
+
+def coalesce_copies(program):
+    """'t = <expr>' seguido de 'v = t', sendo essa a única leitura de t, vira 'v = <expr>'."""
+    ops, dest, a = program.ops, program.dest, program.a
+    reads, writes = _temp_counts(program)
+    keep = [True] * len(ops)
+    p = 0  # última instrução mantida: em 't = <expr>; t2 = t; v = t2' as cópias se fundem em cadeia
+    for i in range(1, len(ops)):
+        t = a[i]
+        if (ops[i] == ir.COPY and type(t) is int and dest[p] == t and ops[p] in ir.WRITES_DEST
+                and reads[t] == 1 and writes[t] == 1):
+            dest[p] = dest[i]
+            keep[i] = False
+        else:
+            p = i
+    program.filter(keep)
+    return program
+
+
+def propagate_copies(program):
+    """Troca as leituras de x por y após 'x = y', enquanto a cópia continua válida."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    functions = program.defined_functions()
+    copies = {}   # x -> y
+    sources = {}  # y -> {x, ...}
+    par_depth = 0
+
+    def kill(name):
+        source = copies.pop(name, None)
+        if source is not None:
+            sources[source].discard(name)
+        for x in sources.pop(name, ()):
+            del copies[x]
+
+    for i, op in enumerate(ops):
+        if op == ir.LABEL or op == ir.BEGIN_FUNC or op == ir.END_FUNC:
+            copies.clear()
+            sources.clear()
+            continue
+        if op == ir.PAR_BEGIN or op == ir.PAR_END:
+            # Os comandos de um bloco PAR não têm ordem entre si.
+            par_depth += 1 if op == ir.PAR_BEGIN else -1
+            copies.clear()
+            sources.clear()
+            continue
+
+        if copies:
+            if op in ir.READS_A:
+                x = a[i]
+                if x in copies:
+                    a[i] = copies[x]
+                if op in ir.BINARY and b[i] in copies:
+                    b[i] = copies[b[i]]
+            if op == ir.CALL and a[i] in functions:
+                # A função pode escrever em qualquer variável.
+                copies.clear()
+                sources.clear()
+
+        for name in ir.defs(op, dest[i], a[i], b[i]):
+            kill(name)
+
+        if op == ir.COPY and type(a[i]) is not ir.Const and dest[i] != a[i]:
+            if par_depth == 0 or type(dest[i]) is int:
+                copies[dest[i]] = a[i]
+                sources.setdefault(a[i], set()).add(dest[i])
+        elif op in ir.NO_FALLTHROUGH:
+            copies.clear()
+            sources.clear()
+    return program
+
+
+def propagate_temp_copies(program):
+    """Troca as leituras de 't' por 'x' após 't = x', sendo t e x escritos uma só vez (ou x constante)."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    _, writes = _temp_counts(program)
+    alias = {}
+    for i, op in enumerate(ops):
+        t, x = dest[i], a[i]
+        if (op == ir.COPY and type(t) is int and writes[t] == 1
+                and (type(x) is ir.Const or (type(x) is int and writes[x] == 1))):
+            alias[t] = alias.get(x, x)  # a origem já aparece antes: a cadeia fica resolvida
+    if not alias:
+        return program
+    for i, op in enumerate(ops):
+        if op in ir.READS_A and a[i] in alias:
+            a[i] = alias[a[i]]
+        if op in ir.BINARY and b[i] in alias:
+            b[i] = alias[b[i]]
+    return program
+
+
+# Instruções que nunca falham: cópias, igualdades, operações lógicas e os '+'
+# tipados (ADD soma números e CONCAT concatena strings, pelos tipos da análise
+# semântica). As aritméticas e as comparações de ordem só não falham sobre
+# números; 'add_any' falha com operandos de tipos diferentes.
+_SAFE = frozenset({ir.COPY, ir.EQ, ir.NE, ir.AND, ir.OR, ir.NOT, ir.ADD, ir.CONCAT})
+_NUMERIC = frozenset({ir.SUB, ir.MUL, ir.DIV, ir.LT, ir.GT, ir.LE, ir.GE, ir.NEG})
+
+
+def is_number(x):
+    """Se o operando é uma constante numérica."""
+    return type(x) is ir.Const and x.type == "number"
+
+
+def is_pure(op, a, b, number=is_number):
+    """
+    Instrução sem efeitos além de escrever 'dest' e que não pode falhar.
+    'number' diz se um operando é certamente um número (padrão: só as
+    constantes numéricas); a divisão exige ainda divisor constante não nulo.
+    """
+    if op in _SAFE:
+        return True
+    if op not in _NUMERIC:
+        return False
+    if op == ir.DIV and not (is_number(b) and b.value != 0):
+        return False
+    return number(a) and (op == ir.NEG or number(b))
+
+
+def remove_dead_temps(program):
+    """Remove as instruções puras que escrevem temporários nunca lidos."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    reads, _ = _temp_counts(program)
+    keep = [True] * len(ops)
+    # De trás para a frente: remover uma leitura pode matar a definição anterior.
+    for i in range(len(ops) - 1, -1, -1):
+        op = ops[i]
+        if type(dest[i]) is int and reads[dest[i]] == 0 and is_pure(op, a[i], b[i]):
+            keep[i] = False
+            for x in ir.uses(op, dest[i], a[i], b[i]):
+                if type(x) is int:
+                    reads[x] -= 1
+    program.filter(keep)
+    return program
+
+
+def optimize_copies(program):
+    """Passagem completa: fusão de cópias, propagações e remoção de temporários mortos."""
+    coalesce_copies(program)
+    propagate_copies(program)
+    propagate_temp_copies(program)
+    remove_dead_temps(program)
+    return program
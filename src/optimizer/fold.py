@@ -0,0 +1,301 @@
+import math
+import operator
+
+from src.generator import ir
+
+# =================================================
+# DOBRAMENTO E PROPAGAÇÃO DE CONSTANTES
+# =================================================
+# Percorre o C3E uma vez, para a frente, mantendo o ambiente de variáveis e
+# temporários cujo valor constante é conhecido naquele ponto:
+#   - operandos conhecidos são trocados pela constante;
+#   - operações entre constantes viram cópias do resultado ('t0 = 2 * 3' -> 't0 = 6');
+#   - 'if_false <constante>' vira 'goto' (condição falsa) ou desaparece (verdadeira).
+# Nos rótulos, o ambiente é a interseção dos ambientes de todos os caminhos
+# que chegam a ele (a queda da instrução anterior e os saltos para a frente).
+# Em rótulos de laço (alvos de saltos para trás) esquecem-se as variáveis
+# escritas no corpo do laço. Chamadas de funções do programa, que podem
+# escrever em qualquer variável, esquecem tudo, e dentro de blocos PAR as
+# variáveis escritas no bloco não são propagadas, pois os comandos do bloco
+# não têm ordem definida entre si.
+#
+# Só são dobradas operações entre números, entre booleanos (and, or, not,
+# ==, !=), comparações entre números e concatenações de strings, com a
+# semântica do Python ('/' é a divisão real). O valor de uma string é o seu
+# lexema, com as aspas: concatenar '"ab"' e '"c"' dá '"abc"'. O 'add_any' é
+# dobrado como soma ou concatenação quando os dois operandos são do mesmo tipo.
+
+
+def _number(x, y):
+    return x.type == "number" and y.type == "number"
+
+
+def _boolean(x, y):
+    return x.type == "boolean" and y.type == "boolean"
+
+
+def _strings(x, y):
+    return x.type == "string" and y.type == "string"
+
+
+def _addable(x, y):
+    return _number(x, y) or _strings(x, y)
+
+
+def _concat(x, y):
+    return x[:-1] + y[1:]
+
+
+def _add_any(x, y):
+    return _concat(x, y) if type(x) is str else x + y
+
+
+def _same_type(x, y):
+    return x.type == y.type and x.type != "string"
+
+
+def _divisor(x, y):
+    return _number(x, y) and y.value != 0
+
+
+# opcode -> (condição sobre as constantes, operação sobre os valores)
+BINARY_FOLDS = {
+    ir.ADD: (_number, operator.add),
+    ir.SUB: (_number, operator.sub),
+    ir.MUL: (_number, operator.mul),
+    ir.DIV: (_divisor, operator.truediv),
+    ir.LT: (_number, operator.lt),
+    ir.GT: (_number, operator.gt),
+    ir.LE: (_number, operator.le),
+    ir.GE: (_number, operator.ge),
+    ir.EQ: (_same_type, operator.eq),
+    ir.NE: (_same_type, operator.ne),
+    ir.AND: (_boolean, lambda x, y: x and y),
+    ir.OR: (_boolean, lambda x, y: x or y),
+    ir.CONCAT: (_strings, _concat),
+    ir.ADD_ANY: (_addable, _add_any),
+}
+UNARY_FOLDS = {
+    ir.NEG: ("number", operator.neg),
+    ir.NOT: ("boolean", operator.not_),
+}
+
+
+def fold_binary(program, op, x, y):
+    """Constante resultante de 'x <op> y', ou None se a operação não pode ser dobrada."""
+    fold = BINARY_FOLDS.get(op)
+    if fold is None or not fold[0](x, y):
+        return None
+    return _constant(program, fold[1](x.value, y.value))
+
+
+def fold_unary(program, op, x):
+    """Constante resultante de '<op> x', ou None se a operação não pode ser dobrada."""
+    fold = UNARY_FOLDS.get(op)
+    if fold is None or x.type != fold[0]:
+        return None
+    return _constant(program, fold[1](x.value))
+
+
+def _constant(program, value):
+    if type(value) is float and not math.isfinite(value):
+        return None
+    if type(value) is str:
+        return program.const("string", value)
+    return program.constant(value)
+
+
+class _Environment:
+    """
+    Constantes conhecidas em um ponto do programa: um único dicionário
+    (operando -> Const) e o registro de todas as suas alterações, como pares
+    (nome, valor anterior). Um instante é uma posição do registro; em vez de
+    copiar o ambiente a cada salto, guarda-se o instante do salto, e no rótulo
+    de destino basta olhar o que mudou desde então.
+    """
+
+    def __init__(self):
+        self.known = {}
+        self.log = []
+
+    def now(self):
+        return len(self.log)
+
+    def set(self, name, c):
+        """Associa 'name' à constante 'c' (None: valor desconhecido)."""
+        old = self.known.get(name)
+        if old is not c:
+            self.log.append((name, old))
+            if c is None:
+                del self.known[name]
+            else:
+                self.known[name] = c
+
+    def forget(self, names):
+        known = self.known
+        for name in [name for name in names if name in known]:
+            self.set(name, None)
+
+    def forget_all(self):
+        self.forget(list(self.known))
+
+    def changed_since(self, instant):
+        return {name for name, _ in self.log[instant:]}
+
+    def rewind(self, instant):
+        """Volta ao ambiente do instante dado (registrando a volta como novas alterações)."""
+        previous = {}
+        for name, old in self.log[instant:]:
+            previous.setdefault(name, old)
+        for name, old in previous.items():
+            self.set(name, old)
+
+
+def _written(program, functions, start, stop):
+    """
+    Nomes escritos pelas instruções em [start, stop) e se há, entre elas, uma
+    chamada a função do programa (que pode escrever em qualquer variável).
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    written = set()
+    calls = False
+    for i in range(start, stop):
+        op = ops[i]
+        written.update(ir.defs(op, dest[i], a[i], b[i]))
+        if op == ir.CALL and a[i] in functions:
+            calls = True
+    return written, calls
+
+
+def fold_constants(program):
+    """Dobra e propaga constantes no programa (ir.IRProgram), modificando-o."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    n = len(ops)
+    functions = program.defined_functions()
+
+    # Última origem de cada rótulo e posição dos blocos PAR, para os saltos
+    # para trás (laços) e para os blocos paralelos.
+    last_jump = {}
+    par_end = {}
+    open_pars = []
+    for i, op in enumerate(ops):
+        if op == ir.GOTO:
+            last_jump[a[i]] = i
+        elif op == ir.IF_FALSE:
+            last_jump[b[i]] = i
+        elif op == ir.PAR_BEGIN:
+            open_pars.append(i)
+        elif op == ir.PAR_END:
+            par_end[open_pars.pop()] = i
+
+    new_ops, new_dest, new_a, new_b = [], [], [], []
+    env = _Environment()
+    known = env.known
+    reachable = True
+    pending = {}      # rótulo -> (ambiente, primeiro instante, último instante) dos saltos já vistos
+    functions_open = []  # ambientes externos das funções em cuja definição estamos
+    par_written = []  # nomes escritos em cada bloco PAR aberto
+
+    for i in range(n):
+        op, d, x, y = ops[i], dest[i], a[i], b[i]
+
+        if op == ir.LABEL:
+            if x in functions:
+                # Início de função: só se chega por chamadas. O corpo usa um
+                # ambiente próprio, e o de fora é retomado em end_func.
+                functions_open.append((env, reachable))
+                env, reachable = _Environment(), True
+                known = env.known
+            else:
+                jumps = pending.pop(x, None)
+                if jumps is not None and jumps[0] is not env:
+                    env.forget_all()  # salto vindo de outro ambiente (não ocorre no código gerado)
+                    reachable = True
+                elif jumps is not None:
+                    _, first, last = jumps
+                    if reachable:
+                        env.forget(env.changed_since(first))
+                    else:
+                        changed = {name for name, _ in env.log[first:last]}
+                        env.rewind(last)
+                        env.forget(changed)
+                        reachable = True
+                if reachable and known and last_jump.get(x, -1) > i:
+                    written, calls = _written(program, functions, i + 1, last_jump[x] + 1)
+                    if calls:
+                        env.forget_all()
+                    else:
+                        env.forget(written)
+        elif op == ir.END_FUNC and functions_open:
+            env, reachable = functions_open.pop()
+            known = env.known
+        elif not reachable:
+            pass  # código inalcançável: copiado sem alterações
+        else:
+            if op in ir.READS_A and x is not None and type(x) is not ir.Const:
+                x = known.get(x, x)
+            if op in ir.BINARY:
+                if type(y) is not ir.Const:
+                    y = known.get(y, y)
+                if type(x) is ir.Const and type(y) is ir.Const:
+                    folded = fold_binary(program, op, x, y)
+                    if folded is not None:
+                        op, x, y = ir.COPY, folded, None
+            elif op in ir.UNARY and type(x) is ir.Const:
+                folded = fold_unary(program, op, x)
+                if folded is not None:
+                    op, x = ir.COPY, folded
+
+            if op == ir.IF_FALSE and type(x) is ir.Const and x.type == "boolean":
+                if x.value:
+                    continue  # condição sempre verdadeira: o salto nunca ocorre
+                op, x, y = ir.GOTO, y, None
+
+            if op == ir.GOTO or op == ir.IF_FALSE:
+                label = x if op == ir.GOTO else y
+                jumps = pending.get(label)
+                now = env.now()
+                if jumps is None or jumps[0] is not env:
+                    pending[label] = (env, now, now)
+                else:
+                    pending[label] = (env, jumps[1], now)
+            elif op == ir.PAR_BEGIN:
+                written, calls = _written(program, functions, i + 1, par_end[i])
+                if calls:
+                    env.forget_all()
+                else:
+                    env.forget(written)
+                par_written.append(written)
+            elif op == ir.PAR_END:
+                par_written.pop()
+            elif op == ir.CALL and x in functions:
+                env.forget_all()
+            else:
+                env.forget(ir.defs(op, d, x, y))
+                if op == ir.COPY and type(x) is ir.Const:
+                    if type(d) is int or not any(d in w for w in par_written):
+                        env.set(d, x)
+
+            if op in ir.NO_FALLTHROUGH:
+                reachable = False
+
+        new_ops.append(op)
+        new_dest.append(d)
+        new_a.append(x)
+        new_b.append(y)
+
+    program.replace(new_ops, new_dest, new_a, new_b)
+    remove_unused_constant_temps(program)
+    return program
+
+
+def remove_unused_constant_temps(program):
+    """Remove as cópias de constantes para temporários que ninguém mais lê."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    read = set()
+    for i, op in enumerate(ops):
+        read.update(ir.uses(op, dest[i], a[i], b[i]))
+    program.filter([not (op == ir.COPY and type(dest[i]) is int and type(a[i]) is ir.Const
+                         and dest[i] not in read)
+                    for i, op in enumerate(ops)])
+    return program
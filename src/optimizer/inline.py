@@ -0,0 +1,193 @@
+from collections import Counter
+
+from src.generator import ir
+from src.optimizer import cfg as cfg_module
+
+# =================================================
+# EXPANSÃO DE FUNÇÕES PEQUENAS (INLINING)
+# =================================================
+# Cada chamada custa os 'param' dos argumentos, o 'call', o 'begin_func', os
+# 'get_param' e o 'return' (mais o 'goto' morto que o segue). Esta passagem
+# troca as chamadas a funções pequenas pelo próprio corpo delas:
+#
+#   def f(a, b):                          t9 = x * y
+#       return a * b                      t5 = t9
+#   param y; param x; t5 = call f, 2  =>  goto L3
+#                                         L3:
+#
+# Expandem-se as funções registradas pela análise semântica
+# (IRProgram.function_info) que:
+#   - não chamam funções do programa (folhas: a expansão não cresce em cascata
+#     e não há recursão) e não contêm definições aninhadas nem blocos PAR;
+#   - têm no corpo alcançável no máximo 'budget' instruções (sem contar rótulos).
+# Na cópia do corpo, os parâmetros e os nomes definidos dentro da função (os
+# 'locals' da análise) recebem o sufixo '.<n>', que nenhum identificador do
+# MiniPar pode ter; o parâmetro é copiado do argumento ('a.3 = x') só se um
+# dos dois é escrito no corpo, senão as leituras dele passam a ler o próprio
+# argumento. Temporários e rótulos de salto são novos, e cada 'return'
+# vira a cópia do valor para o temporário da chamada e um salto para o rótulo
+# após a cópia. Chamadas dentro de blocos PAR não são expandidas, nem as de
+# funções com retorno sem valor alcançável quando o resultado é lido.
+# Definições cujas chamadas foram todas expandidas são removidas (o 'goto'
+# que as pulava fica para a otimização de saltos).
+
+INLINE_BUDGET = 16
+
+# Instruções da definição que não fazem parte do corpo copiado.
+_FRAME = frozenset({ir.LABEL, ir.BEGIN_FUNC, ir.GET_PARAM, ir.END_FUNC})
+
+
+class _Callee:
+    """Função candidata à expansão: parâmetros, locais e o corpo alcançável."""
+    __slots__ = ("params", "locals", "body", "labels", "written", "void", "indices")
+
+    def __init__(self, params, locals, body, labels, written, void, indices):
+        self.params = params    # nomes, na ordem dos argumentos
+        self.locals = locals    # nomes renomeados na cópia (inclui os parâmetros)
+        self.body = body        # instruções (op, dest, a, b) do corpo, em ordem
+        self.labels = labels    # rótulos de salto definidos no corpo
+        self.written = written  # nomes escritos no corpo
+        self.void = void        # há 'return' sem valor alcançável
+        self.indices = indices  # posições da definição no programa
+
+
+def _callee(program, function, info, functions, budget):
+    """_Callee da função, ou None se ela não pode ser expandida."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    indices = function.indices()
+    if indices[-1] - indices[0] + 1 != len(indices):
+        return None  # contém definições aninhadas
+    reachable = sorted(i for block in cfg_module.reverse_postorder(function) for i in block.indices)
+    body = []
+    labels = set()
+    written = set()
+    size = 0
+    void = False
+    for i in reachable:
+        op = ops[i]
+        if op == ir.PAR_BEGIN or (op == ir.CALL and a[i] in functions):
+            return None
+        if op == ir.LABEL and i != indices[0]:
+            labels.add(a[i])
+        elif op in _FRAME:
+            continue
+        else:
+            size += 1
+            written.update(ir.defs(op, dest[i], a[i], b[i]))
+            void = void or (op == ir.RETURN and a[i] is None)
+        body.append((op, dest[i], a[i], b[i]))
+    if size > budget:
+        return None
+    params = [dest[i] for i in indices if ops[i] == ir.GET_PARAM]
+    return _Callee(params, set(info["locals"]) | set(params), body, labels, written, void, indices)
+
+
+def _expand(program, callee, args, result):
+    """
+    Instruções que substituem 'result = call f' com os argumentos 'args', e
+    os nomes novos que elas escrevem.
+    """
+    after = program.new_label()
+    names = {name: f"{name}.{after.id}" for name in callee.locals}
+    labels = {label: program.new_label() for label in callee.labels}
+    temps = {}
+
+    def operand(x):
+        if type(x) is int:
+            t = temps.get(x)
+            if t is None:
+                t = temps[x] = program.new_temp()
+            return t
+        if type(x) is str:
+            return names.get(x, x)
+        return x  # constante ou rótulo de função
+
+    code = []
+    for p, arg in zip(callee.params, args):
+        if p in callee.written or (type(arg) is str and arg in callee.written):
+            code.append((ir.COPY, names[p], arg, None))
+        else:
+            # Nem o parâmetro nem o argumento mudam no corpo: lê-se o próprio argumento.
+            names[p] = arg
+    renamed = [name for local, name in names.items() if name != local and type(name) is str and "." in name]
+    for op, d, x, y in callee.body:
+        if op == ir.RETURN:
+            if x is not None:
+                code.append((ir.COPY, result, operand(x), None))
+            code.append((ir.GOTO, None, after, None))
+        elif op == ir.LABEL:
+            code.append((op, None, labels[x], None))
+        elif op == ir.GOTO:
+            code.append((op, None, labels.get(x, after), None))
+        elif op == ir.IF_FALSE:
+            code.append((op, None, operand(x), labels.get(y, after)))
+        else:
+            if op == ir.RECEIVE:
+                d = tuple(operand(v) for v in d)
+            elif d is not None:
+                d = operand(d)
+            if op in ir.BINARY or op == ir.CHANNEL_DECL:
+                y = operand(y)
+            code.append((op, d, operand(x), y))
+    code.append((ir.LABEL, None, after, None))
+    return code, renamed
+
+
+def inline_calls(program, budget=INLINE_BUDGET, stats=None):
+    """
+    Expande as chamadas a funções folha pequenas (ver acima) e remove as
+    definições que ficaram sem chamadas. Se 'stats' (um Counter) for dado,
+    acumula nele as chamadas expandidas ("calls") e as definições removidas
+    ("functions").
+    """
+    info = program.function_info
+    if not info:
+        return program
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    functions = program.defined_functions()
+    cfgs = cfg_module.build_cfg(program)
+    callees = {}
+    for function in cfgs:
+        if function.name != cfg_module.MAIN and function.name in info:
+            callee = _callee(program, function, info[function.name], functions, budget)
+            if callee is not None:
+                callees[program.function(function.name)] = callee
+    if not callees:
+        return program
+
+    in_par = cfg_module.par_positions(program)
+    read = {x for i, op in enumerate(ops) for x in ir.uses(op, dest[i], a[i], b[i]) if type(x) is int}
+    calls = Counter(a[i] for i, op in enumerate(ops) if op == ir.CALL)
+    expansions = {}  # posição do call -> instruções que o substituem
+    skipped = set()  # posições removidas: 'param' das chamadas expandidas e definições sem chamadas
+    for function in cfgs:
+        owner = info.get(function.name) if function.name != cfg_module.MAIN else None
+        for i in function.indices():
+            callee = callees.get(a[i]) if ops[i] == ir.CALL else None
+            if callee is None or i in in_par or (callee.void and dest[i] in read):
+                continue
+            n = b[i]
+            if n != len(callee.params) or i < n or any(ops[i - k] != ir.PARAM for k in range(1, n + 1)):
+                continue
+            expansions[i], renamed = _expand(program, callee, [a[i - k] for k in range(1, n + 1)], dest[i])
+            skipped.update(range(i - n, i))
+            calls[a[i]] -= 1
+            if owner is not None:
+                owner["locals"].update(renamed)  # as cópias são locais de quem chama
+
+    removed = [callee for label, callee in callees.items() if calls[label] == 0 and label in calls]
+    for callee in removed:
+        skipped.update(callee.indices)
+
+    new = ([], [], [], [])
+    for i in range(len(ops)):
+        if i in skipped:
+            continue
+        for instruction in expansions.get(i, ((ops[i], dest[i], a[i], b[i]),)):
+            for column, value in zip(new, instruction):
+                column.append(value)
+    program.replace(*new)
+    if stats is not None:
+        stats["calls"] += len(expansions)
+        stats["functions"] += len(removed)
+    return program
@@ -0,0 +1,313 @@
+from collections import Counter, defaultdict
+
+from src.generator import ir
+from src.optimizer import cfg as cfg_module
+from src.optimizer.copies import is_number, is_pure
+
+# =================================================
+# OTIMIZAÇÃO DE LAÇOS
+# =================================================
+# Encontra os laços naturais do grafo de cada função (arestas de volta para
+# um bloco que domina a origem) e, em cada laço, dos externos para os internos:
+#
+#   1. Move para um pré-cabeçalho (código inserido logo antes do rótulo do
+#      laço, por onde passam todas as entradas que vêm de fora) as operações
+#      invariantes: puras, escrevendo um temporário escrito uma só vez, com
+#      operandos constantes, não escritos no laço ou também movidos. Como o
+#      pré-cabeçalho executa mesmo quando o corpo não executa, só se movem
+#      operações que não podem falhar: as que não falham com nenhum operando,
+#      as aritméticas e comparações sobre operandos certamente numéricos
+#      (constantes, inteiros pela análise de _integer_names ou resultados de
+#      aritmética já movida; a divisão só com divisor constante não nulo) e,
+#      em qualquer caso, as do próprio cabeçalho que só têm antes de si, no
+#      bloco, instruções que não falham: o cabeçalho domina todas as saídas
+#      do laço e executa sempre que o laço é alcançado, então a falha apenas
+#      acontece um pouco antes, sem nenhum efeito no meio.
+#
+#   2. Redução de força: para uma variável de indução 'i' (escrita uma única
+#      vez no laço, por 'i = i + c' ou 'i = i - c', com c inteiro, e sempre
+#      inteira na entrada do laço), cada 't = i * k' com k inteiro constante
+#      passa a ler um temporário r, calculado no pré-cabeçalho ('r = i * k')
+#      e somado de c*k logo após cada escrita de i. A restrição a inteiros
+#      garante o mesmo resultado: com números reais as somas acumulariam
+#      arredondamentos.
+#
+# Chamadas a funções do programa podem escrever em qualquer variável, então
+# em laços com chamadas nenhuma variável é invariante nem de indução; 'receive'
+# escreve as suas variáveis como qualquer outra instrução. Laços que contêm
+# blocos PAR não são alterados.
+
+
+_ARITHMETIC = frozenset({ir.ADD, ir.SUB, ir.MUL, ir.DIV, ir.NEG})  # resultado numérico
+_ORDER = frozenset({ir.LT, ir.GT, ir.LE, ir.GE})
+
+
+def _integer_names(program, function, functions, in_par, tracked):
+    """
+    Operandos de 'tracked' certamente inteiros na entrada de cada bloco
+    ({bloco: conjunto}), por uma análise para a frente até o ponto fixo
+    (interseção nos pontos de junção). Cópias de inteiros e +, -, * e negação
+    de inteiros são inteiros; os operandos não acompanhados não são.
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    order = cfg_module.reverse_postorder(function)
+
+    def integer(x, known):
+        if type(x) is ir.Const:
+            return type(x.value) is int
+        return x in known
+
+    def transfer(block, known):
+        known = set(known)
+        for i in block.indices:
+            op, d = ops[i], dest[i]
+            if op == ir.CALL and a[i] in functions:
+                known = {x for x in known if type(x) is int}
+            if i in in_par or d not in tracked:
+                known.difference_update(ir.defs(op, d, a[i], b[i]))
+            elif op == ir.COPY and integer(a[i], known):
+                known.add(d)
+            elif (op == ir.ADD or op == ir.SUB or op == ir.MUL) and integer(a[i], known) and integer(b[i], known):
+                known.add(d)
+            elif op == ir.NEG and integer(a[i], known):
+                known.add(d)
+            else:
+                known.difference_update(ir.defs(op, d, a[i], b[i]))
+        return known
+
+    entry_in = {function.entry: set()}
+    out = {}
+    changed = True
+    while changed:
+        changed = False
+        for block in order:
+            if block is function.entry:
+                known = entry_in[block]
+            else:
+                outs = [out[p] for p in block.preds if p in out]
+                known = set.intersection(*outs) if outs else set()
+            entry_in[block] = known
+            new = transfer(block, known)
+            if out.get(block) != new:
+                out[block] = new
+                changed = True
+    return entry_in
+
+
+class _LoopChanges:
+    """Alterações pendentes no programa, aplicadas de uma vez no final."""
+
+    def __init__(self):
+        self.before = defaultdict(list)  # posição -> instruções inseridas antes dela
+        self.after = defaultdict(list)   # posição -> instruções inseridas depois dela
+        self.moved = set()               # posições das instruções movidas para pré-cabeçalhos
+        self.retarget = {}               # posição de um salto -> novo rótulo
+        self.reduced = {}                # temporário da redução de força -> posição após a qual é somado
+
+    def apply(self, program):
+        ops, dest, a, b = program.ops, program.dest, program.a, program.b
+        new = ([], [], [], [])
+
+        def emit(instruction):
+            for column, value in zip(new, instruction):
+                column.append(value)
+
+        for i in range(len(ops)):
+            for instruction in self.before.get(i, ()):
+                emit(instruction)
+            if i in self.moved:
+                continue
+            op, x, y = ops[i], a[i], b[i]
+            if i in self.retarget:
+                if op == ir.GOTO:
+                    x = self.retarget[i]
+                else:
+                    y = self.retarget[i]
+            emit((op, dest[i], x, y))
+            for instruction in self.after.get(i, ()):
+                emit(instruction)
+        program.replace(*new)
+
+
+def _induction_step(program, name, loop_defs, is_integer):
+    """
+    Incremento c (com sinal) da variável de indução 'name', e a posição da sua
+    única escrita no laço; None se 'name' não é uma variável de indução inteira.
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    writes = loop_defs.get(name)
+    if type(name) is not str or writes is None or len(writes) != 1 or not is_integer(name):
+        return None
+    q = writes[0]
+    update = q
+    if ops[q] == ir.COPY and type(a[q]) is int:
+        # 't = i + c' seguido de 'i = t'
+        temp_writes = loop_defs.get(a[q])
+        if temp_writes is None or len(temp_writes) != 1:
+            return None
+        update = temp_writes[0]
+    op, x, y = ops[update], a[update], b[update]
+    if op == ir.ADD and x == name and _int_const(y):
+        return y.value, q
+    if op == ir.ADD and y == name and _int_const(x):
+        return x.value, q
+    if op == ir.SUB and x == name and _int_const(y):
+        return -y.value, q
+    return None
+
+
+def _induction_candidates(program, function):
+    """
+    Variáveis multiplicadas por inteiros constantes na função e os temporários
+    copiados para elas: os únicos nomes cujo tipo interessa à redução de força.
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    indices = function.indices()
+    names = set()
+    for i in indices:
+        if ops[i] == ir.MUL:
+            if type(a[i]) is str and _int_const(b[i]):
+                names.add(a[i])
+            elif type(b[i]) is str and _int_const(a[i]):
+                names.add(b[i])
+    temps = {a[i] for i in indices if ops[i] == ir.COPY and dest[i] in names and type(a[i]) is int}
+    return names | temps
+
+
+def _numeric_operands(program, function):
+    """Operandos das aritméticas e comparações da função: os que podem ser movidos se forem números."""
+    ops, a, b = program.ops, program.a, program.b
+    names = set()
+    for i in function.indices():
+        if ops[i] in _ARITHMETIC or ops[i] in _ORDER:
+            names.update(x for x in (a[i], b[i]) if type(x) is int or type(x) is str)
+    return names
+
+
+def _int_const(x):
+    return type(x) is ir.Const and type(x.value) is int
+
+
+def optimize_loops(program):
+    """Move operações invariantes para fora dos laços e reduz multiplicações por variáveis de indução."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    functions = program.defined_functions()
+    in_par = cfg_module.par_positions(program)
+    temp_writes = Counter(d for op, d in zip(ops, dest) if op in ir.WRITES_DEST and type(d) is int)
+    changes = _LoopChanges()
+
+    for function in cfg_module.build_cfg(program):
+        idom = cfg_module.dominators(function)
+        integers = None
+        for header, body in cfg_module.natural_loops(function, idom):
+            positions = sorted(i for block in body for i in block.indices if i not in changes.moved)
+            if any(i in in_par for i in positions):
+                continue
+            start = header.start
+            if any(p in body and p.end + 1 == start and ops[p.end] not in ir.NO_FALLTHROUGH
+                   for p in header.preds):
+                continue  # o laço cai no próprio cabeçalho: não há onde pôr o pré-cabeçalho
+
+            loop_defs = {}
+            calls = False
+            for i in positions:
+                for name in ir.defs(ops[i], dest[i], a[i], b[i]):
+                    loop_defs.setdefault(name, []).append(i)
+                if ops[i] == ir.CALL and a[i] in functions:
+                    calls = True
+
+            inside = set(positions)
+
+            def invariant(x):
+                if x in changes.reduced:
+                    return changes.reduced[x] not in inside
+                return (type(x) is ir.Const
+                        or (x not in loop_defs and not (calls and type(x) is str)))
+
+            # 1. Operações invariantes, em ordem (cada definição vem antes dos usos).
+            if integers is None:
+                integers = _integer_names(program, function, functions, in_par,
+                                          _numeric_operands(program, function)
+                                          | _induction_candidates(program, function))
+            known = integers.get(header, ())
+            numbers = set()  # temporários movidos com resultado numérico
+
+            def number(x):
+                return is_number(x) or x in known or x in numbers
+
+            def safe(i):
+                if is_pure(ops[i], a[i], b[i], number):
+                    return True
+                # No cabeçalho, basta que nada antes dela no bloco possa falhar ou ter efeitos.
+                return i in header.indices and all(
+                    ops[j] == ir.LABEL or j in changes.moved or is_pure(ops[j], a[j], b[j], number)
+                    for j in header.indices if j < i)
+
+            hoisted = []
+            changed = True
+            while changed:
+                changed = False
+                for i in positions:
+                    d = dest[i]
+                    if (i in changes.moved or type(d) is not int or temp_writes[d] != 1
+                            or ops[i] not in ir.BINARY and ops[i] not in ir.UNARY and ops[i] != ir.COPY):
+                        continue
+                    if all(invariant(x) for x in ir.uses(ops[i], d, a[i], b[i])) and safe(i):
+                        changes.moved.add(i)
+                        hoisted.append(i)
+                        if ops[i] in _ARITHMETIC:
+                            numbers.add(d)
+                        del loop_defs[d]
+                        changed = True
+            preheader = [(ops[i], dest[i], a[i], b[i]) for i in sorted(hoisted)]
+
+            # 2. Redução de força.
+            if not calls:
+                reduced = {}  # (i, k) -> temporário r
+                for i in positions:
+                    if ops[i] != ir.MUL or i in changes.moved or type(dest[i]) is not int:
+                        continue
+                    x, y = a[i], b[i]
+                    name, k = (x, y) if _int_const(y) else (y, x)
+                    if not _int_const(k):
+                        continue
+                    induction = _induction_step(program, name, loop_defs, known.__contains__)
+                    if induction is None:
+                        continue
+                    step, q = induction
+                    r = reduced.get((name, k))
+                    if r is None:
+                        r = reduced[(name, k)] = program.new_temp()
+                        changes.reduced[r] = q
+                        preheader.append((ir.MUL, r, name, k))
+                        increment = step * k.value
+                        changes.after[q].append((ir.ADD, r, r, program.constant(increment)) if increment >= 0
+                                                else (ir.SUB, r, r, program.constant(-increment)))
+                    ops[i], a[i], b[i] = ir.COPY, r, None
+
+            if not preheader:
+                continue
+            # As entradas no laço por salto (de fora dele) passam a ir para o pré-cabeçalho.
+            labels = _leading_labels(program, header)
+            outside_jumps = [p.end for p in header.preds if p not in body
+                             and ((ops[p.end] == ir.GOTO and a[p.end] in labels)
+                                  or (ops[p.end] == ir.IF_FALSE and b[p.end] in labels))]
+            if outside_jumps:
+                label = program.new_label()
+                preheader.insert(0, (ir.LABEL, None, label, None))
+                for p in outside_jumps:
+                    changes.retarget[p] = label
+            changes.before[start].extend(preheader)
+
+    changes.apply(program)
+    return program
+
+
+def _leading_labels(program, block):
+    """Rótulos no início do bloco."""
+    labels = set()
+    for i in block.indices:
+        if program.ops[i] != ir.LABEL:
+            break
+        labels.add(program.a[i])
+    return labels
@@ -0,0 +1,206 @@
+from src.generator import ir
+from src.optimizer import cfg as cfg_module
+
+# =================================================
+# NUMERAÇÃO DE VALORES (ELIMINAÇÃO DE SUBEXPRESSÕES COMUNS)
+# =================================================
+# O gerador emite um temporário novo para cada operação, então '(a+b)*(a+b)'
+# ou a condição repetida 'i < n' calculam o mesmo valor mais de uma vez. Esta
+# passagem dá a cada valor um número: operandos com o mesmo número guardam o
+# mesmo valor, e uma operação com o mesmo opcode e os mesmos números de
+# operandos de uma anterior produz o mesmo resultado. Se o nome que recebeu
+# aquele resultado ainda o guarda, a operação vira uma cópia dele
+# ('t3 = t1'), que a propagação de cópias e a remoção de temporários mortos
+# depois eliminam.
+#
+# As tabelas valem dentro de cada bloco básico e são herdadas pelos blocos
+# que ele domina (percorrendo a árvore de dominadores, com um registro de
+# alterações desfeito na volta). Como o C3E não está em forma SSA, ao entrar
+# em um bloco com vários predecessores recebem números novos os nomes
+# escritos nos caminhos que vêm do dominador imediato até ele (o corpo inteiro,
+# nos laços). Recebem número novo também:
+#   - as variáveis escritas por 'receive', os parâmetros e os canais;
+#   - todas as variáveis, após uma chamada a função do programa;
+#   - tudo o que é escrito dentro de blocos PAR, onde nada é reaproveitado,
+#     pois os comandos do bloco não têm ordem definida entre si.
+
+# Operações cujo resultado não depende da ordem dos operandos. A soma entra
+# porque 'add' só soma números; a concatenação ('concat') e a soma de tipo
+# desconhecido ('add_any', que pode concatenar), não.
+COMMUTATIVE = frozenset({ir.ADD, ir.MUL, ir.EQ, ir.NE})
+
+
+class _ValueTable:
+    """
+    Números de valor dos operandos e resultados das operações já vistas, com
+    o registro de alterações (tabela, chave, valor anterior) usado para voltar
+    ao estado de um bloco dominador.
+
+    Os números das variáveis levam a geração em que foram dados; esquecer todas
+    as variáveis (após uma chamada) é só passar à geração seguinte.
+    """
+
+    def __init__(self):
+        self.numbers = {}      # temporário -> número; variável -> (geração, número)
+        self.expressions = {}  # (opcode, números dos operandos) -> (número, nome que o guarda)
+        self.state = {"generation": 0}
+        self.log = []
+        self.count = 0
+
+    def mark(self):
+        return len(self.log)
+
+    def undo(self, mark):
+        log = self.log
+        while len(log) > mark:
+            table, key, old = log.pop()
+            if old is None:
+                del table[key]
+            else:
+                table[key] = old
+
+    def _set(self, table, key, value):
+        self.log.append((table, key, table.get(key)))
+        table[key] = value
+
+    def current(self, name):
+        """Número de valor atual de 'name', ou None se ainda não tem."""
+        n = self.numbers.get(name)
+        if n is not None and type(name) is str:
+            return n[1] if n[0] == self.state["generation"] else None
+        return n
+
+    def copy(self, name, n):
+        """Registra que 'name' passa a guardar o valor de número 'n'."""
+        self._set(self.numbers, name, (self.state["generation"], n) if type(name) is str else n)
+
+    def fresh(self, name):
+        """Dá a 'name' um número novo (o valor escrito não é conhecido)."""
+        self.count += 1
+        self.copy(name, self.count)
+        return self.count
+
+    def number(self, x):
+        """Número de valor de um operando; uma constante é o seu próprio número."""
+        if type(x) is ir.Const:
+            return x
+        n = self.current(x)
+        return self.fresh(x) if n is None else n
+
+    def forget_variables(self):
+        self._set(self.state, "generation", self.state["generation"] + 1)
+
+    def find(self, key):
+        """Nome que ainda guarda o resultado da operação 'key', ou None."""
+        known = self.expressions.get(key)
+        if known is not None and self.current(known[1]) == known[0]:
+            return known[1]
+        return None
+
+    def record(self, key, name):
+        self._set(self.expressions, key, (self.fresh(name), name))
+
+
+def _block_effects(program, function, functions):
+    """Nomes escritos por cada bloco e se ele chama uma função do programa."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    effects = {}
+    for block in function.blocks:
+        written = set()
+        calls = False
+        for i in block.indices:
+            op = ops[i]
+            written.update(ir.defs(op, dest[i], a[i], b[i]))
+            if op == ir.CALL and a[i] in functions:
+                calls = True
+        effects[block] = (written, calls)
+    return effects
+
+
+def _merge_region(block, idom):
+    """
+    Blocos (alcançáveis) que podem ser executados entre a saída do dominador
+    imediato de 'block' e a entrada nele: busca para trás a partir dos
+    predecessores, parando no dominador.
+    """
+    stop = idom[block]
+    region = set()
+    stack = [p for p in block.preds if p is not stop and p in idom]
+    while stack:
+        b = stack.pop()
+        if b in region:
+            continue
+        region.add(b)
+        stack.extend(p for p in b.preds if p is not stop and p in idom and p not in region)
+    return region
+
+
+def _number_block(program, block, values, functions, in_par):
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    for i in block.indices:
+        op = ops[i]
+        d = dest[i]
+        if i in in_par:
+            if op == ir.CALL and a[i] in functions:
+                values.forget_variables()
+            for name in ir.defs(op, d, a[i], b[i]):
+                values.fresh(name)
+        elif op in ir.BINARY or op in ir.UNARY:
+            x = values.number(a[i])
+            y = values.number(b[i]) if op in ir.BINARY else None
+            key = (op, frozenset((x, y))) if op in COMMUTATIVE else (op, x, y)
+            holder = values.find(key)
+            if holder is None or holder == d:
+                values.record(key, d)
+            else:
+                ops[i], a[i], b[i] = ir.COPY, holder, None
+                values.copy(d, values.current(holder))
+        elif op == ir.COPY:
+            values.copy(d, values.number(a[i]))
+        else:
+            if op == ir.CALL and a[i] in functions:
+                # A função pode escrever em qualquer variável; os temporários são locais.
+                values.forget_variables()
+            for name in ir.defs(op, d, a[i], b[i]):
+                values.fresh(name)
+
+
+def number_values(program):
+    """Troca por cópias as operações que recalculam um valor já disponível, em cada função."""
+    functions = program.defined_functions()
+    in_par = cfg_module.par_positions(program)
+    for function in cfg_module.build_cfg(program):
+        idom = cfg_module.dominators(function)
+        children = cfg_module.dominator_tree(function, idom)
+        effects = _block_effects(program, function, functions)
+        values = _ValueTable()
+
+        # Pré-ordem da árvore de dominadores; um inteiro na pilha é a marca do
+        # registro a restaurar ao terminar a subárvore de um bloco.
+        stack = [function.entry]
+        while stack:
+            item = stack.pop()
+            if type(item) is int:
+                values.undo(item)
+                continue
+            stack.append(values.mark())
+            # A entrada também é alcançada pelo início da função.
+            if len(item.preds) > (0 if item is function.entry else 1):
+                calls = False
+                for other in _merge_region(item, idom):
+                    written, other_calls = effects[other]
+                    calls = calls or other_calls
+                    for name in written:
+                        values.fresh(name)
+                if calls:
+                    values.forget_variables()
+            _number_block(program, item, values, functions, in_par)
+            stack.extend(reversed(children[item]))
+
+        # Blocos inalcançáveis: só a numeração local, a partir de tabelas vazias.
+        for block in function.blocks:
+            if block not in idom:
+                mark = values.mark()
+                _number_block(program, block, values, functions, in_par)
+                values.undo(mark)
+    return program
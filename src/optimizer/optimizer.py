@@ -0,0 +1,49 @@
+import gc
+
+from src.optimizer import copies, fold, inline, loops, lvn, peephole, sccp, slots
+
+# =================================================
+# OTIMIZADOR DE C3E
+# =================================================
+# As passagens trabalham sobre o programa estruturado (src/generator/ir.py),
+# modificando-o, e são aplicadas em ordem conforme o nível de otimização
+# pedido na linha de comando (-O, -O2, ...). O nível 0 não altera o código.
+
+# Nível a partir do qual as passagens usam as informações das funções da
+# análise semântica (IRProgram.function_info), que o gerador precisa receber.
+FUNCTION_INFO_LEVEL = 2
+
+# (nível mínimo, passagem)
+PASSES = [
+    (FUNCTION_INFO_LEVEL, inline.inline_calls),
+    (1, fold.fold_constants),
+    (2, sccp.propagate_conditional_constants),
+    (1, peephole.optimize_jumps),
+    (2, lvn.number_values),
+    (2, loops.optimize_loops),
+    (1, copies.optimize_copies),
+    (1, slots.reuse_temps),  # sempre a última: renomeia os temporários
+]
+
+MAX_LEVEL = max(level for level, _ in PASSES)
+
+
+def optimize(program, level=1, passes=None):
+    """
+    Aplica ao programa (ir.IRProgram) as passagens do nível dado e o retorna.
+    'passes' substitui a lista PASSES (por exemplo, para medir o efeito de uma
+    passagem isolada).
+    """
+    # As passagens criam muitos objetos de vida curta (blocos, conjuntos de
+    # vivacidade); com o coletor ligado, as varreduras do heap inteiro (a AST
+    # ainda está viva) dominariam o tempo em programas grandes.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for min_level, optimization in PASSES if passes is None else passes:
+            if level >= min_level:
+                optimization(program)
+    finally:
+        if enabled:
+            gc.enable()
+    return program
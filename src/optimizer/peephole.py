@@ -0,0 +1,166 @@
+from collections import Counter
+
+from src.generator import ir
+
+# =================================================
+# OTIMIZAÇÃO DE SALTOS (PEEPHOLE)
+# =================================================
+# O gerador emite saltos e rótulos de forma mecânica: 'goto' para o fim do
+# if/else logo antes do 'goto' de volta do laço, 'goto' para o fim da função
+# depois de um 'return', rótulos que ninguém referencia. Esta passagem aplica
+# um conjunto de regras, cada uma uma função que reescreve o programa e
+# retorna quantas vezes atuou, repetindo a lista inteira até nenhuma atuar:
+#   threading    salto para um rótulo seguido de 'goto M' passa a saltar para M;
+#   return       'goto L' com L seguido de 'return x' vira o próprio 'return x';
+#   redundant    salto para um rótulo que vem logo a seguir é removido;
+#   unreachable  instruções após 'goto'/'return', até o próximo rótulo
+#                referenciado, são removidas (mantendo os marcadores de
+#                função e de blocos PAR);
+#   dead_labels  rótulos de salto que nenhum salto referencia são removidos.
+# Rótulos de função nunca são removidos: são alcançados pelas chamadas.
+
+
+def _label_positions(program):
+    """Posição de cada rótulo no programa."""
+    return {a: i for i, (op, a) in enumerate(zip(program.ops, program.a)) if op == ir.LABEL}
+
+
+def _jump_label(op, a, b):
+    """Rótulo de destino de um salto, ou None se a instrução não é um salto."""
+    if op == ir.GOTO:
+        return a
+    if op == ir.IF_FALSE:
+        return b
+    return None
+
+
+def _after_labels(ops, i):
+    """Posição da primeira instrução, a partir de i, que não é um rótulo."""
+    n = len(ops)
+    while i < n and ops[i] == ir.LABEL:
+        i += 1
+    return i
+
+
+def thread_jumps(program):
+    """Encadeamentos 'goto L' ... 'L: goto M' passam a saltar direto para o destino final."""
+    ops, a, b = program.ops, program.a, program.b
+    positions = _label_positions(program)
+    hits = 0
+    for i, op in enumerate(ops):
+        label = _jump_label(op, a[i], b[i])
+        if label is None:
+            continue
+        final = label
+        seen = {label}
+        while final in positions:
+            k = _after_labels(ops, positions[final])
+            if k == len(ops) or ops[k] != ir.GOTO:
+                break
+            if a[k] in seen:
+                final = label  # ciclo de gotos (laço infinito vazio): mantém o salto
+                break
+            final = a[k]
+            seen.add(final)
+        if final is not label:
+            if op == ir.GOTO:
+                a[i] = final
+            else:
+                b[i] = final
+            hits += 1
+    return hits
+
+
+def jump_to_return(program):
+    """'goto L' com L seguido de 'return x' é trocado pelo próprio 'return x'."""
+    ops, a = program.ops, program.a
+    positions = _label_positions(program)
+    hits = 0
+    for i, op in enumerate(ops):
+        if op == ir.GOTO and a[i] in positions:
+            k = _after_labels(ops, positions[a[i]])
+            if k < len(ops) and ops[k] == ir.RETURN:
+                ops[i] = ir.RETURN
+                a[i] = a[k]
+                hits += 1
+    return hits
+
+
+def remove_redundant_jumps(program):
+    """Remove os saltos para um rótulo que vem logo a seguir (a execução chegaria nele de qualquer jeito)."""
+    ops, a, b = program.ops, program.a, program.b
+    keep = [True] * len(ops)
+    for i, op in enumerate(ops):
+        label = _jump_label(op, a[i], b[i])
+        if label is None:
+            continue
+        k = i + 1
+        while k < len(ops) and ops[k] == ir.LABEL:
+            if a[k] is label:
+                keep[i] = False
+                break
+            k += 1
+    program.filter(keep)
+    return keep.count(False)
+
+
+def _referenced_labels(program):
+    return {_jump_label(op, a, b) for op, _, a, b in program} - {None}
+
+
+# Marcadores de estrutura: delimitam funções e blocos PAR e nunca são removidos.
+_MARKERS = frozenset({ir.BEGIN_FUNC, ir.END_FUNC, ir.PAR_BEGIN, ir.PAR_END})
+
+
+def remove_unreachable(program):
+    """Remove as instruções após 'goto' ou 'return' que nenhum salto ou chamada alcança."""
+    ops, a = program.ops, program.a
+    entries = _referenced_labels(program) | program.defined_functions()
+    keep = [True] * len(ops)
+    dead = False
+    for i, op in enumerate(ops):
+        if op == ir.LABEL and a[i] in entries:
+            dead = False
+        elif dead and op not in _MARKERS:
+            keep[i] = False
+        elif op in ir.NO_FALLTHROUGH:
+            dead = True
+    program.filter(keep)
+    return keep.count(False)
+
+
+def remove_dead_labels(program):
+    """Remove os rótulos de salto que nenhum salto referencia."""
+    ops, a = program.ops, program.a
+    used = _referenced_labels(program) | program.defined_functions()
+    keep = [op != ir.LABEL or a[i] in used for i, op in enumerate(ops)]
+    program.filter(keep)
+    return keep.count(False)
+
+
+# (nome, regra): cada regra reescreve o programa e retorna o número de atuações.
+RULES = [
+    ("threading", thread_jumps),
+    ("return", jump_to_return),
+    ("redundant", remove_redundant_jumps),
+    ("unreachable", remove_unreachable),
+    ("dead_labels", remove_dead_labels),
+]
+
+
+def optimize_jumps(program, rules=RULES, stats=None):
+    """
+    Aplica as regras ao programa até o ponto fixo. Se 'stats' (um Counter) for
+    dado, acumula nele o número de atuações de cada regra.
+    """
+    if stats is None:
+        stats = Counter()
+    changed = True
+    while changed:
+        changed = False
+        for name, rule in rules:
+            hits = rule(program)
+            if hits:
+                stats[name] += hits
+                changed = True
+    return program
@@ -0,0 +1,181 @@
+from src.generator import ir
+from src.optimizer import cfg as cfg_module
+from src.optimizer import ssa
+from src.optimizer.fold import fold_binary, fold_unary
+
+# =================================================
+# PROPAGAÇÃO ESPARSA CONDICIONAL DE CONSTANTES
+# =================================================
+# Algoritmo de Wegman e Zadeck sobre a forma SSA (src/optimizer/ssa.py). Cada
+# valor começa como ainda não visto e só desce no reticulado
+#   (não visto) -> constante -> variável
+# e cada aresta do grafo só é considerada depois de se mostrar executável: um
+# 'if_false' com condição constante torna executável só um dos lados, e as
+# phis juntam apenas os valores das arestas executáveis. Assim, ao contrário
+# do dobramento de -O1 (fold.py), a análise é otimista nos laços: em
+#   f = 1
+#   while (k < n):
+#       if (f != 1):
+#           f = 2
+# o ramo interno nunca executa, então 'f' continua 1 no laço e depois dele.
+#
+# Duas listas de trabalho (arestas do grafo e arestas definição-uso) são
+# esvaziadas até o ponto fixo; como cada valor desce no máximo duas vezes, o
+# tempo é proporcional ao tamanho da forma SSA. No fim, as leituras de valores
+# constantes viram a constante, os desvios resolvidos viram 'goto' (ou somem)
+# e os blocos que nunca executam são removidos (ssa.out_of_ssa). Dentro de
+# blocos PAR, onde os comandos não têm ordem definida, nada é reescrito: as
+# escritas são variáveis e os dois lados de cada desvio são executáveis.
+
+_VARYING = object()  # valor não constante (o fundo do reticulado); None é "ainda não visto"
+
+
+def _meet(x, y):
+    if x is None:
+        return y
+    if y is None or x is y:
+        return x
+    return _VARYING
+
+
+class _Propagation:
+    """Estado da propagação em uma função: valores do reticulado, arestas e blocos executáveis."""
+
+    def __init__(self, program, form, in_par):
+        self.program = program
+        self.form = form
+        self.in_par = in_par
+        self.lattice = [None] * len(form.names)
+        self.edges = set()       # (predecessor ou None, bloco) executáveis
+        self.executable = set()
+        self.flow = [(None, form.function.entry)]
+        self.values = []         # valores que desceram no reticulado
+        self.block_of = {}
+        self.label_block = {}
+        for block in form.function.blocks:
+            for i in block.indices:
+                self.block_of[i] = block
+            for i in block.indices:
+                if program.ops[i] != ir.LABEL:
+                    break
+                self.label_block[program.a[i]] = block
+        # Valores de entrada: desconhecidos.
+        for v, origin in enumerate(form.origin):
+            if origin is None:
+                self.lattice[v] = _VARYING
+
+    def lower(self, v, new):
+        old = self.lattice[v]
+        if old is _VARYING or new is None or old is new:
+            return
+        self.lattice[v] = new if old is None else _VARYING
+        self.values.append(v)
+
+    def operand(self, x, v):
+        """Elemento do reticulado de um operando (x, com valor SSA v)."""
+        return x if type(x) is ir.Const else self.lattice[v]
+
+    def visit_phi(self, phi):
+        new = None
+        for p, v in zip(ssa.preds(self.form.function, phi.block), phi.args):
+            if (p, phi.block) in self.edges:
+                new = _meet(new, self.lattice[v])
+        self.lower(phi.value, new)
+
+    def visit(self, i):
+        program, form = self.program, self.form
+        op = program.ops[i]
+        defs = form.defs[i]
+        if i in self.in_par:
+            for _, v in defs:
+                self.lower(v, _VARYING)
+            if op == ir.IF_FALSE:
+                self.branch(i, _VARYING)
+            return
+        uses = form.uses[i]
+        if op == ir.COPY:
+            self.lower(defs[0][1], self.operand(program.a[i], uses[0]))
+        elif op in ir.BINARY or op in ir.UNARY:
+            x = self.operand(program.a[i], uses[0])
+            y = self.operand(program.b[i], uses[1]) if op in ir.BINARY else None
+            if x is None or (op in ir.BINARY and y is None):
+                return
+            if x is _VARYING or y is _VARYING:
+                result = _VARYING
+            elif op in ir.BINARY:
+                result = fold_binary(program, op, x, y)
+            else:
+                result = fold_unary(program, op, x)
+            self.lower(defs[0][1], _VARYING if result is None else result)
+        elif op == ir.IF_FALSE:
+            self.branch(i, self.operand(program.a[i], uses[0]))
+        else:
+            for _, v in defs:
+                self.lower(v, _VARYING)
+
+    def branch(self, i, condition):
+        """Torna executáveis as saídas do 'if_false' em i possíveis para a condição."""
+        if condition is None:
+            return
+        block = self.block_of[i]
+        if type(condition) is ir.Const and condition.type == "boolean":
+            if condition.value:
+                targets = [s for s in block.succs if s.start == i + 1]
+            else:
+                targets = [self.label_block.get(self.program.b[i])]
+        else:
+            targets = block.succs
+        self.flow.extend((block, s) for s in targets if s is not None)
+
+    def run(self):
+        form, ops = self.form, self.program.ops
+        flow, values = self.flow, self.values
+        while flow or values:
+            while flow:
+                edge = flow.pop()
+                if edge in self.edges:
+                    continue
+                self.edges.add(edge)
+                block = edge[1]
+                for phi in form.phis.get(block, ()):
+                    self.visit_phi(phi)
+                if block in self.executable:
+                    continue
+                self.executable.add(block)
+                for i in block.indices:
+                    self.visit(i)
+                if not block.indices or ops[block.end] != ir.IF_FALSE:
+                    flow.extend((block, s) for s in block.succs)
+            while values:
+                for user in form.users[values.pop()]:
+                    if type(user) is int:
+                        if self.block_of[user] in self.executable:
+                            self.visit(user)
+                    elif user.block in self.executable:
+                        self.visit_phi(user)
+        return self
+
+
+def propagate_conditional_constants(program, stats=None):
+    """
+    Propaga constantes pela forma SSA de cada função, resolvendo os desvios
+    com condição constante e removendo o código que nunca executa. Se 'stats'
+    (um Counter) for dado, acumula nele os desvios resolvidos ("branches"),
+    as phis ("phis") e as instruções analisadas ("instructions").
+    """
+    in_par = cfg_module.par_positions(program)
+    modified = ssa.modified_names(program)
+    forms = [ssa.build_ssa(program, function, modified) for function in cfg_module.build_cfg(program)]
+    results = []
+    for form in forms:
+        propagation = _Propagation(program, form, in_par).run()
+        constants = {v: c for v, c in enumerate(propagation.lattice) if type(c) is ir.Const}
+        results.append((form, constants, propagation.executable))
+        if stats is not None:
+            stats["phis"] += form.phi_count()
+            stats["instructions"] += len(form.uses)
+
+    branches = ssa.out_of_ssa(program, results, in_par)
+    if stats is not None:
+        stats["branches"] += branches
+    return program
@@ -0,0 +1,63 @@
+import heapq
+
+from src.generator import ir
+from src.optimizer import cfg as cfg_module
+
+# =================================================
+# REUSO DE TEMPORÁRIOS (ALOCAÇÃO POR VARREDURA LINEAR)
+# =================================================
+# O gerador cria um temporário novo por expressão. Esta passagem renomeia os
+# temporários de cada função para um pequeno conjunto de posições (slots)
+# reutilizáveis: com os intervalos de vida obtidos da análise de vivacidade,
+# percorre os intervalos em ordem de início e dá a cada um o menor slot livre,
+# liberando os slots dos intervalos que já terminaram. Um slot pode ser
+# reaproveitado pela própria instrução que faz a última leitura do anterior
+# ('t0 = t0 * 3'), pois ela lê os operandos antes de escrever o destino.
+#
+# Cada função recebe uma faixa própria de slots, então um temporário vivo
+# durante uma chamada nunca divide o nome com os temporários da função chamada.
+# Deve ser a última passagem: as demais supõem temporários escritos uma só vez.
+
+
+def linear_scan(ranges):
+    """Mapa temporário -> slot (0, 1, ...) para os intervalos {temp: [início, fim]}."""
+    assignment = {}
+    active = []   # heap de (fim, slot) dos intervalos em uso
+    free = []     # heap de slots livres
+    next_slot = 0
+    for temp, (start, end) in sorted(ranges.items(), key=lambda item: item[1][0]):
+        while active and active[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(active)[1])
+        if free:
+            slot = heapq.heappop(free)
+        else:
+            slot = next_slot
+            next_slot += 1
+        assignment[temp] = slot
+        heapq.heappush(active, (end, slot))
+    return assignment
+
+
+def reuse_temps(program):
+    """Renomeia os temporários do programa para slots reutilizáveis, por função."""
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    base = 0
+    for function in cfg_module.build_cfg(program):
+        cfg_module.liveness(program, function)
+        ranges = cfg_module.live_ranges(program, function)
+        if not ranges:
+            continue
+        assignment = linear_scan(ranges)
+        rename = {temp: base + slot for temp, slot in assignment.items()}
+        for i in function.indices():
+            if type(dest[i]) is int:
+                dest[i] = rename[dest[i]]
+            if type(a[i]) is int:
+                a[i] = rename[a[i]]
+            if type(b[i]) is int and ops[i] in ir.BINARY:  # em call/send, 'b' é o nº de argumentos
+                b[i] = rename[b[i]]
+        base += max(assignment.values()) + 1
+    program.temp_count = base
+    # Cópias entre temporários que caíram no mesmo slot ('t1 = t1') não fazem nada.
+    program.filter([not (op == ir.COPY and type(d) is int and d == x) for op, d, x in zip(ops, dest, a)])
+    return program
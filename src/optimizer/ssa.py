@@ -0,0 +1,292 @@
+from collections import defaultdict
+
+from src.generator import ir
+from src.optimizer import cfg as cfg_module
+
+# =================================================
+# FORMA SSA
+# =================================================
+# Na forma SSA (atribuição única estática) cada escrita de um nome cria um
+# valor novo, e cada leitura se refere a exatamente um valor; nos blocos onde
+# caminhos com valores diferentes se juntam, uma função phi escolhe o valor
+# conforme o predecessor pelo qual se chegou. As análises sobre a forma SSA
+# seguem as arestas definição-uso (users) em vez de iterar conjuntos sobre o
+# grafo inteiro.
+#
+# A forma é construída pelo método de Cytron et al.: fronteiras de dominância
+# (pelo percurso de Cooper, Harvey e Kennedy), phis nas fronteiras iteradas
+# dos blocos que escrevem cada nome (só para os nomes lidos em algum bloco
+# antes de serem escritos nele: forma semi-podada) e renomeação por um
+# percurso da árvore de dominadores, com uma pilha de valores por nome.
+#
+# As instruções do programa não mudam: a forma é uma anotação sobre elas
+# (o valor de cada leitura e de cada escrita, por posição), e um nome lido sem
+# escrita anterior na função lê o seu valor de entrada. Uma chamada a função
+# do programa escreve, além do temporário do resultado, as variáveis que a
+# função (ou as que ela chama) pode escrever: ver modified_names.
+#
+# A volta ao C3E normal (out_of_ssa) aplica os resultados de uma análise
+# (constantes por valor e blocos executáveis) e descarta as phis. Como os nomes
+# no programa continuam os originais e só se trocam leituras por constantes e
+# se remove código, duas versões do mesmo nome nunca ficam vivas ao mesmo
+# tempo, e nenhuma cópia é necessária nas arestas.
+
+
+class Phi:
+    """phi em 'block' para 'name': define 'value'; args[k] é o valor que chega por preds(block)[k]."""
+    __slots__ = ("block", "name", "value", "args")
+
+    def __init__(self, block, name, value, npreds):
+        self.block = block
+        self.name = name
+        self.value = value
+        self.args = [None] * npreds
+
+    def __repr__(self):
+        return f"Phi({ir.operand_text(self.name)}, v{self.value})"
+
+
+def preds(function, block):
+    """Predecessores de 'block'; a entrada tem ainda None, o início da função."""
+    return block.preds + [None] if block is function.entry else block.preds
+
+
+class SSAForm:
+    """
+    Forma SSA de uma função (cfg_module.FunctionCFG). Os valores são inteiros:
+      names[v]    nome (variável ou temporário) do valor v;
+      origin[v]   posição da instrução que o escreve, a Phi, ou None (valor de entrada);
+      users[v]    posições das instruções e Phis que o leem.
+    Por posição de instrução alcançável:
+      uses[i]     valores lidos, alinhados com ir.uses (None para constantes);
+      defs[i]     pares (nome, valor) escritos: ir.defs e, nas chamadas, as
+                  variáveis que a função chamada pode escrever.
+    phis[bloco] são as Phis do bloco; 'idom' e 'children', a árvore de dominadores.
+    """
+    __slots__ = ("function", "idom", "children", "names", "origin", "users", "uses", "defs", "phis")
+
+    def __init__(self, function):
+        self.function = function
+        self.idom = cfg_module.dominators(function)
+        self.children = cfg_module.dominator_tree(function, self.idom)
+        self.names = []
+        self.origin = []
+        self.users = []
+        self.uses = {}
+        self.defs = {}
+        self.phis = defaultdict(list)
+
+    def new_value(self, name, origin):
+        self.names.append(name)
+        self.origin.append(origin)
+        self.users.append([])
+        return len(self.names) - 1
+
+    def phi_count(self):
+        return sum(len(phis) for phis in self.phis.values())
+
+
+def modified_names(program):
+    """
+    Variáveis que cada função do programa pode escrever ({rótulo: conjunto}),
+    diretamente ou pelas funções que chama (ponto fixo sobre o grafo de chamadas).
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    functions = program.defined_functions()
+    written, callees = {}, {}
+    for name, indices in cfg_module.function_regions(program):
+        if name == cfg_module.MAIN:
+            continue
+        label = program.function(name)
+        names, called = set(), set()
+        for i in indices:
+            op = ops[i]
+            names.update(x for x in ir.defs(op, dest[i], a[i], b[i]) if type(x) is str)
+            if op == ir.CALL and a[i] in functions:
+                called.add(a[i])
+        written[label], callees[label] = names, called
+    changed = True
+    while changed:
+        changed = False
+        for label, called in callees.items():
+            names = written[label]
+            before = len(names)
+            for callee in called:
+                names |= written[callee]
+            changed = changed or len(names) != before
+    return written
+
+
+def _instruction_defs(program, i, modified):
+    op, d = program.ops[i], program.dest[i]
+    names = ir.defs(op, d, program.a[i], program.b[i])
+    if op == ir.CALL and program.a[i] in modified:
+        return names + tuple(modified[program.a[i]])
+    return names
+
+
+def dominance_frontiers(function, idom):
+    """Fronteira de dominância de cada bloco alcançável ({bloco: conjunto de blocos})."""
+    frontiers = {block: set() for block in idom}
+    for block in idom:
+        incoming = [p for p in block.preds if p in idom]
+        if len(incoming) + (block is function.entry) < 2:
+            continue
+        stop = idom[block]
+        for p in incoming:
+            runner = p
+            while runner is not stop and runner is not None:
+                frontiers[runner].add(block)
+                runner = idom[runner]
+    return frontiers
+
+
+def build_ssa(program, function, modified=None):
+    """Forma SSA (SSAForm) da função; 'modified' é o resultado de modified_names(program)."""
+    if modified is None:
+        modified = modified_names(program)
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    form = SSAForm(function)
+    idom = form.idom
+
+    # 1. Blocos que escrevem cada nome e nomes lidos antes de escritos no bloco.
+    def_blocks = defaultdict(set)
+    exposed = set()
+    for block in idom:
+        written = set()
+        for i in block.indices:
+            for x in ir.uses(ops[i], dest[i], a[i], b[i]):
+                if type(x) is not ir.Const and x not in written:
+                    exposed.add(x)
+            for x in _instruction_defs(program, i, modified):
+                written.add(x)
+                def_blocks[x].add(block)
+
+    # 2. Phis nas fronteiras de dominância iteradas.
+    frontiers = dominance_frontiers(function, idom)
+    for name in exposed:
+        blocks = def_blocks.get(name)
+        if not blocks:
+            continue
+        placed = set()
+        work = list(blocks)
+        queued = set(blocks)
+        while work:
+            for y in frontiers[work.pop()]:
+                if y not in placed:
+                    placed.add(y)
+                    phi = Phi(y, name, None, len(preds(function, y)))
+                    phi.value = form.new_value(name, phi)
+                    form.phis[y].append(phi)
+                    if y not in queued:
+                        queued.add(y)
+                        work.append(y)
+
+    # 3. Renomeação: pré-ordem da árvore de dominadores, com o registro das
+    # alterações em 'current' desfeito ao terminar a subárvore de cada bloco.
+    current = {}
+    log = []
+    users = form.users
+
+    def lookup(name):
+        v = current.get(name)
+        if v is None:
+            v = current[name] = form.new_value(name, None)  # valor de entrada
+        return v
+
+    def push(name, v):
+        log.append((name, current.get(name)))
+        current[name] = v
+
+    def fill_phis(block, successor):
+        k = preds(function, successor).index(block)
+        for phi in form.phis.get(successor, ()):
+            v = phi.args[k] = lookup(phi.name)
+            users[v].append(phi)
+
+    # Valores de entrada dos nomes com phi na entrada (vindos do início da função).
+    fill_phis(None, function.entry)
+
+    stack = [function.entry]
+    while stack:
+        block = stack.pop()
+        if type(block) is int:
+            while len(log) > block:
+                name, old = log.pop()
+                if old is None:
+                    del current[name]
+                else:
+                    current[name] = old
+            continue
+        stack.append(len(log))
+        for phi in form.phis.get(block, ()):
+            push(phi.name, phi.value)
+        for i in block.indices:
+            values = []
+            for x in ir.uses(ops[i], dest[i], a[i], b[i]):
+                if type(x) is ir.Const:
+                    values.append(None)
+                else:
+                    v = lookup(x)
+                    values.append(v)
+                    users[v].append(i)
+            form.uses[i] = values
+            written = []
+            for x in _instruction_defs(program, i, modified):
+                v = form.new_value(x, i)
+                written.append((x, v))
+                push(x, v)
+            form.defs[i] = written
+        for successor in block.succs:
+            fill_phis(block, successor)
+        stack.extend(reversed(form.children[block]))
+    return form
+
+
+def out_of_ssa(program, results, skip=()):
+    """
+    Volta ao C3E normal aplicando o resultado de uma análise sobre as formas
+    das funções: 'results' é uma lista de (forma, constantes, executáveis),
+    com as constantes por valor (valor -> Const) e o conjunto dos blocos que
+    podem executar. Leituras de valores constantes viram a constante,
+    operações com resultado constante viram cópias, 'if_false' com condição
+    constante vira 'goto' ou desaparece e os blocos não executáveis perdem as
+    instruções (menos rótulos e marcadores de função e de blocos PAR). As
+    instruções nas posições de 'skip' ficam como estão. Retorna o número de
+    desvios resolvidos.
+    """
+    ops, dest, a, b = program.ops, program.dest, program.a, program.b
+    keep = [True] * len(ops)
+    resolved = 0
+    for form, constants, executable in results:
+        for block in form.function.blocks:
+            if block not in executable:
+                for i in block.indices:
+                    if ops[i] not in _KEPT:
+                        keep[i] = False
+                continue
+            for i in block.indices:
+                uses = form.uses.get(i)
+                if uses is None or i in skip:
+                    continue
+                op = ops[i]
+                if op in ir.READS_A and uses and uses[0] is not None and uses[0] in constants:
+                    a[i] = constants[uses[0]]
+                if op in ir.BINARY and uses[1] is not None and uses[1] in constants:
+                    b[i] = constants[uses[1]]
+                if op in ir.BINARY or op in ir.UNARY:
+                    v = form.defs[i][0][1]
+                    if v in constants:
+                        ops[i], a[i], b[i] = ir.COPY, constants[v], None
+                elif op == ir.IF_FALSE and type(a[i]) is ir.Const and a[i].type == "boolean":
+                    resolved += 1
+                    if a[i].value:
+                        keep[i] = False  # condição sempre verdadeira: o salto nunca ocorre
+                    else:
+                        ops[i], a[i], b[i] = ir.GOTO, b[i], None
+    program.filter(keep)
+    return resolved
+
+
+# Instruções mantidas nos blocos não executáveis.
+_KEPT = frozenset({ir.LABEL, ir.BEGIN_FUNC, ir.END_FUNC, ir.PAR_BEGIN, ir.PAR_END})
@@ -5,8 +5,8 @@ class IParser(ABC):
     """Interface base para o parser usando ABC."""
     
     @abstractmethod
-    def eat(self, expected_type: str, expected_value: Any = None) -> Any:
-        """Verifica e consome o token atual se corresponder ao esperado."""
+    def eat(self, expected_kind: int) -> Any:
+        """Verifica e consome o token atual se o seu código (src.lexer.tokens) corresponder ao esperado."""
         pass
 
     @abstractmethod
@@ -0,0 +1,620 @@
+from array import array
+
+# =================================================
+# NÓS TIPADOS DA AST
+# =================================================
+# Cada tipo de nó é uma classe com __slots__, um código inteiro (kind) e a
+# posição (linha, coluna) do token que inicia o nó. Para compatibilidade com o
+# código escrito sobre a AST de tuplas, node[0] devolve o nome antigo do nó
+# ("assignment", "binop", ...) e node[i] o i-ésimo campo, na mesma ordem.
+
+(
+    PROGRAM, STMTS, ASSIGNMENT, FUNCTION_STMT, CALL, BUILTIN_CALL,
+    IF, IF_ELSE, WHILE, FOR, RETURN_STMT, SEQ_STMT, PAR_STMT,
+    CHANNEL_STMT, CHANNEL_SEND, CHANNEL_RECEIVE,
+    BINOP, UNOP, ID, NUMBER, BOOLEAN, STRING,
+) = range(22)
+
+# Tipos de campo, usados na conversão para tuplas e no modo arena:
+#   "s" texto, "n" nó, "o" nó opcional (None), "l" lista de nós, "p" lista de textos
+NODE, OPTIONAL, NODE_LIST, STR, STR_LIST = "n", "o", "l", "s", "p"
+
+
+class Node:
+    """Base dos nós da AST."""
+    __slots__ = ("line", "col")
+
+    kind = -1
+    tag = ""
+    fields = ()
+    field_types = ""
+
+    def __getitem__(self, i):
+        if i == 0:
+            return self.tag
+        if type(i) is int and i > 0:
+            return getattr(self, self.fields[i - 1])
+        return (self.tag, *[getattr(self, f) for f in self.fields])[i]
+
+    def __len__(self):
+        return len(self.fields) + 1
+
+    @property
+    def position(self):
+        return self.line, self.col
+
+    def __repr__(self):
+        args = ", ".join(repr(getattr(self, f)) for f in self.fields)
+        return f"{type(self).__name__}({args})"
+
+
+class Program(Node):
+    __slots__ = ("stmts",)
+    kind, tag, fields, field_types = PROGRAM, "program", ("stmts",), NODE
+
+    def __init__(self, stmts, line=0, col=0):
+        self.stmts = stmts
+        self.line = line
+        self.col = col
+
+
+class Stmts(Node):
+    __slots__ = ("body",)
+    kind, tag, fields, field_types = STMTS, "stmts", ("body",), NODE_LIST
+
+    def __init__(self, body, line=0, col=0):
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class Assignment(Node):
+    __slots__ = ("name", "expr")
+    kind, tag, fields, field_types = ASSIGNMENT, "assignment", ("name", "expr"), STR + NODE
+
+    def __init__(self, name, expr, line=0, col=0):
+        self.name = name
+        self.expr = expr
+        self.line = line
+        self.col = col
+
+
+class FunctionStmt(Node):
+    __slots__ = ("name", "params", "body")
+    kind, tag, fields = FUNCTION_STMT, "function_stmt", ("name", "params", "body")
+    field_types = STR + STR_LIST + NODE
+
+    def __init__(self, name, params, body, line=0, col=0):
+        self.name = name
+        self.params = params
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class Call(Node):
+    __slots__ = ("name", "args")
+    kind, tag, fields, field_types = CALL, "call", ("name", "args"), STR + NODE_LIST
+
+    def __init__(self, name, args, line=0, col=0):
+        self.name = name
+        self.args = args
+        self.line = line
+        self.col = col
+
+
+class BuiltinCall(Node):
+    __slots__ = ("name", "args")
+    kind, tag, fields, field_types = BUILTIN_CALL, "builtin_call", ("name", "args"), STR + NODE_LIST
+
+    def __init__(self, name, args, line=0, col=0):
+        self.name = name
+        self.args = args
+        self.line = line
+        self.col = col
+
+
+class If(Node):
+    __slots__ = ("cond", "body")
+    kind, tag, fields, field_types = IF, "if", ("cond", "body"), NODE + NODE
+
+    def __init__(self, cond, body, line=0, col=0):
+        self.cond = cond
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class IfElse(Node):
+    __slots__ = ("cond", "body", "orelse")
+    kind, tag, fields, field_types = IF_ELSE, "if_else", ("cond", "body", "orelse"), NODE * 3
+
+    def __init__(self, cond, body, orelse, line=0, col=0):
+        self.cond = cond
+        self.body = body
+        self.orelse = orelse
+        self.line = line
+        self.col = col
+
+
+class While(Node):
+    __slots__ = ("cond", "body")
+    kind, tag, fields, field_types = WHILE, "while", ("cond", "body"), NODE + NODE
+
+    def __init__(self, cond, body, line=0, col=0):
+        self.cond = cond
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class For(Node):
+    __slots__ = ("init", "cond", "update", "body")
+    kind, tag, fields = FOR, "for", ("init", "cond", "update", "body")
+    field_types = OPTIONAL * 3 + NODE
+
+    def __init__(self, init, cond, update, body, line=0, col=0):
+        self.init = init
+        self.cond = cond
+        self.update = update
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class ReturnStmt(Node):
+    __slots__ = ("expr",)
+    kind, tag, fields, field_types = RETURN_STMT, "return_stmt", ("expr",), OPTIONAL
+
+    def __init__(self, expr, line=0, col=0):
+        self.expr = expr
+        self.line = line
+        self.col = col
+
+
+class SeqStmt(Node):
+    __slots__ = ("body",)
+    kind, tag, fields, field_types = SEQ_STMT, "seq_stmt", ("body",), NODE
+
+    def __init__(self, body, line=0, col=0):
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class ParStmt(Node):
+    __slots__ = ("body",)
+    kind, tag, fields, field_types = PAR_STMT, "par_stmt", ("body",), NODE
+
+    def __init__(self, body, line=0, col=0):
+        self.body = body
+        self.line = line
+        self.col = col
+
+
+class ChannelStmt(Node):
+    __slots__ = ("name", "comp1", "comp2")
+    kind, tag, fields, field_types = CHANNEL_STMT, "channel_stmt", ("name", "comp1", "comp2"), STR * 3
+
+    def __init__(self, name, comp1, comp2, line=0, col=0):
+        self.name = name
+        self.comp1 = comp1
+        self.comp2 = comp2
+        self.line = line
+        self.col = col
+
+
+class ChannelSend(Node):
+    __slots__ = ("channel", "args")
+    kind, tag, fields, field_types = CHANNEL_SEND, "channel_send", ("channel", "args"), STR + NODE_LIST
+
+    def __init__(self, channel, args, line=0, col=0):
+        self.channel = channel
+        self.args = args
+        self.line = line
+        self.col = col
+
+
+class ChannelReceive(Node):
+    __slots__ = ("channel", "args")
+    kind, tag, fields, field_types = CHANNEL_RECEIVE, "channel_receive", ("channel", "args"), STR + NODE_LIST
+
+    def __init__(self, channel, args, line=0, col=0):
+        self.channel = channel
+        self.args = args
+        self.line = line
+        self.col = col
+
+
+class BinOp(Node):
+    __slots__ = ("op", "left", "right")
+    kind, tag, fields, field_types = BINOP, "binop", ("op", "left", "right"), STR + NODE + NODE
+
+    def __init__(self, op, left, right, line=0, col=0):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+        self.col = col
+
+
+class UnOp(Node):
+    __slots__ = ("op", "expr")
+    kind, tag, fields, field_types = UNOP, "unop", ("op", "expr"), STR + NODE
+
+    def __init__(self, op, expr, line=0, col=0):
+        self.op = op
+        self.expr = expr
+        self.line = line
+        self.col = col
+
+
+class Literal(Node):
+    """Base das folhas com um único valor textual (identificadores e literais)."""
+    __slots__ = ("value",)
+    fields, field_types = ("value",), STR
+
+    def __init__(self, value, line=0, col=0):
+        self.value = value
+        self.line = line
+        self.col = col
+
+
+class Id(Literal):
+    __slots__ = ()
+    kind, tag = ID, "id"
+
+
+class Number(Literal):
+    __slots__ = ()
+    kind, tag = NUMBER, "number"
+
+
+class Boolean(Literal):
+    __slots__ = ()
+    kind, tag = BOOLEAN, "boolean"
+
+
+class String(Literal):
+    __slots__ = ()
+    kind, tag = STRING, "string"
+
+
+# Classe de cada código de nó, indexada pelo kind.
+NODE_CLASSES = [
+    Program, Stmts, Assignment, FunctionStmt, Call, BuiltinCall,
+    If, IfElse, While, For, ReturnStmt, SeqStmt, ParStmt,
+    ChannelStmt, ChannelSend, ChannelReceive,
+    BinOp, UnOp, Id, Number, Boolean, String,
+]
+CLASSES_BY_TAG = {cls.tag: cls for cls in NODE_CLASSES}
+
+
+# =================================================
+# COMPATIBILIDADE COM A AST DE TUPLAS
+# =================================================
+
+def to_tuple(root):
+    """
+    Converte uma AST tipada (ou uma AstArena) para o formato antigo de tuplas e
+    listas, por exemplo ("assignment", "x", ("number", "1")). Iterativo, para
+    suportar ASTs profundas.
+    """
+    if isinstance(root, AstArena):
+        root = root.to_node()
+    return _convert(root, _node_children, _node_build_tuple)
+
+
+def from_tuple(root):
+    """Converte uma AST de tuplas para nós tipados (sem posições)."""
+    return _convert(root, _tuple_children, _tuple_build_node)
+
+
+def _node_children(node):
+    for ftype, f in zip(node.field_types, node.fields):
+        value = getattr(node, f)
+        if ftype == NODE_LIST:
+            yield from value
+        elif ftype == NODE or (ftype == OPTIONAL and value is not None):
+            yield value
+
+
+def _node_build_tuple(node, converted):
+    out = [node.tag]
+    for ftype, f in zip(node.field_types, node.fields):
+        value = getattr(node, f)
+        if ftype == NODE_LIST:
+            out.append([converted.pop() for _ in value])
+        elif ftype == NODE or (ftype == OPTIONAL and value is not None):
+            out.append(converted.pop())
+        elif ftype == STR_LIST:
+            out.append(list(value))
+        else:
+            out.append(value)
+    return tuple(out)
+
+
+def _tuple_children(node):
+    cls = CLASSES_BY_TAG[node[0]]
+    for ftype, value in zip(cls.field_types, node[1:]):
+        if ftype == NODE_LIST:
+            yield from value
+        elif ftype == NODE or (ftype == OPTIONAL and value is not None):
+            yield value
+
+
+def _tuple_build_node(node, converted):
+    cls = CLASSES_BY_TAG[node[0]]
+    args = []
+    for ftype, value in zip(cls.field_types, node[1:]):
+        if ftype == NODE_LIST:
+            args.append([converted.pop() for _ in value])
+        elif ftype == NODE or (ftype == OPTIONAL and value is not None):
+            args.append(converted.pop())
+        elif ftype == STR_LIST:
+            args.append(list(value))
+        else:
+            args.append(value)
+    return cls(*args)
+
+
+def _convert(root, children, build):
+    """
+    Pós-ordem iterativa genérica: 'children' lista os filhos de um nó e
+    'build' monta o nó convertido consumindo (com pop) os filhos já convertidos,
+    que ficam em 'converted' na ordem inversa.
+    """
+    results = []
+    stack = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        if ready:
+            kids = list(children(node))
+            converted = results[len(results) - len(kids):] if kids else []
+            del results[len(results) - len(kids):]
+            converted.reverse()
+            results.append(build(node, converted))
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(list(children(node))))
+    return results[0]
+
+
+# =================================================
+# REGISTROS PLANOS (SERIALIZAÇÃO)
+# =================================================
+# A AST como uma lista de tuplas (kind, linha, coluna, campos...), em que os
+# campos de nó guardam o índice do registro do filho (-1 = None) e as listas
+# viram tuplas. Os índices são atribuídos quando o nó é descoberto, então todo
+# filho tem índice maior que o do pai e a raiz é o registro 0. Os registros só
+# contêm ints, textos e tuplas: podem ser gravados com marshal sem limite de
+# profundidade e são reconstruídos em um único laço, do último para o primeiro.
+
+def to_records(root, positions=None):
+    """
+    Converte uma AST tipada na lista plana de registros. Se 'positions' (um
+    dict) for dado, guarda nele a posição do registro de cada nó.
+    """
+    records = [None]
+    stack = [(root, 0)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        node, index = pop()
+        if positions is not None:
+            positions[node] = index
+        if node.field_types == STR:
+            records[index] = (node.kind, node.line, node.col, node.value)
+            continue
+        record = [node.kind, node.line, node.col]
+        for ftype, f in zip(node.field_types, node.fields):
+            value = getattr(node, f)
+            if ftype == NODE_LIST:
+                first = len(records)
+                records.extend([None] * len(value))
+                stack.extend(zip(value, range(first, first + len(value))))
+                record.append(tuple(range(first, first + len(value))))
+            elif ftype == NODE or (ftype == OPTIONAL and value is not None):
+                record.append(len(records))
+                push((value, len(records)))
+                records.append(None)
+            elif ftype == STR_LIST:
+                record.append(tuple(value))
+            else:
+                record.append(-1 if ftype == OPTIONAL else value)
+        records[index] = tuple(record)
+    return records
+
+
+def from_records(records, out=None):
+    """
+    Reconstrói a AST tipada a partir dos registros de to_records(). Se 'out'
+    (uma lista) for dado, recebe os nós reconstruídos, na ordem dos registros.
+    """
+    built = [None] * len(records)
+    for index in range(len(records) - 1, -1, -1):
+        record = records[index]
+        cls = NODE_CLASSES[record[0]]
+        field_types = cls.field_types
+        if field_types == STR:
+            built[index] = cls(record[3], record[1], record[2])
+            continue
+        args = []
+        for ftype, value in zip(field_types, record[3:]):
+            if ftype == NODE:
+                args.append(built[value])
+            elif ftype == OPTIONAL:
+                args.append(None if value < 0 else built[value])
+            elif ftype == NODE_LIST:
+                args.append([built[v] for v in value])
+            elif ftype == STR_LIST:
+                args.append(list(value))
+            else:
+                args.append(value)
+        built[index] = cls(*args, record[1], record[2])
+    if out is not None:
+        out.extend(built)
+    return built[0]
+
+
+# =================================================
+# MODO ARENA
+# =================================================
+
+_NO_NODE = 0  # referência a nó ausente (campos opcionais); ids reais são somados de 1
+
+
+class AstArena:
+    """
+    Representação compacta da AST em arrays paralelos indexados pelo id do nó:
+        kinds        - array('B') com o código de cada nó
+        lines / cols - array('I') com a posição de cada nó
+        offsets      - array('I') com o início dos campos do nó em 'data'
+        data         - array('I') com os campos codificados conforme field_types:
+                       texto -> índice em 'strings'; nó -> id + 1 (0 = None);
+                       lista -> deslocamento em 'lists', onde ficam o tamanho e os itens
+    Os nós são criados em pós-ordem (filhos antes do pai), então um nó sempre
+    tem id maior que os de seus filhos e 'root' é o último nó criado.
+
+    Os métodos com nome de classe (Program, Assignment, BinOp, ...) recebem os
+    mesmos argumentos dos construtores dos nós tipados e retornam o id do nó,
+    para que o Parser possa construir a AST diretamente na arena.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.lines = array("I")
+        self.cols = array("I")
+        self.offsets = array("I")
+        self.data = array("I")
+        self.lists = array("I")
+        self.strings = [None]
+        self._index = {None: 0}
+        self.root = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def intern(self, value):
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def add(self, kind, args, line=0, col=0):
+        """Acrescenta um nó com os campos 'args' (já no formato dos construtores) e retorna seu id."""
+        data = self.data
+        self.offsets.append(len(data))
+        for ftype, value in zip(NODE_CLASSES[kind].field_types, args):
+            if ftype == STR:
+                data.append(self.intern(value))
+            elif ftype == NODE or ftype == OPTIONAL:
+                data.append(_NO_NODE if value is None else value + 1)
+            else:
+                lists = self.lists
+                data.append(len(lists))
+                lists.append(len(value))
+                if ftype == NODE_LIST:
+                    lists.extend(v + 1 for v in value)
+                else:
+                    lists.extend(self.intern(v) for v in value)
+        self.kinds.append(kind)
+        self.lines.append(line)
+        self.cols.append(col)
+        self.root = len(self.kinds) - 1
+        return self.root
+
+    def kind(self, node_id):
+        return self.kinds[node_id]
+
+    def position(self, node_id):
+        return self.lines[node_id], self.cols[node_id]
+
+    def fields(self, node_id):
+        """Campos decodificados do nó: textos, ids de nós (ou None) e listas."""
+        data, lists, strings = self.data, self.lists, self.strings
+        offset = self.offsets[node_id]
+        out = []
+        for i, ftype in enumerate(NODE_CLASSES[self.kinds[node_id]].field_types):
+            value = data[offset + i]
+            if ftype == STR:
+                out.append(strings[value])
+            elif ftype == NODE or ftype == OPTIONAL:
+                out.append(value - 1 if value else None)
+            else:
+                items = lists[value + 1:value + 1 + lists[value]]
+                out.append([v - 1 for v in items] if ftype == NODE_LIST else [strings[v] for v in items])
+        return out
+
+    def to_node(self, node_id=None):
+        """Materializa a subárvore de 'node_id' (padrão: a raiz) como nós tipados."""
+        if node_id is None:
+            node_id = self.root
+        # Filhos têm ids menores que os pais: basta percorrer os ids em ordem
+        # crescente. Para a raiz, a subárvore é a arena inteira.
+        ids = range(node_id + 1) if node_id == self.root else sorted(self._subtree(node_id))
+        built = {}
+        for nid in ids:
+            cls = NODE_CLASSES[self.kinds[nid]]
+            args = []
+            for ftype, value in zip(cls.field_types, self.fields(nid)):
+                if ftype == NODE_LIST:
+                    args.append([built.pop(v) for v in value])
+                elif ftype == NODE or (ftype == OPTIONAL and value is not None):
+                    args.append(built.pop(value))
+                else:
+                    args.append(value)
+            built[nid] = cls(*args, self.lines[nid], self.cols[nid])
+        return built[node_id]
+
+    def _subtree(self, node_id):
+        stack = [node_id]
+        while stack:
+            nid = stack.pop()
+            yield nid
+            for ftype, value in zip(NODE_CLASSES[self.kinds[nid]].field_types, self.fields(nid)):
+                if ftype == NODE_LIST:
+                    stack.extend(value)
+                elif ftype in (NODE, OPTIONAL) and value is not None:
+                    stack.append(value)
+
+    @classmethod
+    def from_node(cls, root):
+        """Constrói uma arena a partir de uma AST tipada (iterativo)."""
+        arena = cls()
+        _convert(root, _node_children, arena._add_converted)
+        return arena
+
+    def _add_converted(self, node, converted):
+        args = []
+        for ftype, f in zip(node.field_types, node.fields):
+            value = getattr(node, f)
+            if ftype == NODE_LIST:
+                args.append([converted.pop() for _ in value])
+            elif ftype == NODE or (ftype == OPTIONAL and value is not None):
+                args.append(converted.pop())
+            else:
+                args.append(value)
+        return self.add(node.kind, args, node.line, node.col)
+
+    def nbytes(self):
+        """Memória ocupada pelos arrays (sem a tabela de textos)."""
+        return sum(a.itemsize * len(a) for a in
+                   (self.kinds, self.lines, self.cols, self.offsets, self.data, self.lists))
+
+
+def _arena_constructor(node_cls):
+    kind = node_cls.kind
+
+    def construct(self, *args):
+        # Mesma assinatura dos construtores: campos..., line, col
+        *fields, line, col = args
+        return self.add(kind, fields, line, col)
+
+    construct.__name__ = node_cls.__name__
+    construct.__doc__ = f"Cria um nó {node_cls.__name__} na arena e retorna seu id."
+    return construct
+
+
+for _cls in NODE_CLASSES:
+    setattr(AstArena, _cls.__name__, _arena_constructor(_cls))
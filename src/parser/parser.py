@@ -1,105 +1,230 @@
-from typing import List, Tuple, Any
+from itertools import chain, repeat
+from typing import Iterable, Tuple, Any
 from .interface_parser import IParser
+from . import nodes
+from src.lexer.tokens import (
+    BOOLEAN, CHANNEL_RECEIVE, CHANNEL_SEND, DEDENT, EOF, ID, INDENT, NEWLINE, NUMBER, STRING,
+    KW_AND, KW_C_CHANNEL, KW_DEF, KW_ELSE, KW_FOR, KW_IF, KW_NOT, KW_OR, KW_PAR, KW_PRINT,
+    KW_RETURN, KW_SEQ, KW_WHILE,
+    OP_ASSIGN, OP_EQ, OP_GE, OP_GT, OP_LE, OP_LT, OP_MINUS, OP_NE, OP_PLUS, OP_SLASH, OP_STAR,
+    SYM_COLON, SYM_COMMA, SYM_LPAREN, SYM_RPAREN, SYM_SEMI,
+    as_coded, decode, describe,
+)
+
+EOF_TOKEN = (EOF, None, 0, 0)
+
+# Profundidade de lookahead usada pela gramática: token atual + peek(1).
+LOOKAHEAD = 2
+
+# Construtor (nome da classe em nodes) usado para cada token literal/identificador.
+LITERAL_NODES = {NUMBER: "Number", ID: "Id", BOOLEAN: "Boolean", STRING: "String"}
+
+# Força de ligação dos operadores binários (maior = liga mais forte).
+BINARY_POWER = {
+    KW_OR: 1,
+    KW_AND: 2,
+    OP_EQ: 3, OP_NE: 3, OP_LT: 3, OP_GT: 3, OP_LE: 3, OP_GE: 3,
+    OP_PLUS: 4, OP_MINUS: 4,
+    OP_STAR: 5, OP_SLASH: 5,
+}
+
+# Operadores unários prefixados; ligam mais forte que qualquer binário.
+PREFIX_OPS = frozenset({KW_NOT, OP_MINUS})
 
 class ParserError(Exception):
-    """Erro sintático genérico."""
-    pass
+    """Erro sintático genérico, com a posição (linha, coluna) quando conhecida."""
+    def __init__(self, message: str, line: int = 0, col: int = 0):
+        self.line = line
+        self.col = col
+        if line:
+            message = f"{message} (linha {line}, coluna {col})"
+        super().__init__(message)
 
 class Parser(IParser):
-    def __init__(self, tokens: List[Tuple[str, Any]]):
-        self.tokens = tokens
+    def __init__(self, tokens: Iterable[Tuple[str, Any]], arena: bool = False):
+        """
+        'tokens' pode ser um TokenStream, uma lista de tuplas (tipo, valor) ou
+        qualquer iterável (por exemplo, o gerador de lexer.lexer_stream). Os
+        tokens são convertidos para códigos inteiros e puxados sob demanda para
+        um pequeno buffer circular, então o parser nunca retém mais que
+        LOOKAHEAD tokens. O código do token atual fica em 'self.kind'.
+
+        A AST é feita de nós tipados (src/parser/nodes.py). Com arena=True, os
+        nós são criados diretamente em uma nodes.AstArena, que parse() retorna.
+        """
+        # Fábrica de nós: o próprio módulo nodes (classes) ou uma arena, que
+        # expõe métodos com os mesmos nomes e argumentos.
+        self.ast = nodes.AstArena() if arena else nodes
+        self._literals = {kind: getattr(self.ast, name) for kind, name in LITERAL_NODES.items()}
+        # Após o fim da fonte, o buffer passa a ser reabastecido com EOF indefinidamente.
+        self._next = chain(as_coded(tokens), repeat(EOF_TOKEN)).__next__
+        self._ring = [self._next() for _ in range(LOOKAHEAD)]
+        self._head = 0
+        self.kind = self._ring[0][0]
         self.pos = 0
+        # Blocos abertos: (função de fechamento, lista de comandos do bloco).
+        self._blocks = []
 
     # ===========================
     # Utilitários
     # ===========================
     def current_token(self):
-        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("EOF", None)
+        """Token atual como tupla (tipo, valor)."""
+        kind, value = self._ring[self._head][:2]
+        return decode(kind, value)
 
     def peek(self, n=1):
-        idx = self.pos + n
-        return self.tokens[idx] if idx < len(self.tokens) else ("EOF", None)
-
-    def eat(self, expected_type, expected_value=None):
-        ttype, value = self.current_token()
-        if ttype == expected_type and (expected_value is None or value == expected_value):
-            self.pos += 1
-            return value
-        raise ParserError(
-            f"Erro sintático: esperado {expected_type} '{expected_value}', encontrado {ttype} '{value}'"
+        """Token 'n' posições à frente como tupla (tipo, valor)."""
+        kind, value = self._peek(n)[:2]
+        return decode(kind, value)
+
+    def peek_kind(self, n=1):
+        """Código do token 'n' posições à frente."""
+        return self._peek(n)[0]
+
+    def _peek(self, n):
+        if n >= LOOKAHEAD:
+            raise ParserError(f"Lookahead de {n} tokens excede o buffer do parser ({LOOKAHEAD}).")
+        return self._ring[(self._head + n) % LOOKAHEAD]
+
+    def advance(self):
+        """Consome o token atual, repondo o buffer com o próximo token da fonte."""
+        self.take()
+
+    def take(self):
+        """Consome o token atual, qualquer que seja, e retorna seu valor."""
+        ring, head = self._ring, self._head
+        value = ring[head][1]
+        ring[head] = self._next()
+        self._head = head = (head + 1) % LOOKAHEAD
+        self.kind = ring[head][0]
+        self.pos += 1
+        return value
+
+    def eat(self, expected_kind):
+        if self.kind == expected_kind:
+            return self.take()
+        raise self.error(
+            f"Erro sintático: esperado {describe(expected_kind)}, "
+            f"encontrado {describe(self.kind, self._ring[self._head][1])}"
         )
 
+    def here(self):
+        """Posição (linha, coluna) do token atual."""
+        token = self._ring[self._head]
+        return token[2], token[3]
+
+    def error(self, message):
+        """Cria um ParserError posicionado no token atual."""
+        _, _, line, col = self._ring[self._head]
+        return ParserError(message, line, col)
+
     def skip_newlines(self):
         """Ignora tokens NEWLINE consecutivos."""
-        while self.current_token()[0] == "NEWLINE":
-            self.pos += 1
+        while self.kind == NEWLINE:
+            self.advance()
 
     # ===========================
     # Ponto de entrada
     # ===========================
     def parse(self):
         node = self.program()
-        if self.current_token()[0] != "EOF":
-            raise ParserError("Tokens restantes após o fim do programa.")
-        return node
+        if self.kind != EOF:
+            raise self.error("Tokens restantes após o fim do programa.")
+        return self.ast if self.ast is not nodes else node
 
     # ===========================
     # Produções principais
     # ===========================
     def program(self):
-        return ("program", self.stmts())
+        line, col = self.here()
+        return self.ast.Program(self.stmts(), line, col)
 
     def stmts(self):
+        """
+        Lê uma sequência de comandos até EOF ou até o DEDENT que fecha o bloco
+        corrente. Blocos aninhados não usam recursão: cada cabeçalho (if, while,
+        for, def, SEQ, PAR, else) empilha em 'self._blocks' uma função de
+        fechamento e a lista de comandos do bloco; o DEDENT correspondente
+        desempilha o bloco, monta o nó e o anexa ao bloco de fora. A pilha do
+        Python não cresce com a profundidade de aninhamento.
+        """
+        base = len(self._blocks)
         stmts_list = []
         self.skip_newlines()
+        line, col = self.here()
 
         while True:
-            ttype, value = self.current_token()
-            if ttype in {"EOF", "DEDENT"}:
-                break
-            if ttype == "NEWLINE":
+            kind = self.kind
+            if kind == NEWLINE:
                 self.skip_newlines()
                 continue
-            stmt_node = self.stmt()
-            stmts_list.append(stmt_node)
-            self.skip_newlines()
-        return ("stmts", stmts_list)
+            if kind == EOF or kind == DEDENT:
+                if len(self._blocks) == base:
+                    break
+                # EOF com bloco aberto: eat() reporta o DEDENT esperado.
+                self.eat(DEDENT)
+                close, body, body_line, body_col = self._blocks.pop()
+                node = close(self.ast.Stmts(body, body_line, body_col))
+            else:
+                node = self.stmt()
+
+            # Um cabeçalho pode ter aberto um bloco (node None); do contrário
+            # o nó completo vai para o bloco corrente.
+            current = self._blocks[-1][1] if len(self._blocks) > base else stmts_list
+            if node is not None:
+                current.append(node)
+                self.skip_newlines()
+        return self.ast.Stmts(stmts_list, line, col)
+
+    def open_block(self, close):
+        """
+        Consome ':' NEWLINE* INDENT após um cabeçalho e abre um bloco. Quando o
+        bloco fechar, close(Stmts([...])) retorna o nó do comando, ou None
+        se abrir um novo bloco em seguida (como o 'else' de um 'if').
+        """
+        self.eat(SYM_COLON)
+        self.skip_newlines()
+        self.eat(INDENT)
+        self.skip_newlines()
+        line, col = self.here()
+        self._blocks.append((close, [], line, col))
 
     # ===========================
     # Tipos de comandos
     # ===========================
     def stmt(self):
-        ttype, value = self.current_token()
+        """Lê um comando simples e retorna seu nó, ou abre um bloco e retorna None."""
+        kind = self.kind
 
         # NOVO: chamadas de canal
-        if ttype in {"CHANNEL_SEND", "CHANNEL_RECEIVE"}:
-            if ttype == "CHANNEL_SEND":
-                return self.channel_send_stmt()
-            else:
-                return self.channel_receive_stmt()
-
-        if ttype == "ID":
-            nxt_ttype, nxt_value = self.peek(1)
-            if (nxt_ttype, nxt_value) == ("OP", "="):
+        if kind == CHANNEL_SEND:
+            return self.channel_send_stmt()
+        if kind == CHANNEL_RECEIVE:
+            return self.channel_receive_stmt()
+
+        if kind == ID:
+            nxt_kind = self.peek_kind(1)
+            if nxt_kind == OP_ASSIGN:
                 return self.assignment()
-            elif (nxt_ttype, nxt_value) == ("SYM", "("):
+            elif nxt_kind == SYM_LPAREN:
                 return self.call()
             else:
-                raise ParserError(f"Erro após identificador '{value}': esperado '=' ou '('.")
-
-        elif ttype == "KEYWORD":
-            if value == "if": return self.if_stmt()
-            elif value == "while": return self.while_stmt()
-            elif value == "for": return self.for_stmt()
-            elif value == "c_channel": return self.channel_stmt()
-            elif value == "def": return self.function_stmt()
-            elif value in ("SEQ", "PAR"): return self.compound_stmt()
-            elif value in ("print", "input"): return self.builtin_call()
-            elif value == "return": return self.return_stmt()
-            else: raise ParserError(f"Comando desconhecido: '{value}'")
+                raise self.error(f"Erro após identificador '{self._ring[self._head][1]}': esperado '=' ou '('.")
 
-        else:
-            raise ParserError(f"Token inesperado no início de um comando: {ttype}, {value}")
+        if kind == KW_IF: return self.if_stmt()
+        elif kind == KW_WHILE: return self.while_stmt()
+        elif kind == KW_FOR: return self.for_stmt()
+        elif kind == KW_C_CHANNEL: return self.channel_stmt()
+        elif kind == KW_DEF: return self.function_stmt()
+        elif kind == KW_SEQ or kind == KW_PAR: return self.compound_stmt()
+        elif kind == KW_PRINT: return self.builtin_call()
+        elif kind == KW_RETURN: return self.return_stmt()
+
+        ttype, value = self.current_token()
+        if ttype == "KEYWORD":
+            raise self.error(f"Comando desconhecido: '{value}'")
+        raise self.error(f"Token inesperado no início de um comando: {ttype}, {value}")
 
     # ===========================
     # NOVO: comandos de canal
@@ -109,242 +234,224 @@ class Parser(IParser):
         Sintaxe:
             <id>.send(v1, v2, ...)
         AST:
-            ("channel_send", <id>, [args])
+            ChannelSend(<id>, [args])  -- ("channel_send", <id>, [args]) em to_tuple
         """
-        channel_name = self.eat("CHANNEL_SEND")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        channel_name = self.eat(CHANNEL_SEND)
+        self.eat(SYM_LPAREN)
         args = []
-        if self.current_token() != ("SYM", ")"):
+        if self.kind != SYM_RPAREN:
             args = self.args()
-        self.eat("SYM", ")")
-        return ("channel_send", channel_name, args)
+        self.eat(SYM_RPAREN)
+        return self.ast.ChannelSend(channel_name, args, line, col)
 
     def channel_receive_stmt(self):
         """
         Sintaxe:
             <id>.receive(v1, v2, ...)
         AST:
-            ("channel_receive", <id>, [args])
+            ChannelReceive(<id>, [args])  -- ("channel_receive", <id>, [args]) em to_tuple
         """
-        channel_name = self.eat("CHANNEL_RECEIVE")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        channel_name = self.eat(CHANNEL_RECEIVE)
+        self.eat(SYM_LPAREN)
         args = []
-        if self.current_token() != ("SYM", ")"):
+        if self.kind != SYM_RPAREN:
             args = self.args()
-        self.eat("SYM", ")")
-        return ("channel_receive", channel_name, args)
+        self.eat(SYM_RPAREN)
+        return self.ast.ChannelReceive(channel_name, args, line, col)
 
     # ===========================
     # Estruturas compostas e outras
     # ===========================
     def return_stmt(self):
-        self.eat("KEYWORD", "return")
-        ttype, _ = self.current_token()
-        if ttype in {"NEWLINE", "DEDENT", "EOF"}:
-            return ("return_stmt", None)
+        line, col = self.here()
+        self.eat(KW_RETURN)
+        if self.kind in (NEWLINE, DEDENT, EOF):
+            return self.ast.ReturnStmt(None, line, col)
         expr = self.expression()
-        return ("return_stmt", expr)
+        return self.ast.ReturnStmt(expr, line, col)
 
+    # Os cabeçalhos abaixo apenas abrem o bloco (ver stmts/open_block); o nó
+    # é montado pela função de fechamento quando o DEDENT do bloco chega.
     def compound_stmt(self):
-        ttype, value = self.current_token()
-        if (ttype, value) == ("KEYWORD", "SEQ"):
-            self.eat("KEYWORD", "SEQ")
-            self.eat("SYM", ":")
-            self.skip_newlines()
-            self.eat("INDENT")
-            body = self.stmts()
-            self.eat("DEDENT")
-            return ("seq_stmt", body)
-        elif (ttype, value) == ("KEYWORD", "PAR"):
-            self.eat("KEYWORD", "PAR")
-            self.eat("SYM", ":")
-            self.skip_newlines()
-            self.eat("INDENT")
-            body = self.stmts()
-            self.eat("DEDENT")
-            return ("par_stmt", body)
+        line, col = self.here()
+        if self.kind == KW_SEQ:
+            self.eat(KW_SEQ)
+            self.open_block(lambda body: self.ast.SeqStmt(body, line, col))
         else:
-            return self.stmts()
+            self.eat(KW_PAR)
+            self.open_block(lambda body: self.ast.ParStmt(body, line, col))
 
     def if_stmt(self):
-        self.eat("KEYWORD", "if")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        self.eat(KW_IF)
+        self.eat(SYM_LPAREN)
         cond = self.expression()
-        self.eat("SYM", ")")
-        self.eat("SYM", ":")
-        self.skip_newlines()
-        self.eat("INDENT")
-        true_block = self.stmts()
-        self.eat("DEDENT")
+        self.eat(SYM_RPAREN)
 
-        if self.current_token() == ("KEYWORD", "else"):
-            self.eat("KEYWORD", "else")
-            self.eat("SYM", ":")
-            self.skip_newlines()
-            self.eat("INDENT")
-            false_block = self.stmts()
-            self.eat("DEDENT")
-            return ("if_else", cond, true_block, false_block)
+        def close_if(true_block):
+            if self.kind == KW_ELSE:
+                self.eat(KW_ELSE)
+                self.open_block(lambda false_block: self.ast.IfElse(cond, true_block, false_block, line, col))
+                return None
+            return self.ast.If(cond, true_block, line, col)
 
-        return ("if", cond, true_block)
+        self.open_block(close_if)
 
     def while_stmt(self):
-        self.eat("KEYWORD", "while")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        self.eat(KW_WHILE)
+        self.eat(SYM_LPAREN)
         cond = self.expression()
-        self.eat("SYM", ")")
-        self.eat("SYM", ":")
-        self.skip_newlines()
-        self.eat("INDENT")
-        body = self.stmts()
-        self.eat("DEDENT")
-        return ("while", cond, body)
+        self.eat(SYM_RPAREN)
+        self.open_block(lambda body: self.ast.While(cond, body, line, col))
 
     def for_stmt(self):
-        self.eat("KEYWORD", "for")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        self.eat(KW_FOR)
+        self.eat(SYM_LPAREN)
         init = None
-        if self.current_token() != ("SYM", ";"):
-            if self.current_token()[0] == "ID" and self.peek(1) == ("OP", "="):
+        if self.kind != SYM_SEMI:
+            if self.kind == ID and self.peek_kind(1) == OP_ASSIGN:
                 init = self.assignment()
             else:
                 init = self.expression()
-        self.eat("SYM", ";")
+        self.eat(SYM_SEMI)
 
         cond = None
-        if self.current_token() != ("SYM", ";"):
+        if self.kind != SYM_SEMI:
             cond = self.expression()
-        self.eat("SYM", ";")
+        self.eat(SYM_SEMI)
 
         update = None
-        if self.current_token() != ("SYM", ")"):
-            if self.current_token()[0] == "ID" and self.peek(1) == ("OP", "="):
+        if self.kind != SYM_RPAREN:
+            if self.kind == ID and self.peek_kind(1) == OP_ASSIGN:
                 update = self.assignment()
             else:
                 update = self.expression()
-        self.eat("SYM", ")")
-
-        self.eat("SYM", ":")
-        self.skip_newlines()
-        self.eat("INDENT")
-        body = self.stmts()
-        self.eat("DEDENT")
-        return ("for", init, cond, update, body)
+        self.eat(SYM_RPAREN)
+        self.open_block(lambda body: self.ast.For(init, cond, update, body, line, col))
 
     def function_stmt(self):
-        self.eat("KEYWORD", "def")
-        name = self.eat("ID")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        self.eat(KW_DEF)
+        name = self.eat(ID)
+        self.eat(SYM_LPAREN)
         params = []
-        if self.current_token() != ("SYM", ")"):
+        if self.kind != SYM_RPAREN:
             while True:
-                params.append(self.eat("ID"))
-                if self.current_token() == ("SYM", ")"):
+                params.append(self.eat(ID))
+                if self.kind == SYM_RPAREN:
                     break
-                self.eat("SYM", ",")
-        self.eat("SYM", ")")
-        self.eat("SYM", ":")
-        self.skip_newlines()
-        self.eat("INDENT")
-        body = self.stmts()
-        self.eat("DEDENT")
-        return ("function_stmt", name, params, body)
+                self.eat(SYM_COMMA)
+        self.eat(SYM_RPAREN)
+        self.open_block(lambda body: self.ast.FunctionStmt(name, params, body, line, col))
 
     def assignment(self):
-        id_name = self.eat("ID")
-        self.eat("OP", "=")
+        line, col = self.here()
+        id_name = self.eat(ID)
+        self.eat(OP_ASSIGN)
         expr_node = self.expression()
-        return ("assignment", id_name, expr_node)
+        return self.ast.Assignment(id_name, expr_node, line, col)
 
     def call(self):
-        func_name = self.eat("ID")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        func_name = self.eat(ID)
+        self.eat(SYM_LPAREN)
         args = []
-        if self.current_token() != ("SYM", ")"):
+        if self.kind != SYM_RPAREN:
             args = self.args()
-        self.eat("SYM", ")")
-        return ("call", func_name, args)
+        self.eat(SYM_RPAREN)
+        return self.ast.Call(func_name, args, line, col)
 
     def builtin_call(self):
-        func_name = self.eat("KEYWORD")
-        self.eat("SYM", "(")
+        line, col = self.here()
+        func_name = self.eat(KW_PRINT)
+        self.eat(SYM_LPAREN)
         args = []
-        if self.current_token() != ("SYM", ")"):
+        if self.kind != SYM_RPAREN:
             args = self.args()
-        self.eat("SYM", ")")
-        return ("builtin_call", func_name, args)
+        self.eat(SYM_RPAREN)
+        return self.ast.BuiltinCall(func_name, args, line, col)
 
     def channel_stmt(self):
-        self.eat("KEYWORD", "c_channel")
-        channel = self.eat("ID")
-        comp1 = self.eat("ID")
-        comp2 = self.eat("ID")
-        return ("channel_stmt", channel, comp1, comp2)
+        line, col = self.here()
+        self.eat(KW_C_CHANNEL)
+        channel = self.eat(ID)
+        comp1 = self.eat(ID)
+        comp2 = self.eat(ID)
+        return self.ast.ChannelStmt(channel, comp1, comp2, line, col)
 
     # ===========================
     # Argumentos e expressões
     # ===========================
     def args(self):
         args = [self.expression()]
-        while self.current_token() == ("SYM", ","):
-            self.eat("SYM", ",")
+        while self.kind == SYM_COMMA:
+            self.eat(SYM_COMMA)
             args.append(self.expression())
         return args
 
-    def expression(self):
-        return self.logic_or()
-
-    def logic_or(self):
-        node = self.logic_and()
-        while self.current_token() == ("KEYWORD", "or"):
-            op = self.eat("KEYWORD", "or")
-            node = ("binop", op, node, self.logic_and())
-        return node
-
-    def logic_and(self):
-        node = self.comparison_expr()
-        while self.current_token() == ("KEYWORD", "and"):
-            op = self.eat("KEYWORD", "and")
-            node = ("binop", op, node, self.comparison_expr())
-        return node
-
-    def comparison_expr(self):
-        node = self.sum_expr()
-        while self.current_token()[0] == "OP" and self.current_token()[1] in {"==", "!=", "<", ">", "<=", ">="}:
-            op = self.eat("OP")
-            node = ("binop", op, node, self.sum_expr())
+    def expression(self, min_power=1, left=None):
+        """
+        Expressões por precedence climbing: cada operador binário tem uma força
+        de ligação (BINARY_POWER). O laço consome operadores de força >= min_power
+        com associatividade à esquerda; só quando o operador seguinte liga mais
+        forte descemos um nível para montar o operando direito. A profundidade
+        de recursão fica limitada ao número de níveis de precedência, não ao
+        comprimento da cadeia (a + b + c + ...).
+        """
+        get_power = BINARY_POWER.get
+        node = self.operand() if left is None else left
+        power = get_power(self.kind, 0)
+        while power >= min_power:
+            _, op, line, col = self._ring[self._head]
+            self.take()
+            right = self.operand()
+            next_power = get_power(self.kind, 0)
+            if next_power > power:
+                right = self.expression(power + 1, right)
+                next_power = get_power(self.kind, 0)
+            node = self.ast.BinOp(op, node, right, line, col)
+            power = next_power
         return node
 
-    def sum_expr(self):
-        node = self.term_expr()
-        while self.current_token()[0] == "OP" and self.current_token()[1] in {"+", "-"}:
-            op = self.eat("OP")
-            node = ("binop", op, node, self.term_expr())
-        return node
+    def operand(self):
+        """Operando de uma expressão binária; literais e identificadores simples saem direto."""
+        kind, value, line, col = self._ring[self._head]
+        if kind in LITERAL_NODES and (kind != ID or self.peek_kind(1) != SYM_LPAREN):
+            self.take()
+            return self._literals[kind](value, line, col)
+        return self.unary_expr()
 
-    def term_expr(self):
-        node = self.unary_expr()
-        while self.current_token()[0] == "OP" and self.current_token()[1] in {"*", "/"}:
-            op = self.eat("OP")
-            node = ("binop", op, node, self.unary_expr())
+    def unary_expr(self):
+        if self.kind not in PREFIX_OPS:
+            return self.primary_expr()
+        # Operadores prefixados (not, -) se aplicam ao fator que os segue.
+        prefix = []
+        while self.kind in PREFIX_OPS:
+            prefix.append(self._ring[self._head])
+            self.take()
+        node = self.primary_expr()
+        for _, op, line, col in reversed(prefix):
+            node = self.ast.UnOp(op, node, line, col)
         return node
 
-    def unary_expr(self):
-        ttype, value = self.current_token()
-        if ttype == "ID" and self.peek(1) == ("SYM", "("):
-            return self.call()
-        if (ttype, value) in {("KEYWORD", "print"), ("KEYWORD", "input")} and self.peek(1) == ("SYM", "("):
+    def primary_expr(self):
+        kind, value, line, col = self._ring[self._head]
+        if kind in LITERAL_NODES:
+            if kind == ID and self.peek_kind(1) == SYM_LPAREN:
+                return self.call()
+            self.take()
+            return self._literals[kind](value, line, col)
+        if kind == KW_PRINT and self.peek_kind(1) == SYM_LPAREN:
             return self.builtin_call()
-        if ttype in {"NUMBER", "ID", "BOOLEAN", "STRING"}:
-            self.pos += 1
-            return (ttype.lower(), value)
-        elif (ttype, value) == ("KEYWORD", "not"):
-            self.eat("KEYWORD", "not")
-            return ("unop", "not", self.unary_expr())
-        elif (ttype, value) == ("SYM", "("):
-            self.eat("SYM", "(")
+        elif kind == SYM_LPAREN:
+            self.eat(SYM_LPAREN)
             node = self.expression()
-            self.eat("SYM", ")")
+            self.eat(SYM_RPAREN)
             return node
         else:
-            raise ParserError(f"Fator inesperado: {ttype}, {value}")
+            ttype, value = self.current_token()
+            raise self.error(f"Fator inesperado: {ttype}, {value}")
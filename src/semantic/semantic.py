@@ -1,429 +1,515 @@
+from contextlib import contextmanager
 from typing import Dict, Any, Optional, List
 
+from src.parser.nodes import ID, IF_ELSE
+from src.visitor.visitor import Visitor, postorder
+
 class SemanticError(Exception):
-    """Erro semântico detalhado."""
-    def __init__(self, message: str):
-        super().__init__(f"Erro semântico: {message}")
+    """Erro semântico detalhado, com a posição (linha, coluna) do nó quando conhecida."""
+    def __init__(self, message: str, line: int = 0, col: int = 0):
+        self.message = message
+        self.line = line
+        self.col = col
+        location = f" (linha {line}, coluna {col})" if line else ""
+        super().__init__(f"Erro semântico: {message}{location}")
 
 
 class SymbolTable:
-    """Tabela de símbolos com suporte a escopos."""
-    def __init__(self, parent: Optional["SymbolTable"] = None):
-        self.symbols: Dict[str, Any] = {}
-        self.parent = parent
+    """
+    Tabela de símbolos achatada, com suporte a escopos aninhados.
+
+    Em vez de um dicionário por escopo ligado ao escopo pai, há um único
+    dicionário de cada nome para a pilha de suas definições visíveis, como
+    pares (id do escopo, info), com a mais interna no topo. Cada escopo aberto
+    guarda um registro de desfazer com os nomes que definiu; ao fechar o escopo,
+    essas definições são retiradas das pilhas. Assim define, lookup, assign e
+    set_type custam O(1), qualquer que seja a profundidade de aninhamento.
+    O id do escopo é a sua profundidade (0 = global).
+    """
+    def __init__(self):
+        self.entries: Dict[str, List[list]] = {}
+        self.undo_log: List[List[str]] = [[]]
+
+    def push_scope(self):
+        self.undo_log.append([])
+
+    def pop_scope(self):
+        entries = self.entries
+        for name in self.undo_log.pop():
+            stack = entries[name]
+            stack.pop()
+            if not stack:
+                del entries[name]
+
+    @contextmanager
+    def scope(self):
+        """Abre um escopo filho do corrente durante o bloco 'with'."""
+        self.push_scope()
+        try:
+            yield self
+        finally:
+            self.pop_scope()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
 
     def define(self, name: str, value: Any):
-        if name in self.symbols:
+        depth = len(self.undo_log) - 1
+        stack = self.entries.get(name)
+        if stack is None:
+            self.entries[name] = [[depth, value]]
+        elif stack[-1][0] == depth:
             raise SemanticError(f"Símbolo '{name}' já definido neste escopo.")
-        self.symbols[name] = value
-
-    def resolve(self, name: str) -> Optional["SymbolTable"]:
-        """
-        Retorna a tabela que contém 'name' ou None se não existir.
-        """
-        if name in self.symbols:
-            return self
-        if self.parent:
-            return self.parent.resolve(name)
-        return None
+        else:
+            stack.append([depth, value])
+        self.undo_log[-1].append(name)
 
     def lookup(self, name: str):
-        table = self.resolve(name)
-        if table is None:
+        stack = self.entries.get(name)
+        if stack is None:
+            raise SemanticError(f"Símbolo '{name}' não definido.")
+        return stack[-1][1]
+
+    def lookup_global(self, name: str):
+        """Como lookup, mas considera apenas o escopo global."""
+        stack = self.entries.get(name)
+        if stack is None or stack[0][0] != 0:
             raise SemanticError(f"Símbolo '{name}' não definido.")
-        return table.symbols[name]
+        return stack[0][1]
 
     def assign(self, name: str, value: Any):
-        table = self.resolve(name)
-        if table:
-            table.symbols[name] = value
-        else:
+        stack = self.entries.get(name)
+        if stack is None:
             raise SemanticError(f"Tentativa de atribuir a variável '{name}' não definida.")
+        stack[-1][1] = value
 
     def set_type(self, name: str, new_type: str):
         """
         Atualiza o tipo do símbolo 'name' (se o símbolo existir).
         Mantém 'initialized' se já existia, caso contrário deixa como False.
         """
-        table = self.resolve(name)
-        if table is None:
+        stack = self.entries.get(name)
+        if stack is None:
             raise SemanticError(f"Tentativa de set_type em '{name}' que não existe.")
-        info = table.symbols[name]
+        info = stack[-1][1]
         if isinstance(info, dict):
             info["type"] = new_type
         else:
             # caso o valor não seja dict (não esperado), sobrescrevemos
-            table.symbols[name] = {"type": new_type, "initialized": True}
-
-
-class SemanticAnalyzer:
+            stack[-1][1] = {"type": new_type, "initialized": True}
+
+
+class SemanticAnalyzer(Visitor):
+    """
+    Verifica tipos, escopos e o uso de funções e canais. Os handlers visit_<tag>
+    devolvem o tipo do nó (ou None) e consultam a tabela de símbolos 'symbols',
+    cujo escopo corrente acompanha o percurso: blocos abrem um escopo com
+    'with self.symbols.scope()' em volta da visita do corpo.
+
+    Ao final, 'functions' guarda as informações de cada função definida
+    (nome -> dict com params, param_types, return, body e locals, os nomes
+    definidos dentro da função, incluindo os parâmetros), usadas pelo otimizador,
+    e 'types' o tipo inferido de cada operação binária (nó BinOp -> "number",
+    "string", "boolean" ou "unknown"), com o qual o gerador de código escolhe
+    a instrução: soma de números, concatenação de strings ou soma decidida
+    só na execução, quando os tipos dos operandos não são conhecidos.
+    """
     def __init__(self, ast):
         self.ast = ast
-        self.global_scope = SymbolTable()
+        self.symbols = SymbolTable()
         self.current_function: Optional[str] = None
+        self.functions: Dict[str, Dict[str, Any]] = {}
+        self.types: Dict[Any, str] = {}
 
     def analyze(self):
         """Inicia a análise semântica do AST."""
-        self.visit(self.ast, self.global_scope)
+        self.visit(self.ast)
+
+    def define_variable(self, name: str, info: Dict[str, Any]):
+        """Define 'name' no escopo corrente e, dentro de uma função, o registra entre os locais dela."""
+        self.symbols.define(name, info)
+        if self.current_function is not None:
+            self.functions[self.current_function]["locals"].add(name)
+
+    def handle_error(self, exc, node):
+        # Posiciona o erro no nó mais interno que o originou.
+        if isinstance(exc, SemanticError) and not exc.line and node.line:
+            return SemanticError(exc.message, node.line, node.col)
+        return exc
+
+    def generic_visit(self, node, *results):
+        raise SemanticError(f"Nó desconhecido: {node.tag}") # Se caiu aqui: Precisamos realizar algumas implementações adicionais.
 
 
     # ===========================================================
-    # VISITADOR
+    # ESTRUTURAS GERAIS E BLOCOS
     # ===========================================================
-    def visit(self, node, scope: SymbolTable):
-        nodetype = node[0]
-
-        if nodetype == "program":
-            # ("program", stmts)
-            return self.visit(node[1], scope)
-
-        elif nodetype == "stmts":
-            # ("stmts", [stmt1, stmt2, ...])
-            for stmt in node[1]:
-                self.visit(stmt, scope)
-            return None
-
-        elif nodetype == "assignment":
-            # ("assignment", var_name, expr)
-            var_name = node[1]
-            expr = node[2]
-            expr_type = self.visit(expr, scope)
-
-            # define ou atualiza variável
-            if scope.resolve(var_name) is None:
-                scope.define(var_name, {"type": expr_type, "initialized": True})
+    @postorder("stmts")
+    def visit_program(self, node, result):
+        # ("program", stmts)
+        return result
+
+    @postorder("*body")
+    def visit_stmts(self, node, *results):
+        # ("stmts", [stmt1, stmt2, ...])
+        return None
+
+    def visit_seq_stmt(self, node):
+        # ("seq_stmt", stmts) / ("par_stmt", stmts)
+        with self.symbols.scope():
+            yield node.body
+        return None
+
+    visit_par_stmt = visit_seq_stmt
+
+    @postorder("expr")
+    def visit_assignment(self, node, expr_type):
+        # ("assignment", var_name, expr)
+        var_name = node.name
+        scope = self.symbols
+
+        # define ou atualiza variável
+        if var_name not in scope:
+            self.define_variable(var_name, {"type": expr_type, "initialized": True})
+        else:
+            info = scope.lookup(var_name)
+            # info pode ser um dict com "type"
+            existing_type = info.get("type", "unknown") if isinstance(info, dict) else "unknown"
+            if expr_type == "unknown":
+                # valor de tipo só conhecido na execução: mantém o tipo já inferido
+                expr_type = existing_type
+            if existing_type != expr_type and existing_type != "unknown":
+                raise SemanticError(
+                    f"Incompatibilidade de tipo em '{var_name}'. Esperado {existing_type}, obtido {expr_type}."
+                )
+            # atualiza o tipo se estava unknown
+            if isinstance(info, dict):
+                info["type"] = expr_type
+                info["initialized"] = True
             else:
-                info = scope.lookup(var_name)
-                # info pode ser um dict com "type"
-                existing_type = info.get("type", "unknown") if isinstance(info, dict) else "unknown"
-                if existing_type != expr_type and existing_type != "unknown":
-                    raise SemanticError(
-                        f"Incompatibilidade de tipo em '{var_name}'. Esperado {existing_type}, obtido {expr_type}."
-                    )
-                # atualiza o tipo se estava unknown
-                if isinstance(info, dict):
-                    info["type"] = expr_type
-                    info["initialized"] = True
-                else:
-                    scope.assign(var_name, {"type": expr_type, "initialized": True})
-            return expr_type
-
-        elif nodetype == "function_stmt":
-            # ("function_stmt", name, params, stmts)
-            func_name, params, body = node[1], node[2], node[3]
-
-            if scope.resolve(func_name) is not None:
-                raise SemanticError(f"Função '{func_name}' já foi definida.")
-
-            # Registra função no escopo atual; armazena param_types inicial como unknown
-            func_info = {
-                "type": "function",
-                "params": params,
-                "param_types": {p: "unknown" for p in params},
-                "return": "unknown",
-                "body": body
-            }
-            scope.define(func_name, func_info)
-
-            # Cria novo escopo para função e define parâmetros com tipo unknown
-            func_scope = SymbolTable(parent=scope)
-            for p in params:
-                func_scope.define(p, {"type": "unknown", "initialized": True})
+                scope.assign(var_name, {"type": expr_type, "initialized": True})
+        return expr_type
 
+    # ===========================================================
+    # FUNÇÕES
+    # ===========================================================
+    def visit_function_stmt(self, node):
+        # ("function_stmt", name, params, stmts)
+        func_name, params, body = node.name, node.params, node.body
+        scope = self.symbols
+
+        if func_name in scope:
+            raise SemanticError(f"Função '{func_name}' já foi definida.")
+
+        # Registra função no escopo atual; armazena param_types inicial como unknown
+        func_info = {
+            "type": "function",
+            "params": params,
+            "param_types": {p: "unknown" for p in params},
+            "return": "unknown",
+            "body": body,
+            "locals": set(),
+        }
+        scope.define(func_name, func_info)
+        self.functions[func_name] = func_info
+
+        # Cria novo escopo para função e define parâmetros com tipo unknown
+        with scope.scope():
             prev_func = self.current_function
             self.current_function = func_name
+            for p in params:
+                self.define_variable(p, {"type": "unknown", "initialized": True})
+
             # analisa o corpo — durante essa análise podemos inferir tipos dos parâmetros
-            self.visit(body, func_scope)
+            yield body
             self.current_function = prev_func
 
-            # Após analisar o corpo, extraímos os tipos inferidos dos parâmetros...
+            # Após analisar o corpo (ainda no escopo da função), extraímos os tipos inferidos dos parâmetros...
             for p in params:
-                p_table = func_scope.resolve(p)
-                if p_table:
-                    p_info = p_table.symbols[p]
-                    if isinstance(p_info, dict):
-                        inferred = p_info.get("type", "unknown")
-                        func_info["param_types"][p] = inferred
-            return None
-
-        elif nodetype == "call":
-            # ("call", func_name, [args])
-            func_name = node[1]
-            args = node[2]
-            func_info = scope.lookup(func_name)
-
-            if func_info.get("type") != "function":
-                raise SemanticError(f"'{func_name}' não é uma função válida.")
-
-            expected = len(func_info["params"])
-            received = len(args)
-            if expected != received:
+                p_info = scope.lookup(p)
+                if isinstance(p_info, dict):
+                    inferred = p_info.get("type", "unknown")
+                    func_info["param_types"][p] = inferred
+        return None
+
+    def visit_call(self, node):
+        # ("call", func_name, [args])
+        func_name = node.name
+        args = node.args
+        func_info = self.symbols.lookup(func_name)
+
+        if func_info.get("type") != "function":
+            raise SemanticError(f"'{func_name}' não é uma função válida.")
+
+        expected = len(func_info["params"])
+        received = len(args)
+        if expected != received:
+            raise SemanticError(
+                f"Função '{func_name}' esperava {expected} argumento(s), recebeu {received}."
+            )
+
+        # verificamos tipos dos argumentos comparando com param_types (inferidos do corpo)
+        for i, arg in enumerate(args):
+            arg_type = yield arg
+            param_name = func_info["params"][i]
+            expected_type = func_info["param_types"].get(param_name, "unknown")
+
+            if expected_type != "unknown" and arg_type != "unknown" and arg_type != expected_type:
                 raise SemanticError(
-                    f"Função '{func_name}' esperava {expected} argumento(s), recebeu {received}."
+                    f"Tipo incorreto no argumento {i+1} da função '{func_name}': esperado {expected_type}, obtido {arg_type}."
                 )
+            # se a função tinha tipo unknown para o parâmetro, não forçamos inferência a partir da chamada
+            # (preferimos inferir a partir do corpo da função; chamdas podem ocorrer com tipos diferentes).
+
+        return func_info.get("return", "unknown")
+
+    @postorder("*args")
+    def visit_builtin_call(self, node, *arg_types):
+        # ("builtin_call", "print", [args...])
+        return "unknown"
 
-            # verificamos tipos dos argumentos comparando com param_types (inferidos do corpo)
-            for i, arg in enumerate(args):
-                arg_type = self.visit(arg, scope)
-                param_name = func_info["params"][i]
-                expected_type = func_info["param_types"].get(param_name, "unknown")
+    def visit_return_stmt(self, node):
+        # ("return_stmt", expr ou None)
 
-                if expected_type != "unknown" and arg_type != "unknown" and arg_type != expected_type:
+        # Verifica se estamos dentro de uma função
+        if self.current_function is None:
+            raise SemanticError("'return' só pode ser usado dentro de uma função.")
+
+        # Se há uma expressão, analisa seu tipo
+        return_expr = node.expr
+        if return_expr is not None:
+            return_type = yield return_expr
+            if return_type == "unknown":
+                # ex.: fib(n - 1) + fib(n - 2), ainda sem tipo de retorno conhecido
+                return return_type
+
+            # Atualiza o tipo de retorno da função
+            func_info = self.symbols.lookup_global(self.current_function)
+            if isinstance(func_info, dict):
+                existing_return = func_info.get("return", "unknown")
+
+                # Se já tinha um tipo de retorno diferente, verifica compatibilidade
+                if existing_return != "unknown" and existing_return != return_type:
                     raise SemanticError(
-                        f"Tipo incorreto no argumento {i+1} da função '{func_name}': esperado {expected_type}, obtido {arg_type}."
+                        f"Função '{self.current_function}' retorna tipos inconsistentes: "
+                        f"{existing_return} e {return_type}."
                     )
-                # se a função tinha tipo unknown para o parâmetro, não forçamos inferência a partir da chamada
-                # (preferimos inferir a partir do corpo da função; chamdas podem ocorrer com tipos diferentes).
 
-            return func_info.get("return", "unknown")
+                func_info["return"] = return_type
 
-        elif nodetype == "builtin_call":
-            # ("builtin_call", "print", [args...])
-            for arg in node[2]:
-                self.visit(arg, scope)
-            return "unknown"
+            return return_type
+        else:
+            # return vazio (retorna None/void)
+            func_info = self.symbols.lookup_global(self.current_function)
+            if isinstance(func_info, dict):
+                if func_info.get("return", "unknown") == "unknown":
+                    func_info["return"] = "void"
+            return "void"
 
-        elif nodetype in {"if", "if_else"}:
-            cond = node[1]
-            true_block = node[2]
-            cond_type = self.visit(cond, scope)
-            if cond_type != "boolean":
-                raise SemanticError(f"A condição do '{nodetype}' deve ser booleana.")
-            self.visit(true_block, SymbolTable(parent=scope))
-            if nodetype == "if_else":
-                false_block = node[3]
-                self.visit(false_block, SymbolTable(parent=scope))
-            return None
-
-        elif nodetype == "while":
-            cond, body = node[1], node[2]
-            cond_type = self.visit(cond, scope)
-            if cond_type != "boolean":
-                raise SemanticError("Condição do 'while' deve ser booleana.")
-            self.visit(body, SymbolTable(parent=scope))
-            return None
-        elif nodetype == "for":
-            # ("for", init_stmt, cond_expr, update_stmt, body)
-            init_stmt, cond_expr, update_stmt, body = node[1], node[2], node[3], node[4]
+    # ===========================================================
+    # CONTROLE DE FLUXO
+    # ===========================================================
+    def visit_if(self, node):
+        # ("if", cond, true_block) / ("if_else", cond, true_block, false_block)
+        cond_type = yield node.cond
+        if cond_type != "boolean":
+            raise SemanticError(f"A condição do '{node.tag}' deve ser booleana.")
+        with self.symbols.scope():
+            yield node.body
+        if node.kind == IF_ELSE:
+            with self.symbols.scope():
+                yield node.orelse
+        return None
 
-            # Criar escopo próprio do loop for
-            loop_scope = SymbolTable(parent=scope)
+    visit_if_else = visit_if
+
+    def visit_while(self, node):
+        cond_type = yield node.cond
+        if cond_type != "boolean":
+            raise SemanticError("Condição do 'while' deve ser booleana.")
+        with self.symbols.scope():
+            yield node.body
+        return None
 
+    def visit_for(self, node):
+        # ("for", init_stmt, cond_expr, update_stmt, body)
+
+        # Criar escopo próprio do loop for
+        with self.symbols.scope():
             # Analisar a inicialização (pode definir variáveis)
-            self.visit(init_stmt, loop_scope)
+            yield node.init
 
             # Verificar tipo da condição
-            cond_type = self.visit(cond_expr, loop_scope)
+            cond_type = yield node.cond
             if cond_type != "boolean":
                 raise SemanticError("A condição do 'for' deve ser booleana.")
 
             # Analisar atualização (geralmente é uma atribuição)
-            self.visit(update_stmt, loop_scope)
+            yield node.update
 
             # Analisar corpo do loop
-            self.visit(body, SymbolTable(parent=loop_scope))
-
-            return None
-
-        # Lidamos com return abaixo.
-
-        elif nodetype == "return_stmt":
-            # ("return_stmt", expr ou None)
+            with self.symbols.scope():
+                yield node.body
 
-            # Verifica se estamos dentro de uma função
-            if self.current_function is None:
-                raise SemanticError("'return' só pode ser usado dentro de uma função.")
-
-            # Se há uma expressão, analisa seu tipo
-            return_expr = node[1]
-            if return_expr is not None:
-                return_type = self.visit(return_expr, scope)
-
-                # Atualiza o tipo de retorno da função
-                func_info = self.global_scope.lookup(self.current_function)
-                if isinstance(func_info, dict):
-                    existing_return = func_info.get("return", "unknown")
-
-                    # Se já tinha um tipo de retorno diferente, verifica compatibilidade
-                    if existing_return != "unknown" and existing_return != return_type:
-                        raise SemanticError(
-                            f"Função '{self.current_function}' retorna tipos inconsistentes: "
-                            f"{existing_return} e {return_type}."
-                        )
-
-                    func_info["return"] = return_type
+        return None
 
-                return return_type
+    # =======================================================
+    # SUPORTE A C_CHANNEL
+    # =======================================================
+    def visit_channel_stmt(self, node):
+        # ("channel_stmt", channel_name, comp1, comp2)
+        # O canal e os dois computadores são registrados como canais, se ainda não existirem.
+        scope = self.symbols
+        for var in (node.name, node.comp1, node.comp2):
+            if var not in scope:
+                self.define_variable(var, {"type": "channel", "initialized": True})
+        return "channel"
+
+    # =======================================================
+    # SUPORTE A SEND E RECEIVE
+    # =======================================================
+    def visit_channel_send(self, node):
+        # ("channel_send", channel_name, [args])
+        channel_name, args = node.channel, node.args
+
+        # Verifica se o canal existe e é válido
+        info = self.symbols.lookup(channel_name)
+        if not isinstance(info, dict) or info.get("type") != "channel":
+            raise SemanticError(f"'{channel_name}' não é um canal válido para 'send'.")
+
+        # Analisa os argumentos (devem estar inicializados)
+        for arg in args:
+            arg_type = yield arg
+            if arg_type == "unknown":
+                raise SemanticError(f"Valor indefinido enviado por '{channel_name}.send()'.")
+
+        # Envio não retorna nada
+        return "void"
+
+    def visit_channel_receive(self, node):
+        # ("channel_receive", channel_name, [args])
+        channel_name, args = node.channel, node.args
+        scope = self.symbols
+
+        info = scope.lookup(channel_name)
+        if not isinstance(info, dict) or info.get("type") != "channel":
+            raise SemanticError(f"'{channel_name}' não é um canal válido para 'receive'.")
+
+        # Os argumentos devem ser variáveis válidas, e marcadas como inicializadas
+        for arg in args:
+            if arg.kind != ID:
+                raise SemanticError("Apenas variáveis podem ser usadas em 'receive'.")
+            var_name = arg.value
+
+            if var_name not in scope:
+                # Se ainda não existe, definimos com tipo desconhecido
+                self.define_variable(var_name, {"type": "unknown", "initialized": True})
             else:
-                # return vazio (retorna None/void)
-                func_info = self.global_scope.lookup(self.current_function)
-                if isinstance(func_info, dict):
-                    if func_info.get("return", "unknown") == "unknown":
-                        func_info["return"] = "void"
-                return "void"
-
-
-        elif nodetype in {"seq_stmt", "par_stmt"}:
-            # ("seq_stmt", stmts) / ("par_stmt", stmts)
-            self.visit(node[1], SymbolTable(parent=scope))
-            return None
-
-        elif nodetype == "channel_stmt":
-            # ("channel_stmt", var1, var2, ...)
-            for var in node[1:]:
-                if scope.resolve(var) is None:
-                    scope.define(var, {"type": "channel", "initialized": True})
-            return "channel"
-
-
-        # =======================================================
-        # SUPORTE A C_CHANNEL
-        # =======================================================
-        elif nodetype == "channel_stmt":
-            # ("channel_stmt", channel_name, comp1, comp2)
-            channel_name, comp1, comp2 = node[1], node[2], node[3]
-
-            # Define o canal como um tipo especial
-            if scope.resolve(channel_name) is not None:
-                raise SemanticError(f"Canal '{channel_name}' já foi definido.")
-            scope.define(channel_name, {
-                "type": "channel",
-                "initialized": True,
-                "endpoint1": comp1,
-                "endpoint2": comp2
-            })
-
-            # Define também os computadores envolvidos (se ainda não existirem)
-            for comp in (comp1, comp2):
-                if scope.resolve(comp) is None:
-                    scope.define(comp, {"type": "computer", "initialized": True})
-
-            return "channel"
-
-        # =======================================================
-        # SUPORTE A SEND E RECEIVE
-        # =======================================================
-        elif nodetype == "channel_send":
-            # ("channel_send", channel_name, [args])
-            channel_name, args = node[1], node[2]
-
-            # Verifica se o canal existe e é válido
-            info = scope.lookup(channel_name)
-            if not isinstance(info, dict) or info.get("type") != "channel":
-                raise SemanticError(f"'{channel_name}' não é um canal válido para 'send'.")
-
-            # Analisa os argumentos (devem estar inicializados)
-            for arg in args:
-                arg_type = self.visit(arg, scope)
-                if arg_type == "unknown":
-                    raise SemanticError(f"Valor indefinido enviado por '{channel_name}.send()'.")
-
-            # Envio não retorna nada
-            return "void"
+                var_info = scope.lookup(var_name)
+                if isinstance(var_info, dict):
+                    var_info["initialized"] = True
 
-        elif nodetype == "channel_receive":
-            # ("channel_receive", channel_name, [args])
-            channel_name, args = node[1], node[2]
-
-            info = scope.lookup(channel_name)
-            if not isinstance(info, dict) or info.get("type") != "channel":
-                raise SemanticError(f"'{channel_name}' não é um canal válido para 'receive'.")
-
-            # Os argumentos devem ser variáveis válidas, e marcadas como inicializadas
-            for arg in args:
-                if arg[0] != "id":
-                    raise SemanticError("Apenas variáveis podem ser usadas em 'receive'.")
-                var_name = arg[1]
-
-                if scope.resolve(var_name) is None:
-                    # Se ainda não existe, definimos com tipo desconhecido
-                    scope.define(var_name, {"type": "unknown", "initialized": True})
-                else:
-                    var_info = scope.lookup(var_name)
-                    if isinstance(var_info, dict):
-                        var_info["initialized"] = True
-
-            # Recepção não retorna nada
-            return "void"
-        elif nodetype == "binop":
-            # ("binop", op, left, right)
-            op, left, right = node[1], node[2], node[3]
-            ltype = self.visit(left, scope)
-            rtype = self.visit(right, scope)
-
-            # Se um dos lados for 'unknown' e for um ID, inferimos o tipo com base no operador
-            expected_type = None
-            if op in {"+", "-", "*", "/"}:
-                expected_type = "number"
-            elif op in {"and", "or"}:
-                expected_type = "boolean"
-            elif op in {"==", "!=", ">", "<", ">=", "<="}:
-                # comparações aceitam múltiplos tipos; devolvem boolean
-                # se quiser, poderia inferir ambos para o mesmo tipo, porém deixamos flexível
-                expected_type = "any_compare"
-
-            # inferência simples: se um lado unknown e é id, definimos o tipo esperado
-            if expected_type and expected_type != "any_compare":
-                # esquerda
-                if ltype == "unknown" and isinstance(left, tuple) and left[0] == "id":
-                    name = left[1]
-                    # tentar setar no escopo apropriado (se existir)
-                    try:
-                        scope.set_type(name, expected_type)
-                        ltype = expected_type
-                    except SemanticError:
-                        # se não conseguiu, silenciosamente segue (não deveria ocorrer normalmente)
-                        pass
-                # direita
-                if rtype == "unknown" and isinstance(right, tuple) and right[0] == "id":
-                    name = right[1]
-                    try:
-                        scope.set_type(name, expected_type)
-                        rtype = expected_type
-                    except SemanticError:
-                        pass
-
-            # agora, se ambos são conhecidos e diferentes => erro
-            if ltype != "unknown" and rtype != "unknown" and ltype != rtype:
-                raise SemanticError(f"Operação '{op}' entre tipos incompatíveis: {ltype} e {rtype}.")
-
-            # determinar tipo de retorno conforme operador
-            if op in {"+", "-", "*", "/"}:
-                return "number"
-            elif op in {"and", "or"}:
-                return "boolean"
-            elif op in {"==", "!=", ">", "<", ">=", "<="}:
-                return "boolean"
+        # Recepção não retorna nada
+        return "void"
+
+    # ===========================================================
+    # EXPRESSÕES
+    # ===========================================================
+    @postorder("left", "right")
+    def visit_binop(self, node, ltype, rtype):
+        # ("binop", op, left, right)
+        op, left, right = node.op, node.left, node.right
+        scope = self.symbols
+
+        # Se um dos lados for 'unknown' e for um ID, inferimos o tipo com base no operador
+        expected_type = None
+        if op == "+":
+            # soma de números ou concatenação de strings: o outro lado decide
+            expected_type = "string" if "string" in (ltype, rtype) else "number"
+        elif op in {"-", "*", "/"}:
+            expected_type = "number"
+        elif op in {"and", "or"}:
+            expected_type = "boolean"
+        elif op in {"==", "!=", ">", "<", ">=", "<="}:
+            # comparações aceitam múltiplos tipos; devolvem boolean
+            # se quiser, poderia inferir ambos para o mesmo tipo, porém deixamos flexível
+            expected_type = "any_compare"
+
+        # inferência simples: se um lado unknown e é id, definimos o tipo esperado
+        if expected_type and expected_type != "any_compare":
+            # esquerda
+            if ltype == "unknown" and left.kind == ID:
+                name = left.value
+                # tentar setar no escopo apropriado (se existir)
+                try:
+                    scope.set_type(name, expected_type)
+                    ltype = expected_type
+                except SemanticError:
+                    # se não conseguiu, silenciosamente segue (não deveria ocorrer normalmente)
+                    pass
+            # direita
+            if rtype == "unknown" and right.kind == ID:
+                name = right.value
+                try:
+                    scope.set_type(name, expected_type)
+                    rtype = expected_type
+                except SemanticError:
+                    pass
+
+        # agora, se ambos são conhecidos e diferentes => erro
+        if ltype != "unknown" and rtype != "unknown" and ltype != rtype:
+            raise SemanticError(f"Operação '{op}' entre tipos incompatíveis: {ltype} e {rtype}.")
+
+        # operandos conhecidos devem ser do tipo que o operador aceita
+        known = ltype if ltype != "unknown" else rtype
+        if op == "+" and known not in {"number", "string", "unknown"}:
+            raise SemanticError(f"Operação '+' só é válida para números ou strings, obtido {known}.")
+        if expected_type in {"number", "boolean"} and op != "+" and known not in {expected_type, "unknown"}:
+            accepted = "números" if expected_type == "number" else "booleanos"
+            raise SemanticError(f"Operação '{op}' só é válida para {accepted}, obtido {known}.")
+
+        # determinar tipo de retorno conforme operador; o tipo fica registrado
+        # para o gerador de código escolher a instrução (ver 'types')
+        if op == "+":
+            result = known  # number, string ou unknown (decidido só na execução)
+        elif op in {"-", "*", "/"}:
+            result = "number"
+        elif op in {"and", "or"}:
+            result = "boolean"
+        elif op in {"==", "!=", ">", "<", ">=", "<="}:
+            result = "boolean"
+        else:
+            result = "unknown"
+        self.types[node] = result
+        return result
+
+    @postorder("expr")
+    def visit_unop(self, node, etype):
+        # ("unop", op, expr)
+        op = node.op
+        if op == "not" and etype not in {"boolean", "unknown"}:
+            raise SemanticError("Operador 'not' só é válido para booleanos.")
+        if op == "-" and etype not in {"number", "unknown"}:
+            raise SemanticError("Operador '-' só é válido para números.")
+        return etype
+
+    def visit_id(self, node):
+        var_name = node.value
+        info = self.symbols.lookup(var_name)
+        # info deve ser dict {"type": ..., "initialized": ...}
+        if isinstance(info, dict):
+            if not info.get("initialized", False):
+                raise SemanticError(f"Variável '{var_name}' usada antes de ser inicializada.")
+            return info.get("type", "unknown")
+        else:
+            # se o conteúdo não for dict, retornamos unknown
             return "unknown"
 
-        elif nodetype == "unop":
-            # ("unop", op, expr)
-            op, expr = node[1], node[2]
-            etype = self.visit(expr, scope)
-            if op == "not" and etype != "boolean":
-                raise SemanticError("Operador 'not' só é válido para booleanos.")
-            if op == "-" and etype != "number":
-                raise SemanticError("Operador '-' só é válido para números.")
-            return etype
-
-        elif nodetype == "id":
-            var_name = node[1]
-            info = scope.lookup(var_name)
-            # info deve ser dict {"type": ..., "initialized": ...}
-            if isinstance(info, dict):
-                if not info.get("initialized", False):
-                    raise SemanticError(f"Variável '{var_name}' usada antes de ser inicializada.")
-                return info.get("type", "unknown")
-            else:
-                # se o conteúdo não for dict, retornamos unknown
-                return "unknown"
+    def visit_number(self, node):
+        return "number"
 
-        elif nodetype == "number":
-            return "number"
-        elif nodetype == "boolean":
-            return "boolean"
-        elif nodetype == "string":
-            return "string"
+    def visit_boolean(self, node):
+        return "boolean"
 
-        else:
-            raise SemanticError(f"Nó desconhecido: {nodetype}") # Se caiu aqui: Precisamos realizar algumas implementações adicionais.
+    def visit_string(self, node):
+        return "string"
@@ -0,0 +1,194 @@
+from inspect import isgeneratorfunction
+from operator import attrgetter
+
+from src.parser.nodes import NODE_CLASSES
+
+# =================================================
+# VISITADOR COM TABELA DE DESPACHO E PILHA EXPLÍCITA
+# =================================================
+
+# Modos de handler na tabela de despacho; handlers pós-ordem guardam, no lugar
+# do modo, a função que devolve a tupla de filhos do nó.
+LEAF, GENERATOR = "leaf", "generator"
+_START = object()  # marca um quadro pós-ordem recém-criado, ainda sem resultados
+
+
+def postorder(*fields):
+    """
+    Marca um handler cujos filhos 'fields' (campos de nó do nó visitado) são
+    visitados antes dele, em ordem e com os mesmos argumentos extras. O handler
+    é uma função comum que recebe os resultados dos filhos depois dos argumentos:
+        @postorder("left", "right")
+        def visit_binop(self, node, ltype, rtype): ...
+
+    Um único campo com prefixo "*" indica uma lista de nós, cujos itens são os filhos:
+        @postorder("*body")
+        def visit_stmts(self, node, *results): ...
+    """
+    def mark(handler):
+        handler.postorder_fields = fields
+        return handler
+    return mark
+
+
+def _single(getter):
+    return lambda node: (getter(node),)
+
+
+class Visitor:
+    """
+    Base dos passes que percorrem a AST tipada (análise semântica, geração de código).
+
+    Cada subclasse define métodos visit_<tag> (visit_binop, visit_if_else, ...).
+    Uma única vez por classe, esses métodos são reunidos em uma tabela indexada
+    pelo kind do nó, de modo que o despacho é um acesso a lista, sem cadeia de
+    if/elif nem getattr por nó. Tags sem método caem em generic_visit.
+
+    Um handler pode ser:
+      - uma função comum, que devolve o resultado do nó (ideal para folhas);
+      - uma função marcada com @postorder, que recebe os resultados dos filhos
+        já visitados (o caso comum das expressões, e o mais barato);
+      - um gerador, que pede a visita de um filho com 'yield filho' (ou
+        'yield filho, arg1, ...' para passar argumentos extras ao handler do
+        filho) e recebe o resultado como valor do yield; o resultado do nó é o
+        valor do 'return'. Serve para os comandos que intercalam visitas e ações.
+
+    O percurso usa uma pilha explícita, então a profundidade da AST não é
+    limitada pelo limite de recursão do Python. Exceções levantadas por um
+    handler sobem pelos handlers dos ancestrais (nos geradores, no ponto do
+    yield), exatamente como aconteceria em um visitador recursivo.
+    """
+
+    _dispatch = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        table = []
+        for node_cls in NODE_CLASSES:
+            handler = getattr(cls, f"visit_{node_cls.tag}", cls.generic_visit)
+            fields = getattr(handler, "postorder_fields", None)
+            if isgeneratorfunction(handler):
+                mode = GENERATOR
+            elif fields:
+                # Função que devolve a sequência de filhos do nó.
+                if fields[0].startswith("*"):
+                    mode = attrgetter(fields[0][1:])
+                elif len(fields) > 1:
+                    mode = attrgetter(*fields)
+                else:
+                    mode = _single(attrgetter(*fields))
+            else:
+                mode = LEAF
+            table.append((handler, mode))
+        cls._dispatch = table
+
+    def visit(self, node, *args):
+        """Visita 'node' (None é ignorado e vale None) e retorna o resultado do seu handler."""
+        dispatch = self._dispatch
+        # Quadros suspensos: (gerador, nó) para handlers geradores e
+        # [nó, args, handler, filhos, resultados] para handlers pós-ordem.
+        stack = []
+        push, pop = stack.append, stack.pop
+        value = error = None
+        while True:
+            # Desce a partir de 'node' até obter um valor ou suspender um quadro.
+            if node is None:
+                value = None
+            else:
+                handler, mode = dispatch[node.kind]
+                if mode is LEAF:
+                    try:
+                        value = handler(self, node, *args)
+                    except Exception as exc:
+                        error = self.handle_error(exc, node)
+                elif mode is GENERATOR:
+                    push((handler(self, node, *args), node))
+                    value = None
+                else:
+                    push([node, args, handler, mode(node), []])
+                    value = _START
+
+            # Sobe devolvendo o valor (ou o erro) aos quadros suspensos, até que
+            # algum deles peça a visita de um filho que não seja folha. Filhos
+            # folha são resolvidos aqui mesmo, sem passar pela descida.
+            while stack:
+                frame = stack[-1]
+                if type(frame) is list:
+                    frame_node, args, handler, children, results = frame
+                    if error is None:
+                        if value is not _START:
+                            results.append(value)
+                        n = len(results)
+                        while n < len(children):
+                            node = children[n]
+                            if node is not None:
+                                leaf, mode = dispatch[node.kind]
+                                if mode is not LEAF:
+                                    break
+                                try:
+                                    results.append(leaf(self, node, *args))
+                                except Exception as exc:
+                                    error = self.handle_error(exc, node)
+                                    break
+                            else:
+                                results.append(None)
+                            n += 1
+                        else:
+                            pop()
+                            try:
+                                value = handler(self, frame_node, *args, *results)
+                            except Exception as exc:
+                                error = self.handle_error(exc, frame_node)
+                            continue
+                        if error is None:
+                            break
+                    pop()
+                    error = self.handle_error(error, frame_node)
+                    continue
+
+                gen, frame_node = frame
+                try:
+                    while True:
+                        if error is None:
+                            request = gen.send(value)
+                        else:
+                            request = gen.throw(error)
+                            error = None
+                        if type(request) is tuple:
+                            node, args = request[0], request[1:]
+                        else:
+                            node, args = request, ()
+                        if node is None:
+                            value = None
+                            continue
+                        leaf, mode = dispatch[node.kind]
+                        if mode is not LEAF:
+                            break
+                        try:
+                            value = leaf(self, node, *args)
+                        except Exception as exc:
+                            error = self.handle_error(exc, node)
+                except StopIteration as stop:
+                    pop()
+                    value = stop.value
+                    continue
+                except Exception as exc:
+                    # O erro sobe para o handler do pai.
+                    pop()
+                    error = self.handle_error(exc, frame_node)
+                    continue
+                break
+            else:
+                if error is not None:
+                    raise error
+                return value
+
+    def handle_error(self, exc, node):
+        """
+        Chamado quando o handler de 'node' termina com a exceção 'exc', antes de
+        repassá-la ao pai. Retorna a exceção a propagar (por padrão, a própria).
+        """
+        return exc
+
+    def generic_visit(self, node, *args):
+        raise Exception(f"Nenhum método visit_{node.tag} encontrado")
@@ -0,0 +1,496 @@
+import sys
+from collections import deque
+from contextlib import contextmanager
+from operator import itemgetter
+
+from src.generator import ir
+from src.parser.nodes import ASSIGNMENT, CHANNEL_RECEIVE, CHANNEL_STMT, ID, NODE, NODE_LIST, OPTIONAL
+from src.visitor.visitor import Visitor, postorder
+from src.vm.vm import VMError, string_value
+
+# =================================================
+# AVALIADOR DA AST COMPILADO PARA CLOSURES
+# =================================================
+# Terceiro modo de execução, ao lado da máquina virtual (vm.py) e da tradução
+# para Python (transpile.py): a AST validada é percorrida uma única vez e cada
+# nó vira uma função Python especializada (uma closure) que recebe o quadro
+# 'f' da função em execução. Executar o programa é chamar a closure da raiz:
+# não há despacho por nó, C3E nem texto do programa inteiro.
+#
+# As variáveis são resolvidas na compilação para posições fixas: os locais de
+# cada função (parâmetros primeiro) no quadro da chamada, uma lista nova a
+# cada chamada; os demais nomes, no quadro global 'g', que é também o quadro
+# do programa principal. Os escopos são os da máquina virtual.
+#
+# As closures são especializadas pela forma dos operandos: constantes e
+# variáveis são lidas direto (f[i], g[i]), sem chamada, e a operação de um nó
+# é embutida na closure do pai quando ele é uma atribuição, uma condição ou
+# outra operação sobre folhas; em 'j = j + 1' uma única closure faz
+# 'f[d] = f[j] + c'. Cada forma (o texto do corpo da closure, com os operandos
+# como parâmetros) é gerada uma única vez por processo, com exec, e guardada
+# em _FACTORIES; a compilação de um programa só combina fábricas já prontas.
+#
+# Comandos devolvem None, ou (valor,) quando executam um 'return'; blocos e
+# laços repassam essa tupla até a chamada da função. Como na VM, 'and'/'or'
+# avaliam os dois lados, blocos PAR executam em sequência (ou, com um
+# parallel.ParallelRuntime, em processos separados), canais são filas e
+# as variáveis que são operandos só são lidas depois das chamadas feitas pelos
+# operandos seguintes.
+#
+# Cada chamada MiniPar e cada nível de bloco aninhado ocupam alguns quadros
+# da pilha do Python, então programas profundos (recursão MiniPar, centenas
+# de 'if' aninhados) passam do limite de recursão padrão do Python. Durante
+# a execução o limite sobe para RECURSION_LIMIT quadros; um programa que
+# ainda assim o ultrapasse (ou que esgote a pilha do interpretador) não tem
+# um erro de execução: run() levanta RecursionLimitError, e main.py o executa
+# na máquina virtual, que não tem limite de profundidade.
+
+# Formas de operando: constante, variável local (f[i]), global (g[i]),
+# closure já pronta e operações ainda não montadas (embutíveis no pai).
+CONST, LOCAL, GLOBAL, CLOSURE, BINARY, UNARY = range(6)
+
+_VOID = (None,)  # resultado de 'return' sem valor
+
+_FACTORIES = {}  # texto do corpo -> fábrica de closures
+
+# Exceções do Python que, durante a execução, viram VMError.
+RUNTIME_ERRORS = (ArithmeticError, TypeError, IndexError, AttributeError)
+
+# Limite de recursão do Python (em quadros) durante a execução.
+RECURSION_LIMIT = 200_000
+
+
+class RecursionLimitError(Exception):
+    """Programa mais profundo do que a pilha do Python permite executar como closures."""
+
+    def __init__(self):
+        super().__init__("programa profundo demais para o modo closures (limite de recursão do Python)")
+
+
+@contextmanager
+def deep_recursion():
+    """Sobe o limite de recursão do Python para RECURSION_LIMIT enquanto o bloco executa."""
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, RECURSION_LIMIT))
+    try:
+        yield
+    except RecursionError:
+        raise RecursionLimitError() from None
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def _receive(channel, n):
+    if not channel:
+        raise VMError("'receive' em canal vazio")
+    values = channel.popleft()
+    if len(values) != n:
+        raise VMError(f"'receive' de {n} valor(es), mas foram enviados {len(values)}")
+    return values
+
+
+_NAMESPACE = {
+    "_and": lambda x, y: x and y, "_or": lambda x, y: x or y,
+    "_receive": _receive, "_deque": deque, "_VOID": _VOID,
+}
+
+
+def _factory(body, count):
+    """Fábrica make(g, p0, ..., p<count-1>) da closure run(f) cujo corpo é 'body' (linhas)."""
+    source = "\n".join(body)
+    make = _FACTORIES.get((source, count))
+    if make is None:
+        params = "".join(f", p{k}" for k in range(count))
+        text = f"def make(g{params}):\n    def run(f):\n" + \
+            "".join(f"        {line}\n" for line in body) + "    return run\n"
+        namespace = dict(_NAMESPACE)
+        exec(text, namespace)
+        make = _FACTORIES[(source, count)] = namespace["make"]
+    return make
+
+
+class _Expr:
+    """Operando na compilação: forma, dado (valor, posição, closure ou operação) e se não faz chamadas."""
+    __slots__ = ("shape", "data", "pure")
+
+    def __init__(self, shape, data, pure=True):
+        self.shape = shape
+        self.data = data
+        self.pure = pure
+
+
+class _Scope:
+    """Posições dos nomes de uma função (ou do programa principal) durante a compilação."""
+
+    def __init__(self, locals):
+        self.slots = {name: k for k, name in enumerate(locals)}
+        self.is_main = False
+
+
+def _assigned_names(body):
+    """Nomes escritos no corpo de uma função (sem análise semântica), sem entrar em funções aninhadas."""
+    names = []
+    stack = [body]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            continue
+        if node.kind == ASSIGNMENT:
+            names.append(node.name)
+        elif node.kind == CHANNEL_STMT:
+            names += [node.name, node.comp1, node.comp2]
+        elif node.kind == CHANNEL_RECEIVE:
+            names += [a.value for a in node.args if a.kind == ID]
+        if node.tag == "function_stmt":
+            continue
+        for field, ftype in zip(node.fields, node.field_types):
+            value = getattr(node, field)
+            if ftype == NODE or ftype == OPTIONAL:
+                stack.append(value)
+            elif ftype == NODE_LIST:
+                stack.extend(value)
+    return list(dict.fromkeys(names))
+
+
+class ClosureCompiler(Visitor):
+    """
+    Compila uma AST validada para closures. 'functions' são as informações
+    das funções da análise semântica (SemanticAnalyzer.functions), das quais
+    vêm os locais; 'out' recebe a saída de 'print'; 'runtime', se dado
+    (parallel.ParallelRuntime), executa em paralelo os blocos PAR do programa
+    principal. As expressões devolvem um _Expr e os comandos, (closure, pode
+    executar 'return').
+    """
+
+    def __init__(self, functions=None, out=None, runtime=None):
+        self.function_info = functions if functions is not None else {}
+        self.out = out
+        self.globals = []             # quadro global (preenchido no fim da compilação)
+        self.global_slots = {}        # nome -> posição no quadro global
+        self.functions = {}           # nome -> [closure do corpo, nº de parâmetros, tamanho do quadro]
+        self.function_nodes = {}      # nome -> (nó function_stmt, locais)
+        self.par_blocks = []          # closures dos ramos de cada bloco PAR, na ordem da compilação
+        self.runtime = runtime
+        self.scope = _Scope(())
+        self.scope.is_main = True
+        self.entry = None
+
+    def compile(self, node):
+        """Retorna a closure do programa, que recebe o quadro global."""
+        self.visit(node)
+        self.globals.extend([None] * (len(self.global_slots) - len(self.globals)))
+        return self.entry
+
+    # ----- operandos e fábricas -----
+    def variable(self, name):
+        slot = self.scope.slots.get(name)
+        if slot is not None:
+            return _Expr(LOCAL, slot)
+        if self.scope.is_main:
+            slot = self.scope.slots[name] = self.global_slot(name)
+            return _Expr(LOCAL, slot)
+        return _Expr(GLOBAL, self.global_slot(name))
+
+    def global_slot(self, name):
+        slot = self.global_slots.get(name)
+        if slot is None:
+            slot = self.global_slots[name] = len(self.global_slots)
+        return slot
+
+    def inline(self, e, params):
+        """Texto que lê o operando 'e' no corpo de uma closure; os dados vão para 'params'."""
+        shape = e.shape
+        if shape == BINARY:
+            op, left, right = e.data
+            l, r = self.inline(left, params), self.inline(right, params)
+            if op in ("and", "or") and not right.pure:
+                return f"_{op}({l}, {r})"
+            return f"({l} {op} {r})"
+        if shape == UNARY:
+            op, operand = e.data
+            return f"({op} {self.inline(operand, params)})"
+        name = f"p{len(params)}"
+        params.append(e.data)
+        if shape == CONST:
+            return name
+        if shape == LOCAL:
+            return f"f[{name}]"
+        if shape == GLOBAL:
+            return f"g[{name}]"
+        return f"{name}(f)"
+
+    def build(self, body, params):
+        return _factory(body, len(params))(self.globals, *params)
+
+    def closure(self, e):
+        """Closure que calcula o operando 'e'."""
+        if e.shape == CLOSURE:
+            return e.data
+        if e.shape == LOCAL:
+            return itemgetter(e.data)
+        params = []
+        return self.build([f"return {self.inline(e, params)}"], params)
+
+    def leaf(self, e):
+        """Operando que pode ser embutido em uma operação: folhas e closures."""
+        if e.shape == BINARY or e.shape == UNARY:
+            return _Expr(CLOSURE, self.closure(e), e.pure)
+        return e
+
+    def ordered(self, items, params):
+        """
+        Textos dos operandos 'items' na ordem do C3E: se uma variável vem antes
+        de um operando com chamada, os operandos compostos até a última chamada
+        são calculados antes, em locais da closure. Retorna (linhas, textos).
+        """
+        last_call = max((k for k, e in enumerate(items) if not e.pure), default=-1)
+        texts = [self.inline(e, params) for e in items]
+        if not any(items[k].shape in (LOCAL, GLOBAL) for k in range(last_call)):
+            return [], texts
+        before = []
+        for k in range(last_call + 1):
+            if items[k].shape not in (CONST, LOCAL, GLOBAL):
+                before.append(f"t{k} = {texts[k]}")
+                texts[k] = f"t{k}"
+        return before, texts
+
+    def statement(self, body, params, returns=False):
+        return self.build(body, params), returns
+
+    # ===========================
+    # ESTRUTURAS GERAIS E BLOCOS
+    # ===========================
+    @postorder("stmts")
+    def visit_program(self, node, stmts):
+        self.entry = stmts[0]
+
+    def as_statement(self, result):
+        """(closure, pode executar 'return') do resultado de um comando; None para um 'def'."""
+        if type(result) is _Expr:  # expressão usada como comando (chamada)
+            params = []
+            return self.statement([self.inline(result, params)], params)
+        return result
+
+    @postorder("*body")
+    def visit_stmts(self, node, *results):
+        statements = [s for s in map(self.as_statement, results) if s is not None]
+        return self.block(statements)
+
+    def block(self, statements):
+        """(closure, pode executar 'return') da sequência de comandos."""
+        returns = any(r for _, r in statements)
+        closures = [s for s, _ in statements]
+        if len(closures) == 1:
+            return closures[0], returns
+        if not closures:
+            return self.statement(["pass"], []), False
+        if len(closures) > 8:
+            if returns:
+                body = ["for s in p0:", "    r = s(f)", "    if r is not None:", "        return r"]
+            else:
+                body = ["for s in p0:", "    s(f)"]
+            return self.statement(body, [closures], returns)
+        body = []
+        for k, (_, r) in enumerate(statements):
+            if r:
+                body += [f"r = p{k}(f)", "if r is not None:", "    return r"]
+            else:
+                body.append(f"p{k}(f)")
+        return self.statement(body, closures, returns)
+
+    @postorder("body")
+    def visit_seq_stmt(self, node, body):
+        return body
+
+    def visit_par_stmt(self, node):
+        # Cada comando do corpo é um ramo; os ramos ficam em self.par_blocks,
+        # onde os processos do runtime, que compilam o mesmo programa, os acham
+        # pela posição. Sem runtime, dentro de funções ou com 'return', o bloco
+        # executa em sequência.
+        branches, stmts = [], []
+        for stmt in node.body.body:
+            branch = self.as_statement((yield stmt))
+            if branch is not None:
+                branches.append(branch)
+                stmts.append(stmt)
+        block = self.block(branches)
+        self.par_blocks.append([closure for closure, _ in branches])
+        if self.runtime is None or not self.scope.is_main or block[1] or len(branches) < 2:
+            return block
+        return self.runtime.block(len(self.par_blocks) - 1, stmts, block[0], self), False
+
+    # ===========
+    # EXPRESSÕES
+    # ===========
+    def visit_number(self, node): return _Expr(CONST, ir.literal_value("number", node.value))
+    def visit_string(self, node): return _Expr(CONST, string_value(node.value))
+    def visit_boolean(self, node): return _Expr(CONST, ir.literal_value("boolean", node.value))
+    def visit_id(self, node): return self.variable(node.value)
+
+    @postorder("left", "right")
+    def visit_binop(self, node, left, right):
+        left, right = self.leaf(left), self.leaf(right)
+        pure = left.pure and right.pure
+        if left.shape in (LOCAL, GLOBAL) and not right.pure:
+            # A variável é lida depois da chamada feita pelo lado direito.
+            params = []
+            r = self.inline(right, params)
+            l = self.inline(left, params)
+            expr = f"_{node.op}({l}, t)" if node.op in ("and", "or") else f"({l} {node.op} t)"
+            return _Expr(CLOSURE, self.build([f"t = {r}", f"return {expr}"], params), False)
+        return _Expr(BINARY, (node.op, left, right), pure)
+
+    @postorder("expr")
+    def visit_unop(self, node, expr):
+        expr = self.leaf(expr)
+        return _Expr(UNARY, (node.op, expr), expr.pure)
+
+    @postorder("*args")
+    def visit_call(self, node, *args):
+        function = self.functions[node.name]
+        _, nparams, size = function
+        params = [function]
+        before, texts = self.ordered([self.leaf(a) for a in args], params)
+        frame = ", ".join(texts + ["None"] * (size - nparams))
+        body = before + [f"r = p0[0]([{frame}])", "return None if r is None else r[0]"]
+        return _Expr(CLOSURE, self.build(body, params), False)
+
+    @postorder("*args")
+    def visit_builtin_call(self, node, *args):
+        if node.name != "print":
+            raise VMError(f"função '{node.name}' não definida")
+        params = [self.out]
+        before, texts = self.ordered([self.leaf(a) for a in args], params)
+        body = before + [f"return print({''.join(t + ', ' for t in texts)}file=p0)"]
+        return _Expr(CLOSURE, self.build(body, params), False)
+
+    # ========
+    # COMANDOS
+    # ========
+    def target(self, name, params):
+        return self.inline(self.variable(name), params)
+
+    @postorder("expr")
+    def visit_assignment(self, node, expr):
+        params = []
+        value = self.inline(expr, params)
+        return self.statement([f"{self.target(node.name, params)} = {value}"], params)
+
+    @postorder("cond", "body")
+    def visit_if(self, node, cond, body):
+        params = [body[0]]
+        return self.statement([f"if {self.inline(cond, params)}:", "    return p0(f)"], params, body[1])
+
+    @postorder("cond", "body", "orelse")
+    def visit_if_else(self, node, cond, body, orelse):
+        params = [body[0], orelse[0]]
+        lines = [f"if {self.inline(cond, params)}:", "    return p0(f)", "return p1(f)"]
+        return self.statement(lines, params, body[1] or orelse[1])
+
+    def loop(self, cond, body, init=None, update=None):
+        params = [body[0]]
+        returns = body[1]
+        step = ["r = p0(f)", "if r is not None:", "    return r"] if returns else ["p0(f)"]
+        if update is not None:
+            params.append(update[0])
+            step.append(f"p{len(params) - 1}(f)")
+        lines = []
+        if init is not None:
+            params.append(init[0])
+            lines.append(f"p{len(params) - 1}(f)")
+        condition = self.inline(cond, params) if cond is not None else "True"
+        lines.append(f"while {condition}:")
+        lines += ["    " + line for line in step]
+        return self.statement(lines, params, returns)
+
+    @postorder("cond", "body")
+    def visit_while(self, node, cond, body):
+        return self.loop(cond, body)
+
+    @postorder("init", "cond", "update", "body")
+    def visit_for(self, node, init, cond, update, body):
+        if body is None:
+            body = self.block([])
+        return self.loop(cond, body, init, update)
+
+    @postorder("expr")
+    def visit_return_stmt(self, node, expr):
+        if expr is None:
+            return self.statement(["return _VOID"], [], True)
+        params = []
+        return self.statement([f"return ({self.inline(expr, params)},)"], params, True)
+
+    def visit_channel_stmt(self, node):
+        # Como na VM, os computadores guardam os próprios nomes e o canal é uma fila.
+        params = [node.comp1, node.comp2]
+        lines = [f"{self.target(node.comp1, params)} = p0", f"{self.target(node.comp2, params)} = p1",
+                 f"{self.target(node.name, params)} = _deque()"]
+        return self.statement(lines, params)
+
+    @postorder("*args")
+    def visit_channel_send(self, node, *args):
+        params = []
+        before, texts = self.ordered([self.leaf(a) for a in args], params)
+        values = "".join(t + ", " for t in texts)
+        return self.statement(before + [f"{self.target(node.channel, params)}.append(({values}))"], params)
+
+    def visit_channel_receive(self, node):
+        for a in node.args:
+            if a.kind != ID:
+                raise VMError("Argumentos de receive devem ser variáveis (id).")
+        params = []
+        targets = "".join(self.target(a.value, params) + ", " for a in node.args)
+        call = f"_receive({self.target(node.channel, params)}, {len(node.args)})"
+        return self.statement([f"{targets}= {call}" if targets else call], params)
+
+    # =======
+    # FUNÇÕES
+    # =======
+    def visit_function_stmt(self, node):
+        info = self.function_info.get(node.name)
+        local = set(info["locals"]) if info is not None else set(_assigned_names(node.body))
+        names = list(node.params) + sorted(local - set(node.params))
+        function = self.functions[node.name] = [None, len(node.params), len(names)]
+        self.function_nodes[node.name] = (node, names)
+        outer, self.scope = self.scope, _Scope(names)
+        try:
+            body = yield node.body
+        finally:
+            self.scope = outer
+        function[0] = body[0]
+        return None
+
+
+class ClosureProgram:
+    """
+    Programa MiniPar (AST validada) compilado para closures. 'functions' como
+    em ClosureCompiler; 'out' recebe a saída de 'print' (padrão: sys.stdout);
+    'runtime' (parallel.ParallelRuntime) executa os blocos PAR em paralelo.
+    run() executa o programa, levantando VMError nos erros de execução e
+    RecursionLimitError se o programa for profundo demais; depois,
+    variables() dá os valores finais das variáveis do programa principal.
+    """
+
+    def __init__(self, ast, functions=None, out=None, runtime=None):
+        compiler = ClosureCompiler(functions, out, runtime)
+        self.entry = compiler.compile(ast)
+        self.globals = compiler.globals
+        self.global_slots = compiler.global_slots
+
+    def run(self):
+        g = self.globals
+        g[:] = [None] * len(g)
+        try:
+            with deep_recursion():
+                self.entry(g)
+        except RUNTIME_ERRORS as e:
+            raise VMError(str(e)) from e
+
+    def variables(self):
+        """Valores das variáveis do programa principal após run() ({nome: valor})."""
+        return {name: self.globals[slot] for name, slot in self.global_slots.items()}
+
+
+def run(ast, functions=None, out=None):
+    """Compila e executa o programa; atalho para ClosureProgram(ast, functions, out).run()."""
+    ClosureProgram(ast, functions, out).run()
@@ -0,0 +1,230 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.parser.nodes import (ASSIGNMENT, CALL, CHANNEL_RECEIVE, CHANNEL_SEND, CHANNEL_STMT, FOR,
+                              FUNCTION_STMT, ID, NODE, NODE_LIST, OPTIONAL, WHILE)
+from src.vm.closures import RUNTIME_ERRORS, ClosureCompiler, RecursionLimitError, deep_recursion
+from src.vm.vm import VMError
+
+# =================================================
+# EXECUÇÃO PARALELA DOS BLOCOS PAR
+# =================================================
+# Runtime do modo closures (closures.py) que executa de fato em paralelo os
+# blocos PAR do programa principal: cada comando do corpo é um ramo, entregue
+# como tarefa a um pool de processos (threads não ajudariam: o GIL serializa
+# o código Python). O pool é criado no primeiro bloco paralelo e reutilizado
+# por todos os blocos e execuções seguintes do programa; cada processo
+# compila o programa uma única vez, na inicialização, e acha os ramos pela
+# posição do bloco (ClosureCompiler.par_blocks).
+#
+# Semântica de fork-join: todos os ramos partem do mesmo retrato das
+# variáveis globais, tirado no início do bloco, e o bloco só termina quando
+# todos acabam. Cada ramo devolve as variáveis que alterou e a saída de
+# 'print'; o processo principal as junta na ordem dos ramos, então a saída é
+# a da execução em sequência. Um erro em um ramo aparece depois que os ramos
+# anteriores a ele foram juntados, como em sequência.
+#
+# Os conflitos entre ramos são detectados antes, pelos nomes que cada ramo
+# (e as funções que ele chama) pode ler e escrever, e o bloco executa em
+# sequência (no processo principal), com o mesmo resultado da execução sem
+# runtime, quando:
+#   - algum ramo usa canais (as filas não podem ser juntadas);
+#   - um ramo lê uma variável escrita por um ramo anterior (em sequência, ele
+#     veria o valor novo; em paralelo, o do retrato);
+#   - dois ramos podem escrever a mesma variável (em sequência, vale a
+#     escrita do último);
+#   - menos de dois ramos são pesados (têm laços ou chamam, direta ou
+#     indiretamente, funções com laços ou recursão): o custo de enviar o
+#     retrato e receber os resultados supera o ganho.
+# A decisão é tomada na primeira execução do bloco, quando todas as funções
+# já foram compiladas, e guardada; --workers nunca muda o que um programa
+# imprime nem se ele falha. Blocos PAR dentro de funções, com
+# 'return' ou aninhados em ramos já paralelos executam sempre em sequência.
+
+_CHANNEL_KINDS = (CHANNEL_STMT, CHANNEL_SEND, CHANNEL_RECEIVE)
+
+_worker = None  # (compilador, saída) do programa no processo do pool
+
+
+class _Effects:
+    """Nomes lidos e escritos, funções chamadas e se há laços ou canais em um trecho da AST."""
+    __slots__ = ("reads", "writes", "calls", "loops", "channels")
+
+    def __init__(self, node, local=()):
+        self.reads, self.writes, self.calls = set(), set(), set()
+        self.loops = self.channels = False
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node is None or node.kind == FUNCTION_STMT:
+                continue
+            kind = node.kind
+            if kind == ID:
+                self.reads.add(node.value)
+            elif kind == ASSIGNMENT:
+                self.writes.add(node.name)
+            elif kind == CALL:
+                self.calls.add(node.name)
+            elif kind == WHILE or kind == FOR:
+                self.loops = True
+            elif kind in _CHANNEL_KINDS:
+                self.channels = True
+            for field, ftype in zip(node.fields, node.field_types):
+                value = getattr(node, field)
+                if ftype == NODE or ftype == OPTIONAL:
+                    stack.append(value)
+                elif ftype == NODE_LIST:
+                    stack.extend(value)
+        self.reads.difference_update(local)
+        self.writes.difference_update(local)
+
+
+def _reachable(calls, functions):
+    """Funções alcançáveis a partir das chamadas 'calls' (nome -> _Effects das funções)."""
+    seen = set()
+    stack = list(calls)
+    while stack:
+        name = stack.pop()
+        if name not in seen and name in functions:
+            seen.add(name)
+            stack.extend(functions[name].calls)
+    return seen
+
+
+def plan(stmts, function_nodes):
+    """
+    True se os ramos 'stmts' (comandos de um bloco PAR) podem executar em
+    paralelo; 'function_nodes' como em ClosureCompiler (nome -> (nó, locais)).
+    """
+    functions = {name: _Effects(node.body, local) for name, (node, local) in function_nodes.items()}
+    heavy_functions = {name for name, e in functions.items()
+                       if e.loops or name in _reachable(e.calls, functions)}
+    writes, heavy = set(), 0
+    for stmt in stmts:
+        effects = _Effects(stmt)
+        reads, branch_writes = set(effects.reads), set(effects.writes)
+        called = _reachable(effects.calls, functions)
+        for name in called:
+            reads |= functions[name].reads
+            branch_writes |= functions[name].writes
+        if (effects.channels or any(functions[name].channels for name in called)
+                or reads & writes or branch_writes & writes):
+            return False
+        writes |= branch_writes
+        heavy += effects.loops or not called.isdisjoint(heavy_functions)
+    return heavy >= 2
+
+
+def _start_worker(ast, functions):
+    global _worker
+    out = io.StringIO()
+    compiler = ClosureCompiler(functions, out)
+    compiler.compile(ast)
+    _worker = (compiler, out)
+
+
+def _run_branch(block, branch, snapshot):
+    """
+    Executa no processo do pool o ramo 'branch' do bloco 'block' a partir do
+    retrato 'snapshot' das globais; retorna (alteradas, saída, erro ou None,
+    se passou do limite de recursão).
+    """
+    compiler, out = _worker
+    g = compiler.globals
+    g[:] = snapshot
+    out.seek(0)
+    out.truncate()
+    error = None
+    too_deep = False
+    try:
+        with deep_recursion():
+            compiler.par_blocks[block][branch](g)
+    except VMError as e:
+        error = str(e)
+    except RUNTIME_ERRORS as e:
+        error = str(e)
+    except RecursionLimitError:
+        too_deep = True
+    changed = {slot: value for slot, (value, old) in enumerate(zip(g, snapshot)) if value is not old}
+    return changed, out.getvalue(), error, too_deep
+
+
+class _Block:
+    """Bloco PAR executado pelo runtime: a closure do comando, que recebe o quadro global."""
+    __slots__ = ("runtime", "index", "stmts", "sequential", "compiler", "parallel")
+
+    def __init__(self, runtime, index, stmts, sequential, compiler):
+        self.runtime = runtime
+        self.index = index
+        self.stmts = stmts
+        self.sequential = sequential
+        self.compiler = compiler
+        self.parallel = None  # decidido na primeira execução
+
+    def __call__(self, g):
+        if self.parallel is None:
+            self.parallel = plan(self.stmts, self.compiler.function_nodes)
+        if self.parallel:
+            self.runtime.fork_join(self, g)
+        else:
+            self.runtime.sequential_runs += 1
+            self.sequential(g)
+
+
+class ParallelRuntime:
+    """
+    Pool de processos que executa os blocos PAR de um programa compilado para
+    closures (closures.ClosureProgram(..., runtime=...)). 'ast' e 'functions'
+    são os mesmos passados ao ClosureProgram; 'workers' é o número de
+    processos (padrão: os.cpu_count()). A saída de 'print' dos ramos vai
+    para a do programa. O pool só é criado no primeiro bloco que
+    executa em paralelo e vive até close() (ou o fim do 'with').
+    """
+
+    def __init__(self, ast, functions=None, workers=None):
+        self.ast = ast
+        self.functions = functions
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.parallel_runs = 0     # blocos executados em paralelo
+        self.sequential_runs = 0   # blocos executados em sequência
+
+    def block(self, index, stmts, sequential, compiler):
+        """Closure do bloco PAR 'index' de 'compiler', cujos ramos são os comandos 'stmts'."""
+        return _Block(self, index, stmts, sequential, compiler)
+
+    def start(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_start_worker,
+                                            initargs=(self.ast, self.functions))
+        return self.pool
+
+    def fork_join(self, block, g):
+        pool = self.start()
+        snapshot = list(g)
+        futures = [pool.submit(_run_branch, block.index, k, snapshot) for k in range(len(block.stmts))]
+        results = [future.result() for future in futures]
+        self.parallel_runs += 1
+
+        # plan() garante que os ramos escrevem variáveis diferentes.
+        for changed, output, error, too_deep in results:
+            if output:
+                print(output, end="", file=block.compiler.out)
+            for slot, value in changed.items():
+                g[slot] = value
+            if error is not None:
+                raise VMError(error)
+            if too_deep:
+                raise RecursionLimitError()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
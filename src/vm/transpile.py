@@ -0,0 +1,359 @@
+import hashlib
+from collections import deque
+from functools import partial
+
+from src.generator import ir
+from src.parser.nodes import ID
+from src.visitor.visitor import Visitor, postorder
+from src.vm.vm import VMError, string_value
+
+# =================================================
+# TRADUÇÃO PARA PYTHON
+# =================================================
+# Outro modo de execução, além da máquina virtual (src/vm/vm.py): a AST
+# validada é traduzida para o texto de um módulo Python, compilado com
+# compile() e executado na velocidade do bytecode do CPython.
+#
+# O fluxo de controle estruturado é refeito a partir dos nós if/while/for (o
+# 'for' vira 'while' com a atualização no fim do corpo) e as expressões viram
+# expressões Python, totalmente parentizadas; os temporários do C3E são os da
+# própria pilha do CPython. Nomes ganham prefixos (v_ para variáveis, f_ para
+# funções), para não colidir com palavras reservadas nem com os auxiliares
+# do módulo (_print, _receive, ...).
+#
+# A semântica é a da máquina virtual:
+#   - as funções são definidas no início do módulo (inclusive as aninhadas),
+#     como na VM, em que uma função pode ser chamada antes do seu 'def';
+#   - os locais de uma função são os parâmetros e os nomes definidos nela
+#     (os 'locals' da análise semântica); os demais nomes que ela usa são
+#     globais do módulo ('global'), e os nomes do programa principal que
+#     nenhuma função usa são locais de _main(), o que os torna rápidos;
+#   - variáveis ainda não atribuídas valem None;
+#   - 'and'/'or' avaliam os dois lados quando o direito tem chamadas;
+#   - no C3E, os operandos que são variáveis só são lidos pela instrução que
+#     os usa, depois de calculados os demais operandos: em 'g + f()' (ou
+#     'print(g, f())'), 'g' é lido depois da chamada, que pode alterá-lo. Só
+#     nesses casos (uma variável antes de um operando com chamada), os
+#     operandos compostos são calculados antes, em temporários (_t<n>,
+#     atribuídos com ':=' dentro da expressão);
+#   - blocos PAR executam em sequência e canais são filas.
+# Erros de execução viram VMError com a linha do programa MiniPar.
+#
+# O Python limita o aninhamento de blocos e de parênteses; programas que
+# passam desses limites levantam TranspileError, e o chamador pode usar a VM.
+
+FILENAME = "<minipar>"
+
+# Objetos de código já compilados, pelo hash do texto do módulo.
+_compiled = {}
+_MAX_COMPILED = 32
+
+
+class TranspileError(Exception):
+    """Programa que não pode ser traduzido para um módulo Python."""
+
+
+def _block(lines, line):
+    """Linhas de um bloco, indentadas ('pass' se vazio)."""
+    if not lines:
+        return [("    pass", line)]
+    return [("    " + text, n) for text, n in lines]
+
+
+# Tipos de operando: expressão composta, constante ou variável.
+_COMPOUND, _CONST, _VAR = range(3)
+
+
+def _tuple(items):
+    return "(" + ", ".join(items) + ("," if len(items) == 1 else "") + ")"
+
+
+class PythonTranspiler(Visitor):
+    """
+    Traduz uma AST validada para o texto de um módulo Python.
+
+    'functions' são as informações das funções da análise semântica
+    (SemanticAnalyzer.functions); sem elas, os locais de cada função são os
+    nomes atribuídos no seu corpo. As expressões devolvem (texto, sem
+    chamadas, tipo de operando) e os comandos, listas de (linha de texto,
+    linha no programa).
+    """
+
+    def __init__(self, functions=None):
+        self.function_info = functions if functions is not None else {}
+        self.definitions = []         # (nó, linhas do corpo, nomes usados, nomes escritos)
+        self.scopes = [(set(), set())]  # (usados, escritos) do programa principal ou da função atual
+        self.main = []
+        self.temp_count = 0
+
+    def transpile(self, node):
+        """Retorna (texto do módulo, linha do programa de cada linha do módulo)."""
+        self.visit(node)
+        return self._module()
+
+    def use(self, name, write=False):
+        used, written = self.scopes[-1]
+        used.add(name)
+        if write:
+            written.add(name)
+        return "v_" + name
+
+    def operands(self, items, combine):
+        """
+        Texto da expressão que combina os operandos 'items' (resultados de
+        expressões) com combine(textos), lendo as variáveis na ordem do C3E.
+        """
+        texts = [text for text, _, _ in items]
+        last_call = max((k for k, item in enumerate(items) if not item[1]), default=-1)
+        if not any(items[k][2] == _VAR for k in range(last_call)):
+            return combine(texts)
+        before = []
+        for k in range(last_call + 1):
+            if items[k][2] == _COMPOUND:
+                temp = f"_t{self.temp_count}"
+                self.temp_count += 1
+                before.append(f"({temp} := {texts[k]})")
+                texts[k] = temp
+        return f"({', '.join(before)}, {combine(texts)})[-1]"
+
+    # ===========================
+    # ESTRUTURAS GERAIS E BLOCOS
+    # ===========================
+    @postorder("stmts")
+    def visit_program(self, node, stmts):
+        self.main = stmts
+
+    @postorder("*body")
+    def visit_stmts(self, node, *results):
+        lines = []
+        for child, result in zip(node.body, results):
+            if type(result) is tuple:  # expressão usada como comando (chamada)
+                lines.append((result[0], child.line))
+            elif result:
+                lines.extend(result)
+        return lines
+
+    @postorder("body")
+    def visit_seq_stmt(self, node, body):
+        return body
+
+    visit_par_stmt = visit_seq_stmt
+
+    # ===========
+    # EXPRESSÕES
+    # ===========
+    def visit_number(self, node): return repr(ir.literal_value("number", node.value)), True, _CONST
+    def visit_string(self, node): return repr(string_value(node.value)), True, _CONST
+    def visit_boolean(self, node): return repr(ir.literal_value("boolean", node.value)), True, _CONST
+    def visit_id(self, node): return self.use(node.value), True, _VAR
+
+    @postorder("left", "right")
+    def visit_binop(self, node, left, right):
+        op, pure = node.op, left[1] and right[1]
+        if not pure and op in ("and", "or"):
+            # _and/_or recebem os dois lados já calculados, como no C3E.
+            combine = lambda t: f"_{op}({t[0]}, {t[1]})"
+        else:
+            combine = lambda t: f"({t[0]} {op} {t[1]})"
+        return self.operands([left, right], combine), pure, _COMPOUND
+
+    @postorder("expr")
+    def visit_unop(self, node, expr):
+        return f"({node.op} {expr[0]})", expr[1], _COMPOUND
+
+    @postorder("*args")
+    def visit_call(self, node, *args):
+        return self.operands(args, lambda t: f"f_{node.name}({', '.join(t)})"), False, _COMPOUND
+
+    @postorder("*args")
+    def visit_builtin_call(self, node, *args):
+        if node.name != "print":
+            raise TranspileError(f"função embutida '{node.name}' não suportada")
+        return self.operands(args, lambda t: f"_print({', '.join(t)})"), False, _COMPOUND
+
+    # ========
+    # COMANDOS
+    # ========
+    @postorder("expr")
+    def visit_assignment(self, node, expr):
+        return [(f"{self.use(node.name, True)} = {expr[0]}", node.line)]
+
+    @postorder("cond", "body")
+    def visit_if(self, node, cond, body):
+        return [(f"if {cond[0]}:", node.line), *_block(body, node.line)]
+
+    @postorder("cond", "body", "orelse")
+    def visit_if_else(self, node, cond, body, orelse):
+        return [(f"if {cond[0]}:", node.line), *_block(body, node.line),
+                ("else:", node.line), *_block(orelse, node.line)]
+
+    @postorder("cond", "body")
+    def visit_while(self, node, cond, body):
+        return [(f"while {cond[0]}:", node.line), *_block(body, node.line)]
+
+    @postorder("init", "cond", "update", "body")
+    def visit_for(self, node, init, cond, update, body):
+        # Sem 'continue' na linguagem, a atualização no fim do corpo equivale à do C3E.
+        header = f"while {cond[0] if cond is not None else 'True'}:"
+        return [*(init or ()), (header, node.line), *_block([*(body or ()), *(update or ())], node.line)]
+
+    @postorder("expr")
+    def visit_return_stmt(self, node, expr):
+        return [("return" if expr is None else f"return {expr[0]}", node.line)]
+
+    def visit_channel_stmt(self, node):
+        # Como na VM, os computadores guardam os próprios nomes e o canal é uma fila.
+        return [(f"{self.use(node.comp1, True)} = {node.comp1!r}", node.line),
+                (f"{self.use(node.comp2, True)} = {node.comp2!r}", node.line),
+                (f"{self.use(node.name, True)} = _deque()", node.line)]
+
+    @postorder("*args")
+    def visit_channel_send(self, node, *args):
+        channel = self.use(node.channel)
+        return [(self.operands(args, lambda t: f"{channel}.append({_tuple(t)})"), node.line)]
+
+    def visit_channel_receive(self, node):
+        for a in node.args:
+            if a.kind != ID:
+                raise TranspileError("Argumentos de receive devem ser variáveis (id).")
+        targets = [self.use(a.value, True) for a in node.args]
+        call = f"_receive({self.use(node.channel)}, {len(targets)})"
+        if targets:
+            call = f"{', '.join(targets)}{',' if len(targets) == 1 else ''} = {call}"
+        return [(call, node.line)]
+
+    # =======
+    # FUNÇÕES
+    # =======
+    def visit_function_stmt(self, node):
+        # A definição vai para o início do módulo; no lugar dela, nada.
+        self.scopes.append((set(), set()))
+        try:
+            body = yield node.body
+        finally:
+            used, written = self.scopes.pop()
+        self.definitions.append((node, body, used, written))
+        return []
+
+    # ======
+    # MÓDULO
+    # ======
+    def _module(self):
+        out = []
+        shared = set()  # nomes globais usados por alguma função
+        functions = []
+        for node, body, used, written in self.definitions:
+            info = self.function_info.get(node.name)
+            local = set(info["locals"]) if info is not None else set(written)
+            local.update(node.params)
+            shared |= used - local
+            functions.append((node, body, used - local, local - set(node.params)))
+
+        main_used = self.scopes[0][0]
+        if shared:
+            out.append((" = ".join(f"v_{v}" for v in sorted(shared)) + " = None", 0))
+        for node, body, global_names, local in functions:
+            params = ", ".join(f"v_{p}" for p in node.params)
+            out.append((f"def f_{node.name}({params}):", node.line))
+            self._prologue(out, global_names, local, node.line)
+            if body:
+                out.extend(_block(body, node.line))
+            elif out[-1][0].startswith("def "):
+                out.append(("    pass", node.line))
+        out.append(("def _main():", 0))
+        self._prologue(out, main_used & shared, main_used - shared, 0)
+        out.extend(_block(self.main, 0))
+        out.append(("    return locals()", 0))
+        return "\n".join(text for text, _ in out) + "\n", [n for _, n in out]
+
+    @staticmethod
+    def _prologue(out, global_names, local, line):
+        if global_names:
+            out.append(("    global " + ", ".join(f"v_{v}" for v in sorted(global_names)), line))
+        if local:
+            out.append(("    " + " = ".join(f"v_{v}" for v in sorted(local)) + " = None", line))
+
+
+# =================================================
+# COMPILAÇÃO E EXECUÇÃO
+# =================================================
+def compile_module(source, cache=None):
+    """
+    Objeto de código do texto do módulo. Os objetos ficam guardados na
+    memória do processo e, com 'cache' (um cache.CodeCache), também em disco.
+    """
+    digest = hashlib.sha256(source.encode("utf-8")).digest()
+    code = _compiled.get(digest)
+    if code is not None:
+        return code
+    key = cache.key(source) if cache is not None else None
+    if key is not None:
+        code = cache.load(key)
+    if code is None:
+        try:
+            code = compile(source, FILENAME, "exec")
+        except (SyntaxError, RecursionError, MemoryError) as e:
+            raise TranspileError(f"o módulo Python gerado não compila ({e})") from None
+        if key is not None:
+            cache.store(key, code)
+    if len(_compiled) >= _MAX_COMPILED:
+        del _compiled[next(iter(_compiled))]
+    _compiled[digest] = code
+    return code
+
+
+def _receive(channel, n):
+    if not channel:
+        raise VMError("'receive' em canal vazio")
+    values = channel.popleft()
+    if len(values) != n:
+        raise VMError(f"'receive' de {n} valor(es), mas foram enviados {len(values)}")
+    return values
+
+
+class PythonModule:
+    """
+    Programa MiniPar (AST validada) traduzido e compilado para Python.
+    'functions' como em PythonTranspiler; 'out' recebe a saída de 'print'
+    (padrão: sys.stdout); 'cache' é um cache.CodeCache opcional. run()
+    executa o programa; depois, variables() dá os valores finais das
+    variáveis do programa principal.
+    """
+
+    def __init__(self, ast, functions=None, out=None, cache=None):
+        self.source, self.source_lines = PythonTranspiler(functions).transpile(ast)
+        self.code = compile_module(self.source, cache)
+        self.out = out
+        self._variables = {}
+
+    def run(self):
+        namespace = {
+            "_print": partial(print, file=self.out), "_deque": deque, "_receive": _receive,
+            "_and": lambda x, y: x and y, "_or": lambda x, y: x or y,
+        }
+        try:
+            exec(self.code, namespace)
+            main_locals = namespace["_main"]()
+        except VMError as e:
+            raise VMError(e.message + self._location(e.__traceback__)) from None
+        except (ArithmeticError, TypeError, IndexError, AttributeError, RecursionError) as e:
+            raise VMError(str(e) + self._location(e.__traceback__)) from e
+        values = {**namespace, **main_locals}
+        self._variables = {name[2:]: value for name, value in values.items() if name.startswith("v_")}
+
+    def _location(self, tb):
+        line = None
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == FILENAME:
+                line = self.source_lines[tb.tb_lineno - 1]
+            tb = tb.tb_next
+        return f" (linha {line} do programa)" if line else ""
+
+    def variables(self):
+        """Valores das variáveis do programa principal após run() ({nome: valor})."""
+        return dict(self._variables)
+
+
+def run(ast, functions=None, out=None):
+    """Traduz, compila e executa o programa; atalho para PythonModule(ast, functions, out).run()."""
+    PythonModule(ast, functions, out).run()
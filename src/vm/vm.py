@@ -0,0 +1,344 @@
+import operator
+import re
+import sys
+from collections import deque
+
+from src.generator import ir
+from src.optimizer import cfg as cfg_module
+
+# =================================================
+# MÁQUINA VIRTUAL DE REGISTRADORES
+# =================================================
+# Executa o C3E (ir.IRProgram) gerado pelo CodeGenerator, otimizado ou não.
+# Na carga, o programa é traduzido uma única vez para instruções
+# (opcode, d, x, y) cujos operandos são índices inteiros:
+#   - cada função tem um quadro (uma lista) com uma posição para cada
+#     parâmetro, variável local, temporário e constante que ela usa; as
+#     constantes já vêm preenchidas no modelo do quadro, copiado a cada chamada;
+#   - o quadro do programa principal é o das variáveis globais;
+#   - rótulos viram posições de instrução, e rótulos, 'begin_func' e os
+#     marcadores de blocos PAR (executados em sequência) desaparecem;
+#   - as chamadas a funções do programa apontam para a tabela de funções
+#     (entrada e modelo do quadro), e as chamadas a 'print' viram PRINT.
+# Assim o laço de despacho só indexa listas: nenhum dicionário é consultado
+# e nenhum texto é analisado durante a execução.
+#
+# Os locais de uma função são os parâmetros e os nomes definidos dentro dela
+# (os 'locals' da análise semântica, IRProgram.function_info; sem eles, os
+# nomes escritos no corpo). Os demais nomes lidos ou escritos no corpo são
+# globais: cada um ganha uma posição no quadro da função, carregada do quadro
+# global (LOADG) antes de cada instrução que o lê e gravada nele (STOREG)
+# depois de cada instrução que o escreve. Funções aninhadas não enxergam os
+# locais da função que as contém.
+#
+# Canais são filas: 'send' acrescenta a tupla dos valores enviados, 'receive'
+# retira a mais antiga (com o canal vazio, a execução sequencial nunca
+# receberia nada, e a execução termina com erro).
+
+# Opcodes próprios da máquina, após os do C3E.
+LOADG, STOREG, PRINT, HALT = range(len(ir.OP_NAMES), len(ir.OP_NAMES) + 4)
+
+# Instruções do C3E que não fazem nada na execução.
+_NO_OPS = frozenset({ir.LABEL, ir.BEGIN_FUNC, ir.PAR_BEGIN, ir.PAR_END})
+
+BINARY_FUNCTIONS = {
+    ir.ADD: operator.add, ir.SUB: operator.sub, ir.MUL: operator.mul, ir.DIV: operator.truediv,
+    ir.EQ: operator.eq, ir.NE: operator.ne, ir.LT: operator.lt, ir.GT: operator.gt,
+    ir.LE: operator.le, ir.GE: operator.ge,
+    ir.AND: lambda x, y: x and y, ir.OR: lambda x, y: x or y,
+    ir.CONCAT: operator.add, ir.ADD_ANY: operator.add,
+}
+
+_ESCAPE = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0"}
+
+
+def string_value(text):
+    """Valor de um literal string (lexema com aspas): sem as aspas e com os escapes resolvidos."""
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), text[1:-1])
+
+
+def constant_value(c):
+    """Valor de uma constante na execução; ver string_value."""
+    if c.type == "string":
+        return string_value(c.text)
+    return c.value
+
+
+class VMError(Exception):
+    """Erro durante a execução, com a instrução C3E em que ocorreu."""
+    def __init__(self, message, instruction=None):
+        self.message = message
+        self.instruction = instruction
+        location = f" em '{instruction}'" if instruction is not None else ""
+        super().__init__(f"Erro de execução: {message}{location}")
+
+
+class _Frame:
+    """Posições do quadro de uma função durante a carga: nome ou operando -> índice."""
+
+    def __init__(self, locals):
+        self.locals = locals
+        self.slots = {}
+        self.template = []
+        self.globals = {}  # nome global -> posição no quadro
+
+    def slot(self, x, value=None):
+        """Posição do operando x (variável, temporário ou constante); 'value' é o valor inicial."""
+        s = self.slots.get((type(x), x))
+        if s is None:
+            s = self.slots[(type(x), x)] = len(self.template)
+            self.template.append(constant_value(x) if type(x) is ir.Const else value)
+        return s
+
+    def operand(self, x, main):
+        """Posição de x no quadro; os nomes globais usam uma posição de cópia (ver LOADG/STOREG)."""
+        if self is main or type(x) is not str or x in self.locals:
+            return self.slot(x)
+        s = self.globals.get(x)
+        if s is None:
+            s = self.globals[x] = self.slot(x)
+        return s
+
+    def is_global(self, x, main):
+        return self is not main and type(x) is str and x not in self.locals
+
+
+class VM:
+    """
+    Máquina virtual para um programa C3E. 'out' recebe a saída de 'print'
+    (padrão: sys.stdout). run() executa o programa desde o início e retorna o
+    número de instruções executadas pela máquina (as do C3E, menos rótulos e
+    marcadores, mais LOADG/STOREG); depois, variables() dá os valores finais
+    das variáveis globais.
+    """
+
+    def __init__(self, program, out=None):
+        self.program = program
+        self.out = out
+        self.code = []       # instruções (opcode, d, x, y)
+        self.source = []     # posição no programa de origem de cada instrução
+        self.functions = []  # [posição de entrada, modelo do quadro] de cada função
+        self._load(program)
+
+    # ----- carga -----
+    def _load(self, program):
+        ops, dest, a, b = program.ops, program.dest, program.a, program.b
+        info = program.function_info
+        regions = cfg_module.function_regions(program)
+        defined = program.defined_functions()
+        function_ids = {}
+        for name, _ in regions[1:]:
+            function_ids[program.function(name)] = len(function_ids)
+            self.functions.append([None, None])
+
+        main = _Frame(None)
+        frames = {cfg_module.MAIN: main}
+        for name, indices in regions[1:]:
+            if name in info:
+                locals = set(info[name]["locals"])
+            else:
+                locals = {x for i in indices for x in ir.defs(ops[i], dest[i], a[i], b[i]) if type(x) is str}
+            frames[name] = _Frame(locals | {dest[i] for i in indices if ops[i] == ir.GET_PARAM})
+
+        # Cada instrução fica na posição em que aparece no programa; as que
+        # pertencem a outra região (definições aninhadas) são traduzidas com o
+        # quadro da sua própria função.
+        owner = [None] * len(ops)
+        for name, indices in regions:
+            for i in indices:
+                owner[i] = frames[name]
+
+        code, source = self.code, self.source
+        label_at = {}     # rótulo -> posição da próxima instrução da máquina
+        pending = []      # (posição na máquina, rótulo) dos saltos a resolver
+
+        def operand(v):
+            return frame.operand(v, main)
+
+        for i in range(len(ops)):
+            op, d, x, y = ops[i], dest[i], a[i], b[i]
+            frame = owner[i]
+            if op in _NO_OPS:
+                if op == ir.LABEL:
+                    label_at[x] = len(code)
+                    if x in function_ids:
+                        self.functions[function_ids[x]][0] = len(code)
+                continue
+
+            # Globais lidos pela instrução, nas funções.
+            for v in ir.uses(op, d, x, y):
+                if frame.is_global(v, main):
+                    code.append((LOADG, operand(v), main.slot(v), None))
+                    source.append(i)
+
+            if op in ir.BINARY:
+                instruction = (op, operand(d), operand(x), operand(y))
+            elif op in ir.UNARY or op == ir.COPY:
+                instruction = (op, operand(d), operand(x), None)
+            elif op == ir.GOTO:
+                instruction = (op, None, None, None)
+                pending.append((len(code), x))
+            elif op == ir.IF_FALSE:
+                instruction = (op, None, operand(x), None)
+                pending.append((len(code), y))
+            elif op == ir.PARAM:
+                instruction = (op, None, operand(x), None)
+            elif op == ir.GET_PARAM:
+                instruction = (op, operand(d), None, None)
+            elif op == ir.CALL:
+                if x in defined:
+                    instruction = (op, operand(d), function_ids[x], y)
+                elif x.text == "print":
+                    instruction = (PRINT, operand(d), None, y)
+                else:
+                    raise VMError(f"função '{x.text}' não definida", ir.render_quad(op, d, x, y))
+            elif op == ir.RETURN:
+                instruction = (op, None, None if x is None else operand(x), None)
+            elif op == ir.END_FUNC:
+                instruction = (ir.RETURN, None, None, None)
+            elif op == ir.CHANNEL_DECL:
+                # Os computadores guardam os próprios nomes; o canal, a fila.
+                for v in (x, y):
+                    code.append((ir.COPY, operand(v), frame.slot(("computador", v), v), None))
+                    source.append(i)
+                instruction = (op, operand(d), None, None)
+            elif op == ir.SEND:
+                instruction = (op, None, operand(x), y)
+            elif op == ir.RECEIVE:
+                instruction = (op, tuple(operand(v) for v in d), operand(x), None)
+            else:
+                raise VMError(f"instrução desconhecida: {ir.OP_NAMES[op]}")
+            code.append(instruction)
+            source.append(i)
+
+            # Globais escritos pela instrução, nas funções.
+            for v in ir.defs(op, d, x, y):
+                if frame.is_global(v, main):
+                    code.append((STOREG, operand(v), main.slot(v), None))
+                    source.append(i)
+
+        code.append((HALT, None, None, None))
+        source.append(None)
+        for position, label in pending:
+            op, d, x, _ = code[position]
+            code[position] = (op, d, x, label_at[label])
+
+        self.main = main
+        for name, _ in regions[1:]:
+            self.functions[function_ids[program.function(name)]][1] = frames[name].template
+
+    # ----- execução -----
+    def run(self):
+        """Executa o programa e retorna o número de instruções executadas."""
+        code = self.code
+        functions = self.functions
+        out = self.out if self.out is not None else sys.stdout
+        binary = BINARY_FUNCTIONS
+        COPY, ADD, SUB, MUL, LT, IF_FALSE, GOTO = ir.COPY, ir.ADD, ir.SUB, ir.MUL, ir.LT, ir.IF_FALSE, ir.GOTO
+        BINARY, NEG, NOT = ir.BINARY, ir.NEG, ir.NOT
+        PARAM, CALL, GET_PARAM, RETURN = ir.PARAM, ir.CALL, ir.GET_PARAM, ir.RETURN
+        CHANNEL_DECL, SEND, RECEIVE = ir.CHANNEL_DECL, ir.SEND, ir.RECEIVE
+
+        g = f = list(self.main.template)
+        self.globals = g
+        stack = []   # argumentos empilhados por 'param'
+        args = []    # argumentos da chamada em curso, lidos por 'get_param'
+        calls = []   # (posição de retorno, quadro de quem chamou, posição do resultado)
+        # Instruções executadas: somadas só nos desvios, pelo tamanho do
+        # trecho percorrido em sequência desde o desvio anterior.
+        executed = 0
+        start = pc = 0
+        try:
+            while True:
+                op, d, x, y = code[pc]
+                pc += 1
+                if op == COPY:
+                    f[d] = f[x]
+                elif op == ADD:
+                    f[d] = f[x] + f[y]
+                elif op == IF_FALSE:
+                    if not f[x]:
+                        executed += pc - start
+                        start = pc = y
+                elif op == GOTO:
+                    executed += pc - start
+                    start = pc = y
+                elif op == LT:
+                    f[d] = f[x] < f[y]
+                elif op == SUB:
+                    f[d] = f[x] - f[y]
+                elif op == MUL:
+                    f[d] = f[x] * f[y]
+                elif op in BINARY:
+                    f[d] = binary[op](f[x], f[y])
+                elif op == LOADG:
+                    f[d] = g[x]
+                elif op == STOREG:
+                    g[x] = f[d]
+                elif op == PARAM:
+                    stack.append(f[x])
+                elif op == CALL:
+                    executed += pc - start
+                    entry, template = functions[x]
+                    args = stack[len(stack) - y:]
+                    del stack[len(stack) - y:]
+                    calls.append((pc, f, d))
+                    f = template[:]
+                    start = pc = entry
+                elif op == GET_PARAM:
+                    f[d] = args.pop()
+                elif op == RETURN:
+                    value = None if x is None else f[x]
+                    executed += pc - start
+                    if not calls:
+                        break
+                    pc, f, d = calls.pop()
+                    start = pc
+                    f[d] = value
+                elif op == NEG:
+                    f[d] = -f[x]
+                elif op == NOT:
+                    f[d] = not f[x]
+                elif op == PRINT:
+                    values = stack[len(stack) - y:]
+                    del stack[len(stack) - y:]
+                    print(*reversed(values), file=out)
+                    f[d] = None
+                elif op == CHANNEL_DECL:
+                    f[d] = deque()
+                elif op == SEND:
+                    values = stack[len(stack) - y:]
+                    del stack[len(stack) - y:]
+                    f[x].append(tuple(reversed(values)))
+                elif op == RECEIVE:
+                    channel = f[x]
+                    if not channel:
+                        raise VMError("'receive' em canal vazio")
+                    values = channel.popleft()
+                    if len(values) != len(d):
+                        raise VMError(f"'receive' de {len(d)} valor(es), mas foram enviados {len(values)}")
+                    for s, value in zip(d, values):
+                        f[s] = value
+                else:  # HALT
+                    executed += pc - 1 - start
+                    break
+        except VMError as e:
+            raise VMError(e.message, self.instruction_text(pc - 1)) from None
+        except (ArithmeticError, TypeError, IndexError, AttributeError) as e:
+            raise VMError(str(e), self.instruction_text(pc - 1)) from e
+        return executed
+
+    def instruction_text(self, position):
+        """Texto C3E da instrução do programa que originou a instrução da máquina em 'position'."""
+        i = self.source[position] if 0 <= position < len(self.source) else None
+        return None if i is None else ir.render_quad(*self.program[i])
+
+    def variables(self):
+        """Valores das variáveis globais após run() ({nome: valor})."""
+        return {key: self.globals[s] for (kind, key), s in self.main.slots.items() if kind is str}
+
+
+def run(program, out=None):
+    """Executa o programa C3E; atalho para VM(program, out).run()."""
+    return VM(program, out).run()